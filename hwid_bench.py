@@ -0,0 +1,576 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Mesures de performance de la collecte
+Rejoue un inventaire enregistré (FixtureProvider) avec des latences réalistes
+et mesure, pour chaque point d'entrée public: latence à froid et à chaud
+(p50/p99), nombre de processus enfants lancés et pic de mémoire (RSS).
+Les résultats peuvent être comparés à une référence sauvegardée.
+
+Usage:
+    python hwid_bench.py [--fixture fixture.json] [--iterations 20] [--scale 0.1]
+    python hwid_bench.py --save-baseline bench_baseline.json
+    python hwid_bench.py --compare bench_baseline.json [--tolerance 0.25] [--min-delta-ms 1]
+    python hwid_bench.py --match 1000000 [--queries 20000]
+    python hwid_bench.py --stress 64 [--scale 0.1]
+    python hwid_bench.py --startup [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+# Inventaire de démonstration utilisé si aucune fixture n'est fournie
+DEFAULT_FIXTURE = {
+    "Machine GUID": "3f2b8c1e-7a4d-4e5f-9b6a-1c2d3e4f5a6b",
+    "CPU ID": "BFEBFBFF000906EA",
+    "Disk Serial": "S4EWNX0R123456",
+    "Motherboard Serial": "210987654321",
+    "MAC Address": "a4:bb:6d:12:34:56",
+    "Windows Product ID": "00330-80000-00000-AA123",
+    "Platform": "Windows-10-10.0.22631-SP0",
+    "Computer Name": "BENCH-PC",
+    "Network Adapters": [
+        {"Name": "Ethernet", "InterfaceDescription": "Intel(R) Ethernet Connection", "MacAddress": "A4-BB-6D-12-34-56"}
+    ]
+}
+
+# Coûts mesurés sur un poste Windows 11: lectures de registre quasi gratuites,
+# chaque requête CIM paie un démarrage de PowerShell
+WINDOWS_LATENCY_PROFILE = {
+    "Machine GUID": {"median_ms": 0.2, "sigma": 0.3, "spawns": 0},
+    "Windows Product ID": {"median_ms": 0.2, "sigma": 0.3, "spawns": 0},
+    "CPU ID": {"median_ms": 450.0, "sigma": 0.35, "spawns": 1},
+    "Disk Serial": {"median_ms": 480.0, "sigma": 0.35, "spawns": 1},
+    "Motherboard Serial": {"median_ms": 460.0, "sigma": 0.35, "spawns": 1},
+    "hardware_batch": {"median_ms": 560.0, "sigma": 0.35, "spawns": 1},
+    "MAC Address": {"median_ms": 0.05, "sigma": 0.2, "spawns": 0},
+    "Network Adapters": {"median_ms": 520.0, "sigma": 0.4, "spawns": 1},
+    "Platform": {"median_ms": 0.1, "sigma": 0.2, "spawns": 0},
+    "Computer Name": {"median_ms": 0.01, "sigma": 0.2, "spawns": 0}
+}
+
+# Points d'entrée mesurés
+ENTRY_POINTS = (
+    "get_all_hwid_info",
+    "collect",
+    "generate_composite_hwid",
+    "get_network_adapters"
+)
+
+# Métriques comparées à la référence (plus petit = meilleur)
+COMPARED_METRICS = ("cold_ms", "warm_p50_ms", "warm_p99_ms", "spawns_cold", "spawns_warm")
+
+# Budget (ms) du coût propre de l'import de hwid_manager: médiane, sur des
+# processus lancés en alternance, de l'écart avec l'import des seuls modules
+# standard de STARTUP_BASELINE. La durée absolue dépend surtout de la machine
+# (20 à 30 ms pour la référence sur un poste de développement, CPython 3.11);
+# le coût propre y a été mesuré autour de 6 ms (p90 10 ms), le budget laisse
+# une marge pour la charge
+STARTUP_BUDGET_MS = 15.0
+
+# Modules standard dont l'import de hwid_manager ne peut pas se passer (cache
+# JSON, verrous, annotations, empreinte): référence de la mesure du démarrage
+STARTUP_BASELINE = ("json", "threading", "typing", "hashlib", "struct", "functools")
+
+# Modules qui ne doivent pas être chargés par l'import de hwid_manager: ils le
+# sont par les fonctions qui s'en servent (collecte, modification, CLI)
+STARTUP_FORBIDDEN = ("subprocess", "winreg", "argparse", "concurrent.futures",
+                     "platform", "uuid", "datetime", "random")
+
+# Processus de mesure du démarrage: import, puis premier affichage depuis le
+# cache (construction de HWIDManager et cached_info, comme l'interface)
+_BASELINE_SCRIPT = """
+import time
+start = time.perf_counter()
+import """ + ", ".join(STARTUP_BASELINE) + """
+print((time.perf_counter() - start) * 1000.0)
+"""
+
+_STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import hwid_manager
+from hwid_cache import SnapshotCache
+imported = time.perf_counter()
+sys.stderr.write("--paint--\\n")
+manager = hwid_manager.HWIDManager(cache=SnapshotCache(path=sys.argv[1]))
+info = manager.cached_info()
+painted = time.perf_counter()
+print((imported - start) * 1000.0, (painted - imported) * 1000.0, info is not None)
+"""
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Percentile par rang le plus proche"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Pic de mémoire résidente du processus courant en Ko (None si inconnu)"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS exprime ru_maxrss en octets, Linux en Ko
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize // 1024
+    except Exception:
+        pass
+    return None
+
+
+def load_fixture(path: Optional[str]) -> Dict:
+    """Charge la fixture et lui associe le profil de latence par défaut si besoin"""
+    if path is None:
+        fixture = dict(DEFAULT_FIXTURE)
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            fixture = json.load(f)
+    fixture.setdefault("_latency", WINDOWS_LATENCY_PROFILE)
+    return fixture
+
+
+def measure_entry(entry: str, fixture: Dict, iterations: int, scale: float, seed: int) -> Dict:
+    """Mesure un point d'entrée dans le processus courant"""
+    from hwid_cache import SnapshotCache
+    from hwid_manager import HWIDManager
+    from hwid_providers import FixtureProvider
+
+    provider = FixtureProvider(fixture, scale=scale, seed=seed)
+    manager = HWIDManager(provider=provider, cache=SnapshotCache())
+    call = getattr(manager, entry)
+
+    # Appel à froid: cache vide
+    start = time.perf_counter()
+    call()
+    cold_ms = (time.perf_counter() - start) * 1000.0
+    spawns_cold = provider.spawn_count
+
+    # Appels à chaud: cache rempli par l'appel précédent
+    warm = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        warm.append((time.perf_counter() - start) * 1000.0)
+    spawns_warm = (provider.spawn_count - spawns_cold) / max(1, iterations)
+
+    # Appels sans cache: coût d'une collecte complète répétée
+    uncached = []
+    spawns_before = provider.spawn_count
+    for _ in range(iterations):
+        manager.invalidate()
+        start = time.perf_counter()
+        call()
+        uncached.append((time.perf_counter() - start) * 1000.0)
+    spawns_uncached = (provider.spawn_count - spawns_before) / max(1, iterations)
+
+    return {
+        "entry": entry,
+        "cold_ms": round(cold_ms, 3),
+        "warm_p50_ms": round(percentile(warm, 50), 3),
+        "warm_p99_ms": round(percentile(warm, 99), 3),
+        "uncached_p50_ms": round(percentile(uncached, 50), 3),
+        "uncached_p99_ms": round(percentile(uncached, 99), 3),
+        "spawns_cold": spawns_cold,
+        "spawns_warm": round(spawns_warm, 3),
+        "spawns_uncached": round(spawns_uncached, 3),
+        "peak_rss_kb": peak_rss_kb()
+    }
+
+
+def measure_isolated(entry: str, args) -> Dict:
+    """Mesure un point d'entrée dans un processus dédié (pic RSS propre)"""
+    command = [sys.executable, os.path.abspath(__file__), "--child", entry,
+               "--iterations", str(args.iterations), "--scale", str(args.scale),
+               "--seed", str(args.seed)]
+    if args.fixture:
+        command += ["--fixture", args.fixture]
+    result = subprocess.run(command, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    if result.returncode != 0:
+        raise RuntimeError(f"Échec de la mesure de {entry}: {result.stderr.strip()}")
+    return json.loads(result.stdout)
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float,
+            min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Retourne la liste des régressions par rapport à la référence
+    Une latence régresse si elle dépasse la tolérance relative et min_delta_ms
+    """
+    reference = {item["entry"]: item for item in baseline.get("results", [])}
+    regressions = []
+    for item in results:
+        ref = reference.get(item["entry"])
+        if ref is None:
+            continue
+        for metric in COMPARED_METRICS:
+            current, previous = item.get(metric), ref.get(metric)
+            if current is None or previous is None:
+                continue
+            # Les processus se comparent strictement, les latences avec tolérance
+            if metric.startswith("spawns"):
+                limit = previous
+            else:
+                limit = max(previous * (1.0 + tolerance), previous + min_delta_ms)
+            if current > limit:
+                regressions.append(f"{item['entry']}.{metric}: {previous} -> {current}")
+    return regressions
+
+
+def measure_stress(callers: int, fixture: Dict, scale: float, seed: int) -> Dict:
+    """
+    Appels simultanés sans cache: `callers` threads démarrent ensemble et
+    appellent alternativement get_all_hwid_info et generate_composite_hwid.
+    Grâce au single-flight, le nombre de processus lancés ne dépend pas du
+    nombre d'appelants
+    """
+    from hwid_cache import SnapshotCache
+    from hwid_manager import HWIDManager
+    from hwid_providers import FixtureProvider
+
+    provider = FixtureProvider(fixture, scale=scale, seed=seed)
+    # Durée de validité nulle: seule la collecte en cours peut être partagée
+    manager = HWIDManager(provider=provider, cache=SnapshotCache(ttls={}, default_ttl=0))
+    barrier = threading.Barrier(callers)
+    results = [None] * callers
+
+    def call(index: int):
+        barrier.wait()
+        if index % 2:
+            results[index] = manager.generate_composite_hwid()
+        else:
+            results[index] = manager.get_all_hwid_info()["Composite HWID"]
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "callers": callers,
+        "spawns": provider.spawn_count,
+        "shared": manager.flights.shared,
+        "wall_ms": round((time.perf_counter() - start) * 1000.0, 3),
+        "consistent": len(set(results)) == 1
+    }
+
+
+def measure_startup(runs: int, fixture: Dict, budget_ms: float = STARTUP_BUDGET_MS) -> Dict:
+    """
+    Coût du démarrage, mesuré dans des processus neufs: durée de l'import de
+    hwid_manager et du premier affichage depuis un cache rempli au préalable.
+    Le coût propre de l'import est l'écart avec l'import des modules standard
+    de STARTUP_BASELINE, mesuré en alternance dans les mêmes conditions. Des processus lancés
+    avec -X importtime (plus lents) détaillent les modules chargés par l'import
+    """
+    import compileall
+    import tempfile
+    from hwid_cache import SnapshotCache
+    from hwid_manager import HWIDManager
+    from hwid_providers import FixtureProvider
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    # Mesure l'import, pas la compilation (PYTHONDONTWRITEBYTECODE, source modifiée)
+    compileall.compile_dir(directory, maxlevels=0, quiet=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, "cache.json")
+        HWIDManager(provider=FixtureProvider(fixture),
+                    cache=SnapshotCache(path=cache_path)).get_all_hwid_info()
+        imports, wall, baseline, paint, modules, cached = [], [], [], [], {}, True
+        for traced in [False] * runs + [True] * runs:
+            if not traced:
+                result = subprocess.run([sys.executable, "-c", _BASELINE_SCRIPT],
+                                        capture_output=True, text=True, cwd=directory)
+                if result.returncode != 0:
+                    raise RuntimeError(f"Échec de la mesure de référence: {result.stderr.strip()}")
+                baseline.append(float(result.stdout))
+            options = ["-X", "importtime"] if traced else []
+            result = subprocess.run([sys.executable, *options, "-c", _STARTUP_SCRIPT, cache_path],
+                                    capture_output=True, text=True, cwd=directory)
+            if result.returncode != 0:
+                raise RuntimeError(f"Échec de la mesure du démarrage: {result.stderr.strip()}")
+            import_ms, paint_ms, complete = result.stdout.split()
+            cached = cached and complete == "True"
+            if not traced:
+                wall.append(float(import_ms))
+                paint.append(float(paint_ms))
+                continue
+            loaded = {}
+            for line in result.stderr.split("--paint--")[0].splitlines():
+                # import time: propre | cumulé | nom (indenté selon la profondeur)
+                parts = line.split("|")
+                if len(parts) == 3 and parts[1].strip().isdigit():
+                    loaded[parts[2].strip()] = int(parts[1]) / 1000.0
+            imports.append(loaded.get("hwid_manager", 0.0))
+            for name, elapsed in loaded.items():
+                modules.setdefault(name, []).append(elapsed)
+    slowest = sorted(((name, percentile(samples, 50)) for name, samples in modules.items()
+                      if name.startswith("hwid_") or "." not in name),
+                     key=lambda item: -item[1])
+    return {
+        "runs": runs,
+        "import_ms": round(min(wall), 3),
+        "import_p50_ms": round(percentile(wall, 50), 3),
+        "import_traced_ms": round(percentile(imports, 50), 3),
+        "baseline_ms": round(min(baseline), 3),
+        "own_ms": round(percentile([spent - reference for spent, reference in zip(wall, baseline)], 50), 3),
+        "first_paint_ms": round(percentile(paint, 50), 3),
+        "first_paint_cached": cached,
+        "budget_ms": budget_ms,
+        "forbidden": [name for name in STARTUP_FORBIDDEN if name in modules],
+        "slowest": [{"module": name, "cumulative_ms": round(elapsed, 3)}
+                    for name, elapsed in slowest[:10]]
+    }
+
+
+def print_startup(result: Dict):
+    """Affiche les mesures de démarrage"""
+    print(f"\n🚀 DÉMARRAGE ({result['runs']} processus par mesure)")
+    print("-" * 60)
+    print(f"Import de hwid_manager: min {result['import_ms']:.2f} ms | p50 {result['import_p50_ms']:.2f} ms "
+          f"| -X importtime {result['import_traced_ms']:.2f} ms")
+    print(f"Référence ({', '.join(STARTUP_BASELINE)}): min {result['baseline_ms']:.2f} ms "
+          f"| coût propre p50 {result['own_ms']:.2f} ms | budget {result['budget_ms']:.0f} ms")
+    print(f"Premier affichage depuis le cache: {result['first_paint_ms']:.2f} ms"
+          + ("" if result["first_paint_cached"] else " (cache incomplet)"))
+    print("Modules les plus coûteux (cumulé, -X importtime):")
+    for item in result["slowest"]:
+        print(f"  {item['module']:<30}{item['cumulative_ms']:>10.2f} ms")
+    print("-" * 60)
+
+
+def print_stress(results: List[Dict], scale: float):
+    """Affiche les mesures d'appels simultanés"""
+    print(f"\n🧵 APPELS SIMULTANÉS SANS CACHE (latences simulées x{scale})")
+    print("-" * 60)
+    print(f"{'Appelants':>10}{'proc.':>8}{'partagés':>10}{'durée (ms)':>14}{'cohérent':>12}")
+    for item in results:
+        print(f"{item['callers']:>10}{item['spawns']:>8}{item['shared']:>10}"
+              f"{item['wall_ms']:>14.2f}{('oui' if item['consistent'] else 'non'):>12}")
+    print("-" * 60)
+    print("partagés: appels servis par une collecte déjà en cours")
+
+
+def synthetic_asset(number: int, seed: int) -> Dict[str, str]:
+    """
+    Composants reproductibles d'un actif fictif (modèles de CPU et BIOS non
+    renseignés partagés par le parc)
+    """
+    rng = random.Random(seed * 1000003 + number)
+    return {
+        "Machine GUID": f"{number:08x}-7a4d-4e5f-9b6a-{rng.getrandbits(48):012x}",
+        "CPU ID": rng.choice(("BFEBFBFF000906EA", "BFEBFBFF000A0671", "178BFBFF00A50F00")),
+        "Disk Serial": f"S4EW{rng.getrandbits(40):010X}",
+        "Motherboard Serial": rng.choice((f"{rng.getrandbits(40):012d}", "Default string")),
+        "MAC Address": ":".join(f"{rng.getrandbits(8):02x}" for _ in range(6))
+    }
+
+
+def measure_match(assets: int, queries: int, seed: int) -> Dict:
+    """
+    Débit du rattachement k-of-n (AssetMatcher) pour un parc de `assets` actifs
+    Requêtes à parts égales: inventaire inchangé, 1 ou 2 composants remplacés
+    (disque, carte réseau), machine inconnue
+    """
+    from hwid_fleet import AssetMatcher, component_hash
+
+    rng = random.Random(seed)
+    with AssetMatcher(expected_assets=assets) as matcher:
+        start = time.perf_counter()
+        for number in range(assets):
+            matcher.add(synthetic_asset(number, seed))
+        build_s = time.perf_counter() - start
+
+        workload = []
+        for i in range(queries):
+            replaced = i % 4
+            if replaced == 3:
+                workload.append((synthetic_asset(assets + i, seed), None))
+                continue
+            number = rng.randrange(assets)
+            values = synthetic_asset(number, seed)
+            for field in ("Disk Serial", "MAC Address")[:replaced]:
+                values[field] = f"remplacé-{number}"
+            # Attendu: l'actif d'origine si au moins k composants exploitables concordent
+            kept = sum(1 for field, value in synthetic_asset(number, seed).items()
+                       if component_hash(field, value) and values[field] == value)
+            workload.append((values, number if kept >= matcher.k else None))
+
+        latencies = []
+        correct = 0
+        for values, expected in workload:
+            start = time.perf_counter()
+            found = matcher.match(values)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+            if (found[0] if found else None) == expected:
+                correct += 1
+
+    elapsed = sum(latencies) / 1000.0
+    return {
+        "assets": assets,
+        "queries": queries,
+        "build_s": round(build_s, 3),
+        "build_per_s": round(assets / build_s, 1) if build_s else None,
+        "matches_per_s": round(queries / elapsed, 1) if elapsed else None,
+        "match_p50_ms": round(percentile(latencies, 50), 4),
+        "match_p99_ms": round(percentile(latencies, 99), 4),
+        "accuracy": round(correct / max(1, queries), 4),
+        "peak_rss_kb": peak_rss_kb()
+    }
+
+
+def print_match(result: Dict):
+    """Affiche les mesures du rattachement k-of-n"""
+    print(f"\n🔗 RATTACHEMENT K-OF-N ({result['assets']} actifs, {result['queries']} requêtes)")
+    print("-" * 60)
+    print(f"Construction de l'index: {result['build_s']:.1f} s ({result['build_per_s']} actifs/s)")
+    print(f"Débit: {result['matches_per_s']} rattachements/s | "
+          f"p50 {result['match_p50_ms']:.3f} ms | p99 {result['match_p99_ms']:.3f} ms")
+    print(f"Exactitude: {result['accuracy'] * 100:.2f}% | RSS: {result['peak_rss_kb']} Ko")
+    print("-" * 60)
+
+
+def print_results(results: List[Dict], scale: float):
+    """Affiche le tableau des résultats"""
+    print(f"\n📊 COLLECTE HWID (latences simulées x{scale})")
+    print("-" * 104)
+    print(f"{'Point d entrée':<26}{'froid':>10}{'p50':>10}{'p99':>10}{'p50 s/c':>10}{'p99 s/c':>10}"
+          f"{'proc.':>7}{'proc. s/c':>11}{'RSS (Ko)':>10}")
+    for item in results:
+        print(f"{item['entry']:<26}{item['cold_ms']:>10.2f}{item['warm_p50_ms']:>10.2f}"
+              f"{item['warm_p99_ms']:>10.2f}{item['uncached_p50_ms']:>10.2f}{item['uncached_p99_ms']:>10.2f}"
+              f"{item['spawns_cold']:>7}{item['spawns_uncached']:>11}{str(item['peak_rss_kb']):>10}")
+    print("-" * 104)
+    print("froid: premier appel | p50/p99: appels suivants (cache) | s/c: sans cache | proc.: processus lancés")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée des mesures"""
+    parser = argparse.ArgumentParser(description="Mesures de performance de HWID Manager")
+    parser.add_argument("--fixture", help="Fixture JSON enregistrée (FixtureProvider.record)")
+    parser.add_argument("--iterations", type=int, default=20, help="Nombre d'appels mesurés")
+    parser.add_argument("--scale", type=float, default=0.1, help="Facteur appliqué aux latences simulées")
+    parser.add_argument("--seed", type=int, default=1234, help="Graine du tirage des latences")
+    parser.add_argument("--entry", action="append", choices=ENTRY_POINTS, help="Point d'entrée à mesurer")
+    parser.add_argument("--save-baseline", metavar="FICHIER", help="Sauvegarde les résultats comme référence")
+    parser.add_argument("--compare", metavar="FICHIER", help="Compare les résultats à une référence")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Marge tolérée sur les latences")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Écart minimal signalé (ms)")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    parser.add_argument("--match", type=int, metavar="ACTIFS",
+                        help="Mesure le rattachement k-of-n sur un parc de cette taille")
+    parser.add_argument("--queries", type=int, default=20000, help="Requêtes de rattachement mesurées")
+    parser.add_argument("--stress", type=int, metavar="APPELANTS",
+                        help="Appels simultanés (1, 2, 4... jusqu'à ce nombre) sans cache")
+    parser.add_argument("--startup", action="store_true",
+                        help="Mesure l'import de hwid_manager et le premier affichage")
+    parser.add_argument("--runs", type=int, default=5, help="Processus mesurés pour --startup")
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_MS,
+                        help="Budget du coût propre de l'import de hwid_manager (ms, au-delà de la référence)")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        fixture = load_fixture(args.fixture)
+        print(json.dumps(measure_entry(args.child, fixture, args.iterations, args.scale, args.seed)))
+        return 0
+
+    if args.match:
+        result = measure_match(args.match, args.queries, args.seed)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_match(result)
+        return 0
+
+    if args.startup:
+        result = measure_startup(args.runs, load_fixture(args.fixture), args.budget)
+        if args.json:
+            print(json.dumps(result, indent=2))
+        else:
+            print_startup(result)
+        failed = 0
+        if result["forbidden"]:
+            print(f"❌ Modules chargés à l'import: {', '.join(result['forbidden'])}")
+            failed = 1
+        if result["own_ms"] > result["budget_ms"]:
+            print(f"❌ Import hors budget: {result['own_ms']:.2f} ms > {result['budget_ms']:.0f} ms "
+                  f"au-delà de la référence")
+            failed = 1
+        return failed
+
+    if args.stress:
+        fixture = load_fixture(args.fixture)
+        counts = []
+        callers = 1
+        while callers < args.stress:
+            counts.append(callers)
+            callers *= 2
+        counts.append(args.stress)
+        results = [measure_stress(count, fixture, args.scale, args.seed) for count in counts]
+        if args.json:
+            print(json.dumps(results, indent=2))
+        else:
+            print_stress(results, args.scale)
+        # Le nombre de processus doit rester celui d'un appel isolé
+        if any(item["spawns"] != results[0]["spawns"] or not item["consistent"] for item in results):
+            print("❌ Le nombre de processus varie avec le nombre d'appelants")
+            return 1
+        return 0
+
+    results = [measure_isolated(entry, args) for entry in (args.entry or ENTRY_POINTS)]
+    report = {"scale": args.scale, "iterations": args.iterations, "results": results}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_results(results, args.scale)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Référence sauvegardée: {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("❌ Régressions détectées:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ Aucune régression par rapport à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Cache des informations matérielles
+Durée de validité par champ, invalidation explicite et persistance sur disque
+liée au démarrage courant de la machine (boot)
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+from hwid_snapshot import STATUS_ERROR, parse_value
+
+# Durée de validité par champ en secondes; None = valide jusqu'au prochain boot
+FIELD_TTLS = {
+    "Machine GUID": 60,
+    "CPU ID": None,
+    "Disk Serial": 3600,
+    "Motherboard Serial": None,
+    "MAC Address": 60,
+    "Windows Product ID": 60,
+    "Platform": None,
+    "Computer Name": None
+}
+
+
+def boot_identity() -> str:
+    """
+    Retourne un identifiant du démarrage courant
+    Linux: boot_id du noyau; Windows: BootId du registre, ou à défaut
+    l'heure de démarrage arrondie à la minute
+    """
+    try:
+        with open('/proc/sys/kernel/random/boot_id', 'r') as f:
+            return f.read().strip()
+    except OSError:
+        pass
+
+    if sys.platform == 'win32':
+        try:
+            import winreg
+            key = winreg.OpenKey(
+                winreg.HKEY_LOCAL_MACHINE,
+                r"SYSTEM\CurrentControlSet\Control\Session Manager\Memory Management\PrefetchParameters",
+                0,
+                winreg.KEY_READ | winreg.KEY_WOW64_64KEY
+            )
+            value, _ = winreg.QueryValueEx(key, "BootId")
+            winreg.CloseKey(key)
+            return f"bootid-{value}"
+        except Exception:
+            pass
+        try:
+            import ctypes
+            uptime = ctypes.windll.kernel32.GetTickCount64() / 1000.0
+            return f"boottime-{int((time.time() - uptime) // 60)}"
+        except Exception:
+            pass
+
+    return "unknown"
+
+
+def default_cache_path() -> str:
+    """Emplacement par défaut du fichier de cache (profil utilisateur)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'hwid_manager', 'snapshot_cache.json')
+
+
+class SnapshotCache:
+    """
+    Cache des champs HWID avec durée de validité par champ
+    Les valeurs d'erreur ne sont jamais conservées. Si path est fourni, le cache
+    est rechargé depuis le disque uniquement s'il provient du même boot
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, Optional[float]]] = None,
+                 path: Optional[str] = None, default_ttl: Optional[float] = 60):
+        self.ttls = dict(FIELD_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.path = path
+        self.boot_id = boot_identity()
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Les écritures concurrentes partagent le même fichier temporaire
+        self._save_lock = threading.Lock()
+        # Valeurs du fichier sur disque (None: inconnues, la prochaine sauvegarde écrit)
+        self._saved = None
+        if path is not None:
+            self.load()
+
+    def _is_fresh(self, name: str, stamp: float) -> bool:
+        ttl = self.ttls.get(name, self.default_ttl)
+        return ttl is None or time.time() - stamp < ttl
+
+    def get(self, name: str) -> Optional[str]:
+        """Retourne la valeur en cache si elle est encore valide, sinon None"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or not self._is_fresh(name, entry[1]):
+            return None
+        return entry[0]
+
+    def stamp(self, name: str) -> Optional[float]:
+        """Horodatage de la valeur en cache (None si absente)"""
+        with self._lock:
+            entry = self._entries.get(name)
+        return None if entry is None else entry[1]
+
+    def peek(self, name: str) -> Optional[str]:
+        """Retourne la dernière valeur connue, même expirée"""
+        with self._lock:
+            entry = self._entries.get(name)
+        return None if entry is None else entry[0]
+
+    def put(self, name: str, value: str, stamp: Optional[float] = None):
+        """Enregistre une valeur (ignorée s'il s'agit d'une erreur)"""
+        if not isinstance(value, str) or parse_value(value)[0] == STATUS_ERROR:
+            return
+        with self._lock:
+            self._entries[name] = (value, time.time() if stamp is None else stamp)
+
+    def invalidate(self, names: Optional[Iterable[str]] = None):
+        """Supprime les champs indiqués, ou tout le cache si names est None"""
+        with self._lock:
+            if names is None:
+                self._entries.clear()
+            else:
+                for name in names:
+                    self._entries.pop(name, None)
+
+    def snapshot(self) -> Dict[str, str]:
+        """Dernières valeurs connues de tous les champs en cache"""
+        with self._lock:
+            return {name: entry[0] for name, entry in self._entries.items()}
+
+    def load(self) -> bool:
+        """Recharge le cache depuis le disque s'il provient du boot courant"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("boot_id") != self.boot_id:
+            return False
+        with self._lock:
+            for name, entry in data.get("fields", {}).items():
+                self._entries[name] = (entry["value"], entry["timestamp"])
+            self._saved = {name: entry[0] for name, entry in self._entries.items()}
+        return True
+
+    def save(self) -> bool:
+        """
+        Écrit le cache sur disque (remplacement atomique), seulement si une
+        valeur a changé depuis la dernière écriture: une revalidation qui relit
+        les mêmes valeurs ne réécrit pas le fichier (horodatages non mis à jour)
+        """
+        if self.path is None:
+            return False
+        # Les écritures concurrentes partagent le fichier temporaire et la
+        # comparaison avec le disque: une sauvegarde à la fois
+        with self._save_lock:
+            with self._lock:
+                values = {name: value for name, (value, _) in self._entries.items()}
+                if values == self._saved:
+                    return True
+                fields = {name: {"value": value, "timestamp": stamp}
+                          for name, (value, stamp) in self._entries.items()}
+            data = {"boot_id": self.boot_id, "fields": fields}
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                tmp_path = self.path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                return False
+            self._saved = values
+            return True
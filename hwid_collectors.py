@@ -0,0 +1,306 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Registre des collecteurs
+Chaque composant en lecture seule est un collecteur enregistré: nom du champ,
+classe de coût (gratuit, léger, processus), dépendances et groupe de lecture
+groupée. HWIDManager collecte les groupes du moins cher au plus coûteux et
+calcule ensuite les champs dérivés (HWID composite). De nouveaux composants
+s'ajoutent sans modifier HWIDManager:
+
+    from hwid_collectors import COST_CHEAP, COST_SPAWN, REGISTRY
+    REGISTRY.register_component("BIOS UUID", {"windows": lire_cim, "linux": lire_uuid},
+                                cost={"windows": COST_SPAWN, "linux": COST_CHEAP})
+
+Les modules de greffons listés dans HWID_PLUGINS (séparés par des virgules)
+sont importés à la création du premier HWIDManager (voir hwid_plugins)
+"""
+
+import collections.abc
+import os
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from hwid_fingerprint import COMPOSITE_COMPONENTS
+
+# Classes de coût: registre ou mémoire, appel système ou fichier, processus lancé
+COST_FREE = 0
+COST_CHEAP = 1
+COST_SPAWN = 2
+
+COST_NAMES = ("gratuit", "léger", "processus")
+
+# Groupe de la lecture CIM groupée (CPU, disque et carte mère)
+HARDWARE_GROUP = "hardware"
+
+
+class Collector:
+    """
+    Collecteur d'un champ
+    read(manager, valeurs) retourne la valeur affichable; valeurs contient les
+    champs dont il dépend (vide pour un composant lu directement). Un collecteur
+    avec dépendances est dérivé: il est calculé après la collecte, sans coût propre.
+    cost est une classe de coût, ou {backend: classe} quand elle dépend du
+    backend (lecture sysfs sous Linux, requête CIM sous Windows)
+    """
+
+    __slots__ = ("name", "read", "cost", "depends", "group")
+
+    def __init__(self, name: str, read: Callable[..., str], cost: Union[int, Dict[str, int]] = COST_CHEAP,
+                 depends: Iterable[str] = (), group: Optional[str] = None):
+        costs = cost.values() if isinstance(cost, dict) else (cost,)
+        for value in costs:
+            if value not in (COST_FREE, COST_CHEAP, COST_SPAWN):
+                raise ValueError(f"Classe de coût inconnue: {value}")
+        self.name = name
+        self.read = read
+        self.cost = dict(cost) if isinstance(cost, dict) else cost
+        self.depends = tuple(depends)
+        self.group = group
+
+    @property
+    def derived(self) -> bool:
+        return bool(self.depends)
+
+    def cost_for(self, backend: Optional[str] = None) -> int:
+        """Classe de coût sur ce backend (la plus élevée s'il n'est pas décrit)"""
+        if not isinstance(self.cost, dict):
+            return self.cost
+        if backend in self.cost:
+            return self.cost[backend]
+        return max(self.cost.values(), default=COST_CHEAP)
+
+    def __repr__(self):
+        if isinstance(self.cost, dict):
+            cost = ", ".join(f"{backend}: {COST_NAMES[value]}" for backend, value in self.cost.items())
+            return f"Collector({self.name!r}, cost={{{cost}}})"
+        return f"Collector({self.name!r}, cost={COST_NAMES[self.cost]})"
+
+
+class CollectorRegistry:
+    """Collecteurs disponibles, dans l'ordre d'affichage des champs"""
+
+    def __init__(self):
+        self._collectors = {}
+        # Lectures groupées: groupe -> fonction(manager) -> {champ: valeur}
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, read: Callable[..., str], cost: Union[int, Dict[str, int]] = COST_CHEAP,
+                 depends: Iterable[str] = (), group: Optional[str] = None,
+                 replace: bool = False) -> Collector:
+        """Enregistre un collecteur (ValueError si le champ existe déjà, sauf replace)"""
+        collector = Collector(name, read, cost, depends, group)
+        with self._lock:
+            if name in self._collectors and not replace:
+                raise ValueError(f"Collecteur déjà enregistré: {name}")
+            unknown = [dependency for dependency in collector.depends
+                       if dependency not in self._collectors]
+            if unknown:
+                raise ValueError(f"Dépendances inconnues pour {name}: {', '.join(unknown)}")
+            self._collectors[name] = collector
+        return collector
+
+    def register_component(self, name: str, readers: Dict[str, Callable],
+                           cost: Union[int, Dict[str, int]] = COST_CHEAP,
+                           group: Optional[str] = None, replace: bool = False) -> Collector:
+        """
+        Enregistre un composant lu par le backend: readers associe un nom de
+        backend ("windows", "linux"...) à une fonction(provider) -> valeur, et
+        cost une classe de coût commune ou propre à chaque backend.
+        Les autres backends passent par provider.component(name) (fixture)
+        """
+        def read(manager, values) -> str:
+            provider = manager.provider
+            return provider.component(name, readers.get(provider.name))
+
+        return self.register(name, read, cost, group=group, replace=replace)
+
+    def register_batch(self, group: str, read: Callable[..., Dict[str, str]]):
+        """Lecture groupée des champs d'un groupe: fonction(manager) -> {champ: valeur}"""
+        with self._lock:
+            self._batches[group] = read
+
+    def unregister(self, name: str):
+        with self._lock:
+            dependents = [collector.name for collector in self._collectors.values()
+                          if name in collector.depends]
+            if dependents:
+                raise ValueError(f"{name} est requis par: {', '.join(dependents)}")
+            del self._collectors[name]
+
+    def get(self, name: str) -> Collector:
+        with self._lock:
+            return self._collectors[name]
+
+    def batch(self, group: Optional[str]) -> Optional[Callable[..., Dict[str, str]]]:
+        with self._lock:
+            return self._batches.get(group)
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._collectors
+
+    def fields(self) -> Tuple[str, ...]:
+        """Champs enregistrés, dans l'ordre d'affichage"""
+        with self._lock:
+            return tuple(self._collectors)
+
+    def required(self, fields: Optional[Iterable[str]] = None) -> List[str]:
+        """Champs demandés et leurs dépendances, dans l'ordre d'affichage"""
+        with self._lock:
+            collectors = dict(self._collectors)
+        pending = list(collectors if fields is None else fields)
+        wanted = set()
+        while pending:
+            name = pending.pop()
+            if name in wanted or name not in collectors:
+                continue
+            wanted.add(name)
+            pending.extend(collectors[name].depends)
+        return [name for name in collectors if name in wanted]
+
+    def groups(self, fields: Optional[Iterable[str]] = None,
+               backend: Optional[str] = None) -> List[Tuple[Tuple[str, ...], int]]:
+        """
+        Groupes de collecte des champs lus directement: [(champs, coût)], du
+        moins cher au plus coûteux sur le backend indiqué (ordre d'affichage à coût égal)
+        """
+        groups = {}
+        for name in self.required(fields):
+            collector = self.get(name)
+            if not collector.derived:
+                groups.setdefault(collector.group or name, []).append(collector)
+        costed = [(tuple(c.name for c in members), max(c.cost_for(backend) for c in members))
+                  for members in groups.values()]
+        return sorted(costed, key=lambda group: group[1])
+
+    def derived(self, fields: Optional[Iterable[str]] = None) -> List[Collector]:
+        """Collecteurs dérivés nécessaires, chacun après ses dépendances"""
+        collectors = [self.get(name) for name in self.required(fields)]
+        ordered, done = [], {c.name for c in collectors if not c.derived}
+        pending = [c for c in collectors if c.derived]
+        while pending:
+            ready = [c for c in pending if all(dependency in done for dependency in c.depends)]
+            if not ready:
+                raise ValueError("Dépendances circulaires: "
+                                 + ", ".join(c.name for c in pending))
+            for collector in ready:
+                ordered.append(collector)
+                done.add(collector.name)
+                pending.remove(collector)
+        return ordered
+
+    def cost(self, fields: Optional[Iterable[str]] = None, backend: Optional[str] = None) -> int:
+        """Classe de coût la plus élevée parmi les groupes à collecter"""
+        return max((cost for _, cost in self.groups(fields, backend)), default=COST_FREE)
+
+
+def register_builtins(registry: CollectorRegistry):
+    """Composants historiques, lus par les getters de HWIDManager"""
+    registry.register("Machine GUID", lambda manager, values: manager.get_machine_guid(),
+                      cost=COST_FREE)
+    for name, getter in (("CPU ID", "get_cpu_id"),
+                         ("Disk Serial", "get_disk_serial"),
+                         ("Motherboard Serial", "get_motherboard_serial")):
+        registry.register(name, lambda manager, values, getter=getter: getattr(manager, getter)(),
+                          cost=COST_SPAWN, group=HARDWARE_GROUP)
+    registry.register("MAC Address", lambda manager, values: manager.get_mac_address(),
+                      cost=COST_CHEAP)
+    registry.register("Windows Product ID", lambda manager, values: manager.get_windows_product_id(),
+                      cost=COST_FREE)
+    registry.register("Composite HWID",
+                      lambda manager, values: manager.generate_composite_hwid(values),
+                      cost=COST_FREE, depends=COMPOSITE_COMPONENTS)
+    registry.register("Platform", lambda manager, values: manager.provider.platform_name(),
+                      cost=COST_CHEAP, group="system")
+    registry.register("Computer Name", lambda manager, values: manager.provider.computer_name(),
+                      cost=COST_CHEAP, group="system")
+    registry.register_batch(HARDWARE_GROUP, lambda manager: manager.provider.hardware_batch())
+
+
+# Registre partagé par défaut
+REGISTRY = CollectorRegistry()
+register_builtins(REGISTRY)
+
+_plugins_loaded = set()
+_plugins_lock = threading.Lock()
+
+
+def load_plugins(modules: Optional[str] = None) -> List[str]:
+    """
+    Importe les modules de greffons (noms séparés par des virgules, par défaut
+    la variable d'environnement HWID_PLUGINS); chaque module n'est importé qu'une fois
+    """
+    if modules is None:
+        modules = os.environ.get("HWID_PLUGINS", "")
+    if not modules.strip():
+        return []
+    import importlib
+    loaded = []
+    with _plugins_lock:
+        for module in (name.strip() for name in modules.split(",")):
+            if module and module not in _plugins_loaded:
+                importlib.import_module(module)
+                _plugins_loaded.add(module)
+                loaded.append(module)
+    return loaded
+
+
+class LazySnapshot(collections.abc.Mapping):
+    """
+    Inventaire évalué à la demande: un champ n'est collecté qu'au premier accès,
+    avec les champs encore non lus de son groupe (une seule lecture groupée pour
+    CPU, disque et carte mère) et via le cache du manager, sans réécrire le
+    cache persistant. L'itération suit le coût: les champs peu coûteux d'abord
+    """
+
+    def __init__(self, manager, fields: Optional[Iterable[str]] = None):
+        self.manager = manager
+        registry = manager.registry
+        requested = set(registry.fields() if fields is None else fields)
+        rank = {}
+        # Champs lus ensemble: le groupe du champ (ceux de ses dépendances s'il est dérivé)
+        self._members = {}
+        for names, cost in registry.groups(requested, manager.provider.name):
+            for name in names:
+                rank.setdefault(name, (cost, len(rank)))
+                self._members[name] = names
+        for collector in registry.derived(requested):
+            rank[collector.name] = (max((rank[d][0] for d in registry.required(collector.depends)
+                                         if d in rank), default=COST_FREE), len(rank))
+            members = [member for d in registry.required(collector.depends)
+                       for member in self._members.get(d, (d,))]
+            self._members[collector.name] = tuple(dict.fromkeys(members + [collector.name]))
+        self._fields = tuple(sorted((name for name in rank if name in requested), key=rank.get))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> str:
+        if name not in self._fields:
+            raise KeyError(name)
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            pending = [member for member in self._members[name] if member not in self._values]
+        values = self.manager.read_through(pending)
+        with self._lock:
+            for member, value in values.items():
+                if member in self._fields:
+                    self._values.setdefault(member, value)
+            return self._values[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._fields)
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    @property
+    def evaluated(self) -> Tuple[str, ...]:
+        """Champs déjà collectés"""
+        with self._lock:
+            return tuple(name for name in self._fields if name in self._values)
+
+    def to_info(self) -> Dict[str, str]:
+        """Collecte les champs restants (du moins cher au plus coûteux)"""
+        return {name: self[name] for name in self._fields}
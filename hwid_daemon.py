@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Service d'inventaire local
+Un seul processus collecte l'inventaire, le garde en mémoire et l'actualise
+périodiquement; les agents locaux l'interrogent en HTTP (127.0.0.1 ou socket
+Unix) au lieu de relancer chacun leur collecte. Lecture seule.
+
+Ressources (GET ou HEAD, réponses JSON):
+    /snapshot            inventaire complet
+    /composite           HWID composite
+    /fields/<champ>      un champ (nom ou alias: cpu-id, mac-address...)
+Chaque réponse porte un ETag; une requête If-None-Match dont l'ETag est
+toujours valide reçoit 304 sans corps.
+
+Usage:
+    python hwid_daemon.py serve [--port 8765 | --unix /run/hwid.sock] [--interval 60]
+    python hwid_daemon.py serve --port 0 --fixture fixture.json
+    python hwid_daemon.py get /fields/cpu-id [--port 8765 | --unix ...] [--etag '"..."']
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+DEFAULT_PORT = 8765
+DEFAULT_INTERVAL = 60.0
+
+# Le service n'écoute que sur la boucle locale
+LOCAL_HOST = "127.0.0.1"
+
+# Droits du socket Unix (propriétaire et groupe)
+UNIX_SOCKET_MODE = 0o660
+
+_JSON_TYPE = "application/json; charset=utf-8"
+
+
+def field_path(field: str) -> str:
+    """Chemin de la ressource d'un champ (ex: /fields/cpu-id)"""
+    return "/fields/" + field.lower().replace(' ', '-')
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+
+
+def render(info: Dict[str, str]) -> Dict[str, Tuple[bytes, str]]:
+    """Corps JSON et ETag de chaque ressource pour un inventaire"""
+    def entry(document: Dict) -> Tuple[bytes, str]:
+        body = json.dumps(document, ensure_ascii=False, indent=2).encode('utf-8')
+        return body, _etag(body)
+
+    resources = {"/snapshot": entry(info)}
+    if "Composite HWID" in info:
+        resources["/composite"] = entry({"Composite HWID": info["Composite HWID"]})
+    # Tous les champs servis, y compris ceux des greffons (hwid_collectors)
+    for field in info:
+        resources[field_path(field)] = entry({field: info[field]})
+    return resources
+
+
+class InventoryDaemon:
+    """
+    Inventaire partagé: actualisé toutes les `interval` secondes dans un thread,
+    servi depuis des réponses précalculées (un accès dictionnaire par requête)
+    Les champs stables jusqu'au redémarrage restent dans le cache du manager:
+    une actualisation ne relit que les champs expirés
+    """
+
+    def __init__(self, manager, interval: float = DEFAULT_INTERVAL,
+                 deadline: Optional[float] = None):
+        self.manager = manager
+        self.interval = interval
+        self.deadline = deadline
+        self._lock = threading.Lock()
+        self._resources = {}
+        # Incrémenté à chaque changement de l'inventaire servi
+        self.generation = 0
+        self.refreshes = 0
+        self.changed_at = None
+        self.server = None
+        self._stop = threading.Event()
+        self._threads = []
+
+    def refresh(self) -> bool:
+        """Collecte l'inventaire; retourne True s'il a changé"""
+        info = self.manager.get_all_hwid_info(deadline=self.deadline)
+        resources = render(info)
+        with self._lock:
+            self.refreshes += 1
+            previous = self._resources.get("/snapshot")
+            if previous is not None and previous[1] == resources["/snapshot"][1]:
+                return False
+            self._resources = resources
+            self.generation += 1
+            self.changed_at = time.time()
+        return True
+
+    def resource(self, path: str) -> Optional[Tuple[bytes, str]]:
+        """(corps, ETag) d'une ressource, None si elle n'existe pas"""
+        path = path.rstrip("/") or "/snapshot"
+        if path.startswith("/fields/"):
+            from hwid_manager import resolve_field
+            try:
+                path = field_path(resolve_field(path[len("/fields/"):]))
+            except argparse.ArgumentTypeError:
+                return None
+        with self._lock:
+            return self._resources.get(path)
+
+    @property
+    def ready(self) -> bool:
+        with self._lock:
+            return bool(self._resources)
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # L'inventaire précédent reste servi
+                print(f"❌ Erreur lors de l'actualisation: {str(e)}", file=sys.stderr)
+
+    def bind(self, port: Optional[int] = DEFAULT_PORT, unix_path: Optional[str] = None):
+        """Ouvre le socket d'écoute (port 0 = port libre choisi par le système)"""
+        if unix_path is not None:
+            # AF_UNIX peut exister sans UnixStreamServer (Windows)
+            if _UnixHTTPServer is None:
+                raise OSError("sockets Unix indisponibles sur ce système")
+            _remove_stale_socket(unix_path)
+            # Les droits sont posés entre bind() et listen(): tant que le socket
+            # n'écoute pas, aucune connexion n'aboutit, quel que soit le umask
+            # (que l'on ne modifie pas, il est partagé par tous les threads)
+            self.server = _UnixHTTPServer(unix_path, _Handler, bind_and_activate=False)
+            try:
+                self.server.server_bind()
+                os.chmod(unix_path, UNIX_SOCKET_MODE)
+                self.server.server_activate()
+            except BaseException:
+                self.server.server_close()
+                self.server = None
+                raise
+        else:
+            self.server = ThreadingHTTPServer((LOCAL_HOST, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.inventory = self
+        return self.server.server_address
+
+    def start(self):
+        """Première collecte, puis service et actualisation en arrière-plan"""
+        if self.server is None:
+            self.bind()
+        self.refresh()
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._refresh_loop, daemon=True),
+                         threading.Thread(target=self.server.serve_forever, daemon=True)]
+        for thread in self._threads:
+            thread.start()
+
+    def serve_forever(self):
+        """Sert jusqu'à l'interruption (Ctrl+C)"""
+        self.start()
+        try:
+            while not self._stop.wait(1.0):
+                pass
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        self._stop.set()
+        if self.server is not None:
+            if self._threads:
+                # shutdown() attend la fin de serve_forever: seulement s'il a démarré
+                self.server.shutdown()
+            self.server.server_close()
+            if isinstance(self.server.server_address, str):
+                try:
+                    os.unlink(self.server.server_address)
+                except OSError:
+                    pass
+            self.server = None
+        for thread in self._threads:
+            thread.join(timeout=5.0)
+        self._threads = []
+
+
+if hasattr(socketserver, "UnixStreamServer"):
+    class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        """Serveur HTTP sur socket Unix"""
+        daemon_threads = True
+else:
+    _UnixHTTPServer = None
+
+
+def _remove_stale_socket(path: str):
+    """Supprime le socket laissé par une exécution précédente; tout autre
+    fichier présent à cet emplacement est conservé et le démarrage refusé"""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise FileExistsError(f"{path} existe et n'est pas un socket, il n'est pas remplacé")
+    os.unlink(path)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Requêtes GET/HEAD en lecture seule sur l'inventaire du service"""
+
+    server_version = "HWIDDaemon/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def address_string(self) -> str:
+        # Client d'un socket Unix: pas d'adresse
+        return self.client_address[0] if self.client_address else "local"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, code: int, body: bytes = b"", etag: Optional[str] = None, head: bool = False):
+        self.send_response(code)
+        if etag is not None:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        if code != 304:
+            self.send_header("Content-Type", _JSON_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+        changed_at = self.server.inventory.changed_at
+        if changed_at is not None:
+            self.send_header("Last-Modified", formatdate(changed_at, usegmt=True))
+        self.end_headers()
+        if body and code != 304 and not head:
+            self.wfile.write(body)
+
+    def _error(self, code: int, message: str, head: bool = False):
+        body = json.dumps({"error": message}, ensure_ascii=False).encode('utf-8')
+        self._send(code, body, head=head)
+
+    def do_GET(self, head: bool = False):
+        inventory = self.server.inventory
+        if not inventory.ready:
+            self._error(503, "inventaire pas encore collecté", head)
+            return
+        found = inventory.resource(unquote(urlsplit(self.path).path))
+        if found is None:
+            self._error(404, f"ressource inconnue: {self.path}", head)
+            return
+        body, etag = found
+        candidates = [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]
+        if etag in candidates or "*" in candidates:
+            self._send(304, etag=etag)
+            return
+        self._send(200, body, etag, head)
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """Connexion HTTP vers un socket Unix"""
+
+    def __init__(self, path: str, timeout: float = 10.0):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def query(path: str, port: int = DEFAULT_PORT, unix_path: Optional[str] = None,
+          etag: Optional[str] = None, timeout: float = 10.0
+          ) -> Tuple[int, Optional[str], Optional[Dict]]:
+    """
+    Interroge le service: retourne (code HTTP, ETag, document JSON)
+    Avec etag, le document vaut None si la ressource n'a pas changé (304)
+    """
+    if unix_path is not None:
+        connection = _UnixHTTPConnection(unix_path, timeout)
+    else:
+        connection = http.client.HTTPConnection(LOCAL_HOST, port, timeout=timeout)
+    try:
+        headers = {"If-None-Match": etag} if etag else {}
+        connection.request("GET", path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        document = json.loads(body.decode('utf-8')) if body else None
+        return response.status, response.getheader("ETag"), document
+    finally:
+        connection.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande du service"""
+    from hwid_fingerprint import FINGERPRINT_VERSION, SUPPORTED_VERSIONS
+
+    parser = argparse.ArgumentParser(description="Service d'inventaire HWID local (lecture seule)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "Lance le service"), ("get", "Interroge le service")):
+        command = commands.add_parser(name, help=help_text)
+        address = command.add_mutually_exclusive_group()
+        address.add_argument("--port", type=int, default=DEFAULT_PORT,
+                             help=f"Port TCP sur {LOCAL_HOST} (0 = port libre)")
+        address.add_argument("--unix", metavar="CHEMIN", help="Socket Unix")
+
+    serve = commands.choices["serve"]
+    serve.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                       help="Intervalle d'actualisation (secondes)")
+    serve.add_argument("--deadline", type=float, default=None,
+                       help="Durée maximale d'une collecte (secondes)")
+    serve.add_argument("--fixture", help="Sert une fixture JSON au lieu de la machine (tests)")
+    serve.add_argument("--fingerprint-version", type=int, choices=SUPPORTED_VERSIONS,
+                       default=FINGERPRINT_VERSION, help="Version du HWID composite")
+
+    get = commands.choices["get"]
+    get.add_argument("path", nargs="?", default="/snapshot", help="Ressource (défaut: /snapshot)")
+    get.add_argument("--etag", help="ETag déjà connu (réponse 304 si inchangé)")
+    args = parser.parse_args(argv)
+
+    if args.command == "get":
+        try:
+            status, etag, document = query(args.path, args.port, args.unix, args.etag)
+        except OSError as e:
+            print(f"❌ Service injoignable: {str(e)}", file=sys.stderr)
+            return 2
+        print(f"{status} ETag: {etag}", file=sys.stderr)
+        if document is not None:
+            print(json.dumps(document, ensure_ascii=False, indent=2))
+        return 0 if status in (200, 304) else 1
+
+    from hwid_cache import SnapshotCache
+    from hwid_manager import HWIDManager
+    from hwid_providers import FixtureProvider
+
+    provider = FixtureProvider(args.fixture) if args.fixture else None
+    manager = HWIDManager(cache=SnapshotCache(), provider=provider,
+                          fingerprint_version=args.fingerprint_version)
+    daemon = InventoryDaemon(manager, interval=args.interval, deadline=args.deadline)
+    try:
+        address = daemon.bind(args.port, args.unix)
+    except OSError as e:
+        print(f"❌ Impossible d'ouvrir le socket: {str(e)}", file=sys.stderr)
+        return 2
+    where = address if isinstance(address, str) else f"http://{address[0]}:{address[1]}"
+    print(f"✅ Service d'inventaire à l'écoute: {where}", file=sys.stderr, flush=True)
+    try:
+        daemon.serve_forever()
+    finally:
+        manager.provider.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Empreinte composite versionnée
+Version 2: chaque composant est encodé de façon canonique (longueurs préfixées,
+statut explicite) et haché séparément; la racine est le hash des feuilles.
+Après la modification d'un composant, seuls sa feuille et la racine sont recalculés.
+Version 1 (historique): SHA-256 de la concaténation des valeurs, sans séparateur
+"""
+
+import hashlib
+import struct
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from hwid_snapshot import (HWIDSnapshot, STATUS_ERROR, STATUS_MISSING, STATUS_OK,
+                           STATUS_TIMEOUT, TIMEOUT_VALUE, parse_value)
+
+# Composants utilisés pour le HWID composite (ordre significatif)
+COMPOSITE_COMPONENTS = (
+    "Machine GUID",
+    "CPU ID",
+    "Disk Serial",
+    "Motherboard Serial",
+    "MAC Address"
+)
+
+# Versions de l'empreinte composite: recette historique et empreinte par composant
+LEGACY_VERSION = 1
+TREE_VERSION = 2
+SUPPORTED_VERSIONS = (LEGACY_VERSION, TREE_VERSION)
+
+# Version affichée par défaut (HWID composite de get_all_hwid_info, du menu, de
+# l'interface, du service et de --json): la recette historique, pour que le HWID
+# des installations existantes ne change pas. La version 2 s'active avec
+# --fingerprint-version 2 (ou HWIDManager(fingerprint_version=2))
+FINGERPRINT_VERSION = LEGACY_VERSION
+
+_LEAF_DOMAIN = b"hwid-leaf"
+_ROOT_DOMAIN = b"hwid-root"
+
+
+def _as_values(components) -> Mapping[str, Optional[str]]:
+    """Accepte un dictionnaire de valeurs affichables ou un HWIDSnapshot"""
+    if isinstance(components, HWIDSnapshot):
+        return {name: components.display(name) for name in COMPOSITE_COMPONENTS}
+    return components
+
+
+def _prefixed(data: bytes) -> bytes:
+    return struct.pack("<I", len(data)) + data
+
+
+def encode_leaf(name: str, value: Optional[str], version: int = TREE_VERSION) -> bytes:
+    """Encodage canonique d'un composant: domaine, version, nom, statut, valeur"""
+    status, parsed = parse_value(value)
+    payload = parsed.encode('utf-8') if status == STATUS_OK else b""
+    return b"".join((
+        _prefixed(_LEAF_DOMAIN),
+        struct.pack("<B", version),
+        _prefixed(name.encode('utf-8')),
+        struct.pack("<B", status),
+        _prefixed(payload)
+    ))
+
+
+def leaf_digest(name: str, value: Optional[str], version: int = TREE_VERSION) -> bytes:
+    """Hash d'un composant"""
+    return hashlib.sha256(encode_leaf(name, value, version)).digest()
+
+
+def root_digest(leaves: List[bytes], version: int = TREE_VERSION) -> bytes:
+    """Hash racine à partir des feuilles, dans l'ordre de COMPOSITE_COMPONENTS"""
+    header = _prefixed(_ROOT_DOMAIN) + struct.pack("<BI", version, len(leaves))
+    return hashlib.sha256(header + b"".join(leaves)).digest()
+
+
+def blockers(components) -> Tuple[List[str], List[str]]:
+    """
+    Composants empêchant le calcul de l'empreinte: (hors délai, en erreur ou absents)
+    Les composants non disponibles sont une absence stable et restent hachés
+    """
+    values = _as_values(components)
+    timed_out, failed = [], []
+    for name in COMPOSITE_COMPONENTS:
+        status, _ = parse_value(values.get(name))
+        if status == STATUS_TIMEOUT:
+            timed_out.append(name)
+        elif status in (STATUS_ERROR, STATUS_MISSING):
+            failed.append(name)
+    return timed_out, failed
+
+
+def fingerprint(components, version: int = FINGERPRINT_VERSION) -> Optional[str]:
+    """
+    Empreinte composite hexadécimale d'un ensemble de composants
+    (dictionnaire de valeurs affichables ou HWIDSnapshot), sans aucune collecte;
+    None si un composant est en erreur, hors délai ou absent
+    """
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Version d'empreinte inconnue: {version}")
+    values = _as_values(components)
+    timed_out, failed = blockers(values)
+    if timed_out or failed:
+        return None
+    if version == LEGACY_VERSION:
+        # Combine tous les composants et crée un hash
+        combined = ''.join(str(values[name]) for name in COMPOSITE_COMPONENTS)
+        return hashlib.sha256(combined.encode()).hexdigest()
+    leaves = [leaf_digest(name, values[name], version) for name in COMPOSITE_COMPONENTS]
+    return root_digest(leaves, version).hex()
+
+
+def composite_hwid(components, version: int = FINGERPRINT_VERSION) -> str:
+    """
+    Valeur affichable du HWID composite: l'empreinte, TIMEOUT_VALUE si un
+    composant est hors délai, ou une valeur "Erreur: ..." qui nomme les
+    composants en erreur
+    """
+    timed_out, failed = blockers(components)
+    if timed_out:
+        return TIMEOUT_VALUE
+    if failed:
+        return f"Erreur: composants en erreur ({', '.join(failed)})"
+    return fingerprint(components, version)
+
+
+class FingerprintTree:
+    """
+    Empreinte incrémentale (version 2 et suivantes)
+    update() ne recalcule que la feuille du composant modifié puis la racine;
+    last_changed indique les composants responsables du dernier changement de racine
+    """
+
+    __slots__ = ("version", "_values", "_leaves", "_root", "last_changed")
+
+    def __init__(self, components=None, version: int = TREE_VERSION):
+        if version == LEGACY_VERSION or version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"Version d'empreinte non incrémentale: {version}")
+        self.version = version
+        self._values = {name: None for name in COMPOSITE_COMPONENTS}
+        self._leaves = {name: leaf_digest(name, None, version) for name in COMPOSITE_COMPONENTS}
+        self._root = None
+        self.last_changed = []
+        if components is not None:
+            self.update_many(components)
+
+    def update(self, name: str, value: Optional[str]) -> bool:
+        """Met à jour un composant; retourne True si la racine a changé"""
+        return bool(self.update_many({name: value}))
+
+    def update_many(self, components) -> List[str]:
+        """
+        Met à jour plusieurs composants et retourne ceux qui ont modifié la racine
+        (liste vide si l'empreinte est inchangée)
+        """
+        values = _as_values(components)
+        changed = []
+        for name in COMPOSITE_COMPONENTS:
+            if name not in values or values[name] == self._values[name]:
+                continue
+            leaf = leaf_digest(name, values[name], self.version)
+            self._values[name] = values[name]
+            if leaf != self._leaves[name]:
+                self._leaves[name] = leaf
+                changed.append(name)
+        if changed or self._root is None:
+            self._root = root_digest([self._leaves[name] for name in COMPOSITE_COMPONENTS],
+                                     self.version)
+        if changed:
+            self.last_changed = changed
+        return changed
+
+    def leaf(self, name: str) -> bytes:
+        return self._leaves[name]
+
+    @property
+    def complete(self) -> bool:
+        """Vrai si tous les composants permettent de calculer l'empreinte"""
+        timed_out, failed = blockers(self._values)
+        return not timed_out and not failed
+
+    def hexdigest(self) -> Optional[str]:
+        """Racine hexadécimale, ou None si un composant bloque le calcul"""
+        return self._root.hex() if self.complete else None
+
+    def diff(self, other: "FingerprintTree") -> List[str]:
+        """Composants dont les feuilles diffèrent entre deux arbres"""
+        return [name for name in COMPOSITE_COMPONENTS if self._leaves[name] != other._leaves[name]]
+
+    def values(self) -> Dict[str, Optional[str]]:
+        return dict(self._values)
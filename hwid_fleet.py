@@ -0,0 +1,847 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Analyses de parc
+Traitements en flux sur des inventaires NDJSON (hwid_manager.py --ndjson) ou
+un magasin hwid_store.py, avec une mémoire bornée quel que soit le volume.
+
+Usage:
+    python hwid_fleet.py duplicates parc/ [-f machine-guid -f product-id] [--min-count 2]
+    python hwid_manager.py --ndjson | python hwid_fleet.py duplicates -
+    python hwid_fleet.py sort hier.ndjson -o hier.trie.ndjson [--key machine-guid]
+    python hwid_fleet.py diff hier.trie.ndjson aujourdhui.trie.ndjson [--key machine-guid]
+    python hwid_fleet.py diff avant.json apres.json --by-position
+    python hwid_fleet.py recompute parc/ -o empreintes.ndjson [--workers 8]
+    python hwid_fleet.py match parc/ --assets actifs/ [-k 3] [--link]
+"""
+
+import argparse
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hwid_fingerprint import (COMPOSITE_COMPONENTS, FINGERPRINT_VERSION, SUPPORTED_VERSIONS,
+                              composite_hwid)
+from hwid_snapshot import (HWID_FIELDS, STATUS_ERROR, STATUS_MISSING, STATUS_OK, STATUS_TIMEOUT,
+                           parse_value)
+from hwid_store import FleetStore, HashTable, MAX_LOAD, format_timestamp
+
+# Identifiants qu'une image clonée (Sysprep oublié, modèle de VM) duplique
+CLONE_FIELDS = ("Machine GUID", "Windows Product ID")
+
+# Nombre maximal de couples (valeur, machine) gardés en mémoire avant débordement sur disque
+DEFAULT_MAX_KEYS = 1000000
+
+# Nombre de machines citées par groupe de doublons
+DEFAULT_SAMPLES = 10
+
+# Nombre de partitions créées à chaque débordement
+SPILL_PARTITIONS = 64
+
+# Profondeur maximale de repartitionnement d'une partition trop grande
+MAX_SPILL_DEPTH = 3
+
+# Champ utilisé pour nommer une machine dans les rapports
+LABEL_FIELD = "Computer Name"
+
+# Champs qui distinguent deux machines dans la recherche de doublons: un poste
+# inventorié plusieurs fois (hwid_manager.py --ndjson -n 0) ne compte qu'une
+# fois, alors qu'un clone garde le Machine GUID de son modèle mais pas sa carte réseau
+MACHINE_FIELDS = ("Computer Name", "MAC Address")
+
+# Nombre minimal de composants concordants pour rattacher un inventaire à un actif
+DEFAULT_MATCH_K = 3
+
+# Au-delà de ce nombre d'actifs, une valeur est trop commune pour désigner un actif
+# (modèle de CPU répandu...): elle n'est plus indexée ni utilisée pour la recherche
+DEFAULT_MAX_POSTINGS = 64
+
+# Valeurs sans pouvoir discriminant (BIOS non renseigné, adresses nulles...)
+JUNK_VALUES = frozenset((
+    "", "0", "NONE", "N/A", "NA", "NULL", "UNKNOWN", "DEFAULT STRING",
+    "TO BE FILLED BY O.E.M.", "O.E.M.", "OEM", "SYSTEM SERIAL NUMBER",
+    "NOT APPLICABLE", "NOT SPECIFIED", "0123456789", "123456789",
+    "00000000", "FFFFFFFF", "00:00:00:00:00:00", "FF:FF:FF:FF:FF:FF",
+    "00000000-0000-0000-0000-000000000000", "FFFFFFFF-FFFF-FFFF-FFFF-FFFFFFFFFFFF"
+))
+
+# Clé de rapprochement par défaut de deux inventaires de parc
+DEFAULT_DIFF_KEY = "Machine GUID"
+
+# Nombre d'inventaires triés en mémoire avant écriture d'une séquence sur disque
+DEFAULT_SORT_RUN = 200000
+
+# Nombre d'inventaires traités par tâche lors d'un recalcul parallèle
+DEFAULT_CHUNK_SIZE = 20000
+
+ASSETS_FILE = "assets.dat"
+POSTINGS_FILE = "postings.idx"
+COUNTS_FILE = "counts.idx"
+
+
+def iter_records(source: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Parcourt les inventaires complets d'une source: (numéro, {champ: valeur affichable})
+    source: répertoire d'un magasin (numéro d'enregistrement), fichier NDJSON ou
+    "-" pour l'entrée standard (numéro de ligne), document JSON (hwid_manager.py --json)
+    """
+    if os.path.isdir(source):
+        with FleetStore(source, readonly=True, indexed=False) as store:
+            for number in range(len(store)):
+                record = {"Timestamp": format_timestamp(store.timestamp(number))}
+                record.update(store.info(number))
+                yield number, record
+        return
+    if source.endswith(".json"):
+        with open(source, 'r', encoding='utf-8') as f:
+            document = json.load(f)
+        yield from enumerate(document if isinstance(document, list) else [document], 1)
+        return
+    stream = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+    try:
+        for line_number, line in enumerate(stream, 1):
+            line = line.strip()
+            if line:
+                yield line_number, json.loads(line)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def record_label(number: int, record: Dict[str, str]) -> str:
+    """Nom de la machine d'un inventaire (son numéro à défaut)"""
+    status, label = parse_value(record.get(LABEL_FIELD))
+    return label if status == STATUS_OK else f"#{number}"
+
+
+def machine_key(number: int, record: Dict[str, str]) -> str:
+    """Identité de la machine d'un inventaire (MACHINE_FIELDS, son numéro à défaut)"""
+    parts = [value if status == STATUS_OK else ""
+             for status, value in (parse_value(record.get(name)) for name in MACHINE_FIELDS)]
+    return "\0".join(parts) if any(parts) else f"#{number}"
+
+
+def record_values(record: Dict[str, str], names: Iterable[str]) -> Dict[str, str]:
+    """Valeurs obtenues des champs demandés"""
+    values = {}
+    for name in names:
+        status, value = parse_value(record.get(name))
+        if status == STATUS_OK:
+            values[name] = value
+    return values
+
+
+def iter_inventories(source: str, fields: Optional[Iterable[str]] = None
+                     ) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    Parcourt les inventaires d'une source: (nom de la machine, {champ: valeur})
+    Seules les valeurs obtenues des champs demandés sont retournées
+    """
+    names = list(HWID_FIELDS if fields is None else fields)
+    for number, record in iter_records(source):
+        yield record_label(number, record), record_values(record, names)
+
+
+class DuplicateFinder:
+    """
+    Regroupe les machines par valeur d'identifiant en une seule passe
+    Chaque valeur distincte garde le hash (64 bits) des machines qui la portent
+    et au plus `samples` noms de machines: plusieurs inventaires d'une même
+    machine ne comptent qu'une fois. Au-delà de max_keys couples (valeur,
+    machine) en mémoire, les groupes sont répartis par hash dans des partitions
+    sur disque, puis chaque partition est fusionnée seule
+    """
+
+    def __init__(self, fields: Iterable[str] = CLONE_FIELDS, max_keys: int = DEFAULT_MAX_KEYS,
+                 samples: int = DEFAULT_SAMPLES, spill_dir: Optional[str] = None, depth: int = 0):
+        self.fields = tuple(fields)
+        self.max_keys = max_keys
+        self.samples = samples
+        self.spill_dir = spill_dir
+        self.depth = depth
+        self.spills = 0
+        self._groups = {}
+        # Couples (valeur, machine) en mémoire
+        self._entries = 0
+        self._directory = None
+        self._partitions = None
+
+    @staticmethod
+    def _machine_hash(machine: str) -> int:
+        return int.from_bytes(hashlib.blake2b(machine.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    def add(self, label: str, values: Dict[str, str], machine: Optional[str] = None):
+        """
+        Ajoute l'inventaire d'une machine
+        machine: identité de la machine (machine_key), par défaut son nom
+        """
+        machine_hash = self._machine_hash(label if machine is None else machine)
+        for field in self.fields:
+            value = values.get(field)
+            if value is not None:
+                self._merge(field, value, (machine_hash,), (label,))
+
+    def _merge(self, field: str, value: str, machines: Iterable[int], labels: Iterable[str]):
+        group = self._groups.get((field, value))
+        if group is None:
+            group = self._groups[(field, value)] = [set(), []]
+        added = False
+        for machine_hash in machines:
+            if machine_hash not in group[0]:
+                group[0].add(machine_hash)
+                self._entries += 1
+                added = True
+        # Une machine déjà comptée n'ajoute pas de nom
+        if not added:
+            return
+        for label in labels:
+            if len(group[1]) >= self.samples:
+                break
+            if label not in group[1]:
+                group[1].append(label)
+        if self._entries >= self.max_keys and self.depth < MAX_SPILL_DEPTH:
+            self._spill()
+
+    def _partition(self, field: str, value: str) -> int:
+        # Hash différent à chaque profondeur pour que les partitions se redivisent
+        key = f"{self.depth}\0{field}\0{value}".encode('utf-8')
+        return zlib.crc32(key) % SPILL_PARTITIONS
+
+    def _spill(self):
+        """Écrit les groupes en mémoire dans les partitions sur disque"""
+        if self._partitions is None:
+            self._directory = tempfile.mkdtemp(prefix="hwid_dup_", dir=self.spill_dir)
+            self._partitions = [open(os.path.join(self._directory, f"{i:02d}.ndjson"), 'w', encoding='utf-8')
+                                for i in range(SPILL_PARTITIONS)]
+        for (field, value), (machines, labels) in self._groups.items():
+            self._partitions[self._partition(field, value)].write(
+                json.dumps([field, value, sorted(machines), labels], ensure_ascii=False) + "\n")
+        self._groups.clear()
+        self._entries = 0
+        self.spills += 1
+
+    def clusters(self, min_count: int = 2) -> Iterator[Dict]:
+        """Groupes d'au moins min_count machines partageant une valeur (non triés)"""
+        if self._partitions is None:
+            for (field, value), (machines, labels) in self._groups.items():
+                if len(machines) >= min_count:
+                    yield {"Field": field, "Value": value, "Count": len(machines), "Machines": labels}
+            return
+        self._spill()
+        for partition in self._partitions:
+            partition.close()
+        try:
+            for partition in self._partitions:
+                merged = DuplicateFinder(self.fields, self.max_keys, self.samples,
+                                         self._directory, self.depth + 1)
+                with open(partition.name, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        field, value, machines, labels = json.loads(line)
+                        merged._merge(field, value, machines, labels)
+                os.remove(partition.name)
+                yield from merged.clusters(min_count)
+                self.spills += merged.spills
+        finally:
+            self.close()
+
+    def close(self):
+        """Supprime les partitions sur disque"""
+        if self._partitions is not None:
+            for partition in self._partitions:
+                partition.close()
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._partitions = None
+
+
+def component_hash(field: str, value: Optional[str]) -> int:
+    """
+    Hash 64 bits d'une valeur de composant (0 si absente ou sans pouvoir discriminant)
+    Le champ fait partie du hash: deux composants ne se confondent pas
+    """
+    if value is None:
+        return 0
+    normalized = value.strip().upper()
+    if field == "MAC Address":
+        normalized = normalized.replace('-', ':')
+    if normalized in JUNK_VALUES:
+        return 0
+    digest = hashlib.blake2b(bytes((HWID_FIELDS.index(field),)) + normalized.encode('utf-8'),
+                             digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+class AssetMatcher:
+    """
+    Rattachement tolérant d'inventaires à des actifs: un inventaire désigne un
+    actif connu si au moins k des n composants concordent (un disque ou une carte
+    réseau remplacé ne rompt pas la continuité de l'actif).
+    Index inversé persistant (hash de valeur -> actifs) et hash des composants de
+    chaque actif; les valeurs trop communes ne sont pas indexées, si bien qu'une
+    recherche ne lit que quelques listes courtes quel que soit le nombre d'actifs
+    """
+
+    def __init__(self, path: Optional[str] = None, k: int = DEFAULT_MATCH_K,
+                 components: Iterable[str] = COMPOSITE_COMPONENTS,
+                 max_postings: int = DEFAULT_MAX_POSTINGS, expected_assets: int = 0):
+        """
+        path: répertoire de l'index (temporaire et supprimé à la fermeture si None)
+        expected_assets: dimensionne les tables pour éviter les agrandissements
+        """
+        self.k = k
+        self.components = tuple(components)
+        self.max_postings = max_postings
+        self._temporary = path is None
+        self.path = tempfile.mkdtemp(prefix="hwid_assets_") if path is None else path
+        os.makedirs(self.path, exist_ok=True)
+        # Hash des composants, n valeurs consécutives par actif
+        self._assets = array('Q')
+        assets_path = os.path.join(self.path, ASSETS_FILE)
+        if os.path.exists(assets_path):
+            with open(assets_path, 'rb') as f:
+                self._assets.frombytes(f.read())
+        capacity = 1024
+        while capacity * MAX_LOAD < expected_assets * len(self.components):
+            capacity *= 2
+        self._postings = HashTable(os.path.join(self.path, POSTINGS_FILE), capacity=capacity)
+        self._counts = HashTable(os.path.join(self.path, COUNTS_FILE), capacity=capacity)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._assets) // len(self.components)
+
+    def _hashes(self, values: Dict[str, str]) -> List[int]:
+        return [component_hash(name, values.get(name)) for name in self.components]
+
+    def _index(self, asset: int, hashes: Iterable[int]):
+        for value in hashes:
+            if not value:
+                continue
+            count = self._counts.get(value) or 0
+            self._counts.put(value, count + 1)
+            if count < self.max_postings:
+                self._postings.insert(value, asset)
+
+    def add(self, values: Dict[str, str]) -> int:
+        """Enregistre un nouvel actif et retourne son numéro"""
+        asset = len(self)
+        hashes = self._hashes(values)
+        self._assets.extend(hashes)
+        self._index(asset, hashes)
+        return asset
+
+    def update(self, asset: int, values: Dict[str, str]):
+        """Remplace les composants d'un actif (les nouvelles valeurs sont indexées)"""
+        n = len(self.components)
+        hashes = self._hashes(values)
+        stored = self._assets[asset * n:(asset + 1) * n]
+        self._index(asset, [new for new, old in zip(hashes, stored) if new != old])
+        self._assets[asset * n:(asset + 1) * n] = array('Q', hashes)
+
+    def match(self, values: Dict[str, str]) -> Optional[Tuple[int, List[str]]]:
+        """
+        Actif ayant le plus de composants concordants (au moins k), avec la liste
+        de ces composants; None si aucun actif ne convient
+        """
+        hashes = self._hashes(values)
+        candidates = set()
+        for value in hashes:
+            if not value or (self._counts.get(value) or 0) > self.max_postings:
+                continue
+            candidates.update(self._postings.find(value))
+        n = len(self.components)
+        best = None
+        for asset in candidates:
+            stored = self._assets[asset * n:(asset + 1) * n]
+            agreed = [name for name, mine, theirs in zip(self.components, hashes, stored)
+                      if mine and mine == theirs]
+            if len(agreed) >= self.k and (best is None or (len(agreed), asset) > (len(best[1]), best[0])):
+                best = (asset, agreed)
+        return best
+
+    def link(self, values: Dict[str, str]) -> Tuple[int, List[str], bool]:
+        """
+        Rattache un inventaire: (actif, composants concordants, nouvel actif)
+        L'actif rattaché adopte les composants de l'inventaire
+        """
+        found = self.match(values)
+        if found is None:
+            return self.add(values), [], True
+        asset, agreed = found
+        self.update(asset, values)
+        return asset, agreed, False
+
+    def flush(self):
+        temporary = os.path.join(self.path, ASSETS_FILE + ".tmp")
+        with open(temporary, 'wb') as f:
+            self._assets.tofile(f)
+        os.replace(temporary, os.path.join(self.path, ASSETS_FILE))
+        self._postings.flush()
+        self._counts.flush()
+
+    def close(self):
+        if self._temporary:
+            self._postings.close()
+            self._counts.close()
+            shutil.rmtree(self.path, ignore_errors=True)
+            return
+        self.flush()
+        self._postings.close()
+        self._counts.close()
+
+
+# Magasins ouverts par chaque processus de recalcul (un par chemin)
+_worker_stores = {}
+
+
+def _close_worker_stores():
+    """Ferme les magasins ouverts par les tâches de recalcul de ce processus"""
+    while _worker_stores:
+        _, store = _worker_stores.popitem()
+        store.close()
+
+
+def _init_recompute_worker():
+    """
+    Initialisation d'un processus du pool de recalcul: ses magasins sont fermés
+    à sa sortie (les processus du pool ne passent pas par atexit)
+    """
+    from multiprocessing import util
+    util.Finalize(None, _close_worker_stores, exitpriority=10)
+
+
+def _recompute_records(path: str, start: int, stop: int, version: int) -> str:
+    """Tâche de recalcul: empreintes des enregistrements [start, stop) d'un magasin"""
+    store = _worker_stores.get(path)
+    if store is None:
+        store = _worker_stores[path] = FleetStore(path, readonly=True, indexed=False)
+    lines = []
+    for number in range(start, stop):
+        info = store.info(number)
+        lines.append(json.dumps({"Record": number,
+                                 "Machine": info.get(LABEL_FIELD),
+                                 "Version": version,
+                                 "Composite HWID": composite_hwid(info, version)},
+                                ensure_ascii=False))
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def _recompute_lines(first: int, lines: List[str], version: int) -> str:
+    """Tâche de recalcul: empreintes d'un bloc de lignes NDJSON"""
+    output = []
+    for number, line in enumerate(lines, first):
+        line = line.strip()
+        if not line:
+            continue
+        record = json.loads(line)
+        output.append(json.dumps({"Line": number,
+                                  "Machine": record.get(LABEL_FIELD),
+                                  "Version": version,
+                                  "Composite HWID": composite_hwid(record, version)},
+                                 ensure_ascii=False))
+    return "\n".join(output) + "\n" if output else ""
+
+
+def _recompute_tasks(source: str, chunk_size: int, version: int) -> Iterator[Tuple]:
+    """Tâches (fonction, arguments...) couvrant toute la source, dans l'ordre"""
+    if os.path.isdir(source):
+        with FleetStore(source, readonly=True, indexed=False) as store:
+            total = len(store)
+        for start in range(0, total, chunk_size):
+            yield _recompute_records, source, start, min(start + chunk_size, total), version
+        return
+    if source.endswith(".json"):
+        # Document JSON (hwid_manager.py --json): lu en entier comme par iter_records
+        lines = [json.dumps(record, ensure_ascii=False) for _, record in iter_records(source)]
+        for start in range(0, len(lines), chunk_size):
+            yield _recompute_lines, start + 1, lines[start:start + chunk_size], version
+        return
+    stream = sys.stdin if source == "-" else open(source, 'r', encoding='utf-8')
+    try:
+        first = 1
+        chunk = []
+        for line in stream:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield _recompute_lines, first, chunk, version
+                first += len(chunk)
+                chunk = []
+        if chunk:
+            yield _recompute_lines, first, chunk, version
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def recompute(source: str, output, version: int = FINGERPRINT_VERSION,
+              workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[int, float]:
+    """
+    Recalcule hors ligne le HWID composite de chaque inventaire archivé (aucune
+    collecte sur la machine locale) et écrit une ligne NDJSON par inventaire,
+    dans l'ordre de la source. Les blocs sont répartis sur un pool de processus;
+    au plus deux blocs par processus sont en attente, la mémoire reste bornée.
+    Retourne (nombre d'inventaires, durée en secondes)
+    """
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    count = 0
+    tasks = _recompute_tasks(source, chunk_size, version)
+    if workers <= 1:
+        try:
+            for task, *args in tasks:
+                block = task(*args)
+                output.write(block)
+                count += block.count("\n")
+        finally:
+            _close_worker_stores()
+        return count, time.perf_counter() - start
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_recompute_worker) as pool:
+        pending = deque()
+        for task, *args in tasks:
+            pending.append(pool.submit(task, *args))
+            if len(pending) >= 2 * workers:
+                block = pending.popleft().result()
+                output.write(block)
+                count += block.count("\n")
+        while pending:
+            block = pending.popleft().result()
+            output.write(block)
+            count += block.count("\n")
+    return count, time.perf_counter() - start
+
+
+def diff_records(old: Dict[str, str], new: Dict[str, str],
+                 fields: Optional[Iterable[str]] = None) -> List[Dict]:
+    """
+    Changements de composants entre deux inventaires d'une même machine
+    added: composant apparu, removed: composant devenu non disponible,
+    changed: valeur modifiée. Un champ en erreur, hors délai ou non collecté
+    d'un côté est inconnu et n'est jamais signalé
+    """
+    events = []
+    for name in (HWID_FIELDS if fields is None else fields):
+        old_status, old_value = parse_value(old.get(name))
+        new_status, new_value = parse_value(new.get(name))
+        if {old_status, new_status} & {STATUS_ERROR, STATUS_TIMEOUT, STATUS_MISSING}:
+            continue
+        before = old_value if old_status == STATUS_OK else None
+        after = new_value if new_status == STATUS_OK else None
+        if before == after:
+            continue
+        if before is None:
+            events.append({"Event": "added", "Field": name, "New": after})
+        elif after is None:
+            events.append({"Event": "removed", "Field": name, "Old": before})
+        else:
+            events.append({"Event": "changed", "Field": name, "Old": before, "New": after})
+    return events
+
+
+def record_key(record: Dict[str, str], key_field: str) -> Optional[str]:
+    """Clé de rapprochement d'un inventaire (None si la valeur n'a pas été obtenue)"""
+    status, value = parse_value(record.get(key_field))
+    return value if status == STATUS_OK else None
+
+
+class UnsortedInput(ValueError):
+    """Source non triée par la clé de rapprochement"""
+
+
+def _key_groups(source: str, key_field: str, skipped: Dict[str, int]
+                ) -> Iterator[Tuple[str, List[Tuple[int, Dict[str, str]]]]]:
+    """Inventaires consécutifs de même clé, en vérifiant l'ordre croissant des clés"""
+    previous = None
+    group = []
+    for number, record in iter_records(source):
+        key = record_key(record, key_field)
+        if key is None:
+            skipped[source] = skipped.get(source, 0) + 1
+            continue
+        if previous is not None and key != previous:
+            if key < previous:
+                raise UnsortedInput(f"{source}: inventaires non triés par {key_field} "
+                                    f"(utilisez 'hwid_fleet.py sort')")
+            yield previous, group
+            group = []
+        previous = key
+        group.append((number, record))
+    if group:
+        yield previous, group
+
+
+def diff_fleets(old_source: str, new_source: str, key_field: str = DEFAULT_DIFF_KEY,
+                fields: Optional[Iterable[str]] = None,
+                skipped: Optional[Dict[str, int]] = None) -> Iterator[Dict]:
+    """
+    Flux de changements entre deux inventaires de parc triés par key_field
+    Jointure par fusion: une seule passe sur chaque source, seuls les inventaires
+    de la clé courante sont en mémoire. Machines apparues ou disparues: événements
+    added/removed sans champ; machines communes: changements de diff_records.
+    skipped reçoit le nombre d'inventaires sans clé ignorés par source
+    """
+    skipped = {} if skipped is None else skipped
+    old_groups = _key_groups(old_source, key_field, skipped)
+    new_groups = _key_groups(new_source, key_field, skipped)
+    old = next(old_groups, None)
+    new = next(new_groups, None)
+    while old is not None or new is not None:
+        if new is None or (old is not None and old[0] < new[0]):
+            for number, record in old[1]:
+                yield {"Event": "removed", "Key": old[0], "Machine": record_label(number, record)}
+            old = next(old_groups, None)
+        elif old is None or new[0] < old[0]:
+            for number, record in new[1]:
+                yield {"Event": "added", "Key": new[0], "Machine": record_label(number, record)}
+            new = next(new_groups, None)
+        else:
+            # Même clé: comparaison deux à deux dans l'ordre des sources
+            for before, after in itertools.zip_longest(old[1], new[1]):
+                if after is None:
+                    yield {"Event": "removed", "Key": old[0], "Machine": record_label(*before)}
+                elif before is None:
+                    yield {"Event": "added", "Key": new[0], "Machine": record_label(*after)}
+                else:
+                    for event in diff_records(before[1], after[1], fields):
+                        yield dict(event, Key=new[0], Machine=record_label(*after))
+            old = next(old_groups, None)
+            new = next(new_groups, None)
+
+
+def diff_by_position(old_source: str, new_source: str,
+                     fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+    """Flux de changements entre inventaires de même rang (snapshots d'une même machine)"""
+    for position, (before, after) in enumerate(
+            itertools.zip_longest(iter_records(old_source), iter_records(new_source)), 1):
+        if after is None:
+            yield {"Event": "removed", "Key": position, "Machine": record_label(*before)}
+        elif before is None:
+            yield {"Event": "added", "Key": position, "Machine": record_label(*after)}
+        else:
+            for event in diff_records(before[1], after[1], fields):
+                yield dict(event, Key=position, Machine=record_label(*after))
+
+
+def sort_records(source: str, output, key_field: str = DEFAULT_DIFF_KEY,
+                 run_size: int = DEFAULT_SORT_RUN, spill_dir: Optional[str] = None) -> int:
+    """
+    Tri externe d'une source par key_field, écrit en NDJSON (entrée de diff_fleets)
+    Séquences triées de run_size inventaires sur disque puis fusion; les
+    inventaires sans clé sont placés en tête. Retourne le nombre d'inventaires
+    """
+    directory = tempfile.mkdtemp(prefix="hwid_sort_", dir=spill_dir)
+    runs = []
+    count = 0
+
+    def sort_key(record):
+        return record_key(record, key_field) or ""
+
+    def write_run(records):
+        records.sort(key=sort_key)
+        path = os.path.join(directory, f"{len(runs):04d}.ndjson")
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        runs.append(path)
+
+    def read_run(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    try:
+        buffer = []
+        for _, record in iter_records(source):
+            buffer.append(record)
+            count += 1
+            if len(buffer) >= run_size:
+                write_run(buffer)
+                buffer = []
+        if not runs:
+            buffer.sort(key=sort_key)
+            merged = buffer
+        else:
+            if buffer:
+                write_run(buffer)
+            merged = heapq.merge(*(read_run(path) for path in runs), key=sort_key)
+        for record in merged:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return count
+
+
+def find_duplicates(source: str, fields: Iterable[str] = CLONE_FIELDS, min_count: int = 2,
+                    max_keys: int = DEFAULT_MAX_KEYS, samples: int = DEFAULT_SAMPLES,
+                    spill_dir: Optional[str] = None) -> Tuple[List[Dict], int]:
+    """
+    Groupes de machines partageant un identifiant, du plus grand au plus petit
+    (machines distinctes au sens de machine_key)
+    Retourne (groupes, nombre d'inventaires lus)
+    """
+    fields = tuple(fields)
+    finder = DuplicateFinder(fields, max_keys, samples, spill_dir)
+    total = 0
+    try:
+        for number, record in iter_records(source):
+            finder.add(record_label(number, record), record_values(record, fields),
+                       machine_key(number, record))
+            total += 1
+        clusters = list(finder.clusters(min_count))
+    finally:
+        finder.close()
+    clusters.sort(key=lambda cluster: (-cluster["Count"], cluster["Field"], cluster["Value"]))
+    return clusters, total
+
+
+def print_duplicates(clusters: List[Dict], total: int, fields: Iterable[str]):
+    """Affiche le rapport des doublons"""
+    print(f"\n🔍 DOUBLONS D'IDENTIFIANTS ({total} inventaires analysés)")
+    print("-" * 60)
+    for field in fields:
+        found = [cluster for cluster in clusters if cluster["Field"] == field]
+        machines = sum(cluster["Count"] for cluster in found)
+        print(f"{field}: {len(found)} groupe(s), {machines} machine(s) concernée(s)")
+        for cluster in found:
+            names = ", ".join(cluster["Machines"])
+            more = "..." if cluster["Count"] > len(cluster["Machines"]) else ""
+            print(f"   {cluster['Count']:>6} x {cluster['Value']}  ({names}{more})")
+    print("-" * 60)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée des analyses de parc"""
+    from hwid_manager import resolve_field
+
+    parser = argparse.ArgumentParser(description="Analyses d'inventaires HWID de parc")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    duplicates = commands.add_parser("duplicates", help="Machines partageant un identifiant")
+    duplicates.add_argument("source", help="Magasin hwid_store.py, fichier NDJSON ou - (entrée standard)")
+    duplicates.add_argument("-f", "--field", dest="fields", action="append", type=resolve_field,
+                            metavar="CHAMP", help="Identifiant analysé (répétable, défaut: "
+                            + ", ".join(CLONE_FIELDS) + ")")
+    duplicates.add_argument("--min-count", type=int, default=2, help="Taille minimale d'un groupe")
+    duplicates.add_argument("--samples", type=int, default=DEFAULT_SAMPLES,
+                            help="Machines citées par groupe")
+    duplicates.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS,
+                            help="Couples (valeur, machine) en mémoire avant débordement sur disque")
+    duplicates.add_argument("--spill-dir", help="Répertoire des fichiers de débordement")
+    duplicates.add_argument("--ndjson", action="store_true", help="Un groupe JSON par ligne")
+
+    diff = commands.add_parser("diff", help="Flux des changements entre deux inventaires")
+    diff.add_argument("old", help="Inventaire de référence (magasin, NDJSON, JSON ou -)")
+    diff.add_argument("new", help="Nouvel inventaire (magasin, NDJSON, JSON ou -)")
+    join = diff.add_mutually_exclusive_group()
+    join.add_argument("--key", type=resolve_field, default=DEFAULT_DIFF_KEY, metavar="CHAMP",
+                      help=f"Clé de rapprochement, sources triées par ce champ (défaut: {DEFAULT_DIFF_KEY})")
+    join.add_argument("--by-position", action="store_true",
+                      help="Compare les inventaires de même rang (une même machine)")
+    diff.add_argument("-f", "--field", dest="fields", action="append", type=resolve_field,
+                      metavar="CHAMP", help="Champ comparé (répétable, tous par défaut)")
+
+    sort = commands.add_parser("sort", help="Trie des inventaires par clé (tri externe)")
+    sort.add_argument("source", help="Magasin hwid_store.py, fichier NDJSON ou - (entrée standard)")
+    sort.add_argument("-o", "--output", default="-", help="Fichier NDJSON produit (- = sortie standard)")
+    sort.add_argument("--key", type=resolve_field, default=DEFAULT_DIFF_KEY, metavar="CHAMP",
+                      help=f"Clé de tri (défaut: {DEFAULT_DIFF_KEY})")
+    sort.add_argument("--run-size", type=int, default=DEFAULT_SORT_RUN,
+                      help="Inventaires triés en mémoire par séquence")
+    sort.add_argument("--spill-dir", help="Répertoire des séquences temporaires")
+
+    recompute_parser = commands.add_parser("recompute", help="Recalcule les HWID composites archivés")
+    recompute_parser.add_argument("source", help="Magasin hwid_store.py, fichier NDJSON ou - (entrée standard)")
+    recompute_parser.add_argument("-o", "--output", default="-", help="Fichier NDJSON produit (- = sortie standard)")
+    recompute_parser.add_argument("--fingerprint-version", type=int, choices=SUPPORTED_VERSIONS,
+                                  default=FINGERPRINT_VERSION, help="Version du HWID composite")
+    recompute_parser.add_argument("--workers", type=int, default=None,
+                                  help="Nombre de processus (défaut: nombre de CPU)")
+    recompute_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                                  help="Inventaires par tâche")
+
+    match = commands.add_parser("match", help="Rattache des inventaires aux actifs connus")
+    match.add_argument("source", help="Magasin hwid_store.py, fichier NDJSON ou - (entrée standard)")
+    match.add_argument("--assets", required=True, help="Répertoire de l'index des actifs")
+    match.add_argument("-k", type=int, default=DEFAULT_MATCH_K,
+                       help=f"Composants concordants requis (sur {len(COMPOSITE_COMPONENTS)})")
+    match.add_argument("--max-postings", type=int, default=DEFAULT_MAX_POSTINGS,
+                       help="Nombre d'actifs au-delà duquel une valeur est ignorée")
+    match.add_argument("--link", action="store_true",
+                       help="Enregistre les nouveaux actifs et met à jour les actifs rattachés")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "duplicates":
+        fields = args.fields or list(CLONE_FIELDS)
+        clusters, total = find_duplicates(args.source, fields, args.min_count,
+                                          args.max_keys, args.samples, args.spill_dir)
+        if args.ndjson:
+            for cluster in clusters:
+                print(json.dumps(cluster, ensure_ascii=False))
+        else:
+            print_duplicates(clusters, total, fields)
+    elif args.command == "diff":
+        skipped = {}
+        if args.by_position:
+            events = diff_by_position(args.old, args.new, args.fields)
+        else:
+            events = diff_fleets(args.old, args.new, args.key, args.fields, skipped)
+        totals = {"added": 0, "removed": 0, "changed": 0}
+        try:
+            for event in events:
+                totals[event["Event"]] += 1
+                print(json.dumps(event, ensure_ascii=False))
+        except UnsortedInput as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+        summary = ", ".join(f"{count} {name}" for name, count in totals.items())
+        ignored = sum(skipped.values())
+        print(f"✅ {summary}" + (f" ({ignored} inventaire(s) sans clé ignoré(s))" if ignored else ""),
+              file=sys.stderr)
+    elif args.command == "sort":
+        output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+        try:
+            count = sort_records(args.source, output, args.key, args.run_size, args.spill_dir)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        print(f"✅ {count} inventaire(s) trié(s) par {args.key}", file=sys.stderr)
+    elif args.command == "recompute":
+        output = sys.stdout if args.output == "-" else open(args.output, 'w', encoding='utf-8')
+        try:
+            count, elapsed = recompute(args.source, output, args.fingerprint_version,
+                                       args.workers, args.chunk_size)
+        finally:
+            if output is not sys.stdout:
+                output.close()
+        rate = count / elapsed if elapsed else 0.0
+        print(f"✅ {count} empreinte(s) v{args.fingerprint_version} recalculée(s) en {elapsed:.2f} s "
+              f"({rate:.0f} inventaires/s)", file=sys.stderr)
+    elif args.command == "match":
+        with AssetMatcher(args.assets, args.k, max_postings=args.max_postings) as matcher:
+            for label, values in iter_inventories(args.source, COMPOSITE_COMPONENTS):
+                if args.link:
+                    asset, agreed, created = matcher.link(values)
+                else:
+                    found = matcher.match(values)
+                    asset, agreed, created = (None, [], False) if found is None else (*found, False)
+                print(json.dumps({"Machine": label, "Asset": asset, "Agreed": agreed, "New": created},
+                                 ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
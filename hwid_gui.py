@@ -5,23 +5,65 @@ Interface utilisateur pour gérer et modifier le Hardware ID
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
+import os
 import threading
+import queue
 from hwid_manager import HWIDManager
-import uuid
+from hwid_cache import SnapshotCache, default_cache_path
+from hwid_log import DEFAULT_MAX_LINES, LogBuffer
+
+# Intervalle (ms) de traitement des événements venant des threads de collecte
+UPDATE_INTERVAL_MS = 50
+
+# Intervalle (ms) d'affichage par lots des messages du journal
+LOG_FLUSH_INTERVAL_MS = 200
+
+# Première ligne des champs dans la zone d'informations (après l'en-tête)
+INFO_FIRST_LINE = 5
+
+# Délai (ms) avant la première collecte: la fenêtre et le snapshot en cache
+# s'affichent d'abord, la revalidation démarre ensuite
+STARTUP_REFRESH_DELAY_MS = 250
+
+# Valeur affichée pour un champ dont la collecte est en cours
+PENDING_VALUE = "⏳ Collecte en cours..."
 
 class HWIDManagerGUI:
-    def __init__(self, root):
+    def __init__(self, root, log_lines: int = DEFAULT_MAX_LINES, log_file=None):
+        """
+        log_lines: nombre de lignes conservées dans le journal d'activité
+        log_file: fichier à rotation recevant le journal complet (optionnel)
+        """
         self.root = root
         self.root.title("HWID Manager - Hardware ID Tool")
         self.root.geometry("900x700")
         self.root.configure(bg='#1e1e2e')
         
-        self.manager = HWIDManager()
+        self.manager = HWIDManager(cache=SnapshotCache(path=default_cache_path()))
+        # Événements des threads de collecte, traités dans la boucle Tk via after()
+        self._updates = queue.Queue()
+        # Journal borné, alimenté depuis n'importe quel thread et affiché par lots
+        self.journal = LogBuffer(max_lines=log_lines, path=log_file)
+        self._refresh_inflight = False
+        self._refresh_again = False
+        self._layout_ready = False
+        # Champs affichés (intégrés et greffons), dans l'ordre des lignes
+        self._fields = ()
+        # Surveillance des changements matériels (bouton 👁️ Surveiller)
+        self._watcher = None
         self.setup_styles()
         self.create_widgets()
+        self.root.after(UPDATE_INTERVAL_MS, self._process_updates)
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
         
-        # Charge les informations au démarrage
-        self.refresh_info()
+        # Affiche immédiatement le dernier snapshot connu (même boot), puis revalide
+        cached = self.manager.cached_info()
+        if cached is not None:
+            self.display_info(cached)
+            self.log("📦 Informations chargées depuis le cache")
+        
+        # Collecte différée: ne retarde pas le premier affichage
+        self.root.after(STARTUP_REFRESH_DELAY_MS, self.refresh_info)
     
     def setup_styles(self):
         """Configure les styles de l'interface"""
@@ -119,7 +161,7 @@ class HWIDManagerGUI:
         btn_row1 = ttk.Frame(action_frame, style='Dark.TFrame')
         btn_row1.pack(fill=tk.X, pady=5)
         
-        self.create_button(btn_row1, "🔄 Actualiser", self.refresh_info).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
+        self.create_button(btn_row1, "🔄 Actualiser", self.force_refresh).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         self.create_button(btn_row1, "🔧 Modifier GUID", self.modify_guid).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         self.create_button(btn_row1, "🔧 Modifier Product ID", self.modify_product_id).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         
@@ -136,6 +178,8 @@ class HWIDManagerGUI:
         btn_row3.pack(fill=tk.X, pady=5)
         
         self.create_button(btn_row3, "🔐 Relancer en Admin", self.run_as_admin).pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
+        self.watch_button = self.create_button(btn_row3, "👁️ Surveiller", self.toggle_watch)
+        self.watch_button.pack(side=tk.LEFT, padx=5, expand=True, fill=tk.X)
         
         # Frame pour les logs
         log_frame = ttk.LabelFrame(main_frame,
@@ -180,29 +224,140 @@ class HWIDManagerGUI:
         return btn
     
     def log(self, message):
-        """Ajoute un message au journal"""
-        self.log_text.insert(tk.END, f"{message}\n")
-        self.log_text.see(tk.END)
+        """Ajoute un message au journal (appelable depuis n'importe quel thread)"""
+        self.journal.write(message)
+    
+    def _flush_log(self):
+        """
+        Affiche en une fois les messages en attente puis retire du widget les
+        lignes au-delà de la capacité du journal
+        """
+        batch = self.journal.drain()
+        if batch:
+            self.log_text.insert(tk.END, "\n".join(batch) + "\n")
+            lines = int(self.log_text.index('end-1c').split('.')[0]) - 1
+            excess = lines - self.journal.max_lines
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.see(tk.END)
+        self.root.after(LOG_FLUSH_INTERVAL_MS, self._flush_log)
+    
+    def _post(self, kind, *payload):
+        """Transmet un événement au thread Tk (appelable depuis n'importe quel thread)"""
+        self._updates.put((kind, payload))
+    
+    def _process_updates(self):
+        """Traite les événements des threads de collecte dans la boucle Tk"""
+        try:
+            while True:
+                kind, payload = self._updates.get_nowait()
+                if kind == "field":
+                    self._set_field(*payload)
+                elif kind == "refresh":
+                    self.refresh_info()
+                elif kind == "refresh_done":
+                    self._refresh_finished()
+                elif kind == "hwid":
+                    self.show_hwid_dialog(*payload)
+        except queue.Empty:
+            pass
+        self.root.after(UPDATE_INTERVAL_MS, self._process_updates)
     
     def refresh_info(self):
-        """Actualise les informations HWID"""
+        """
+        Actualise les informations HWID sans bloquer l'interface
+        Les demandes reçues pendant une collecte sont regroupées en une seule
+        nouvelle collecte lancée à la fin de la collecte en cours
+        """
+        if threading.current_thread() is not threading.main_thread():
+            self._post("refresh")
+            return
+        
+        if self._refresh_inflight:
+            self._refresh_again = True
+            return
+        
+        self._refresh_inflight = True
+        self._refresh_again = False
         self.log("🔄 Actualisation des informations...")
+        if not self._layout_ready:
+            self.display_info({})
         
         def fetch_info():
-            info = self.manager.get_all_hwid_info()
-            
-            self.info_text.delete(1.0, tk.END)
-            self.info_text.insert(tk.END, "╔" + "═" * 78 + "╗\n")
-            self.info_text.insert(tk.END, "║" + " " * 25 + "INFORMATIONS HWID" + " " * 36 + "║\n")
-            self.info_text.insert(tk.END, "╚" + "═" * 78 + "╝\n\n")
-            
-            for key, value in info.items():
-                self.info_text.insert(tk.END, f"  {key:.<35} {value}\n")
-            
-            self.log("✅ Informations actualisées")
+            try:
+                self.manager.collect(on_field=lambda name, value: self._post("field", name, value),
+                                     deadline=30)
+                self.log("✅ Informations actualisées")
+                self.log(self.manager.metrics.summary())
+            except Exception as e:
+                self.log(f"❌ Erreur lors de l'actualisation: {str(e)}")
+            finally:
+                self._post("refresh_done")
         
         threading.Thread(target=fetch_info, daemon=True).start()
     
+    def _refresh_finished(self):
+        """Fin d'une collecte: relance si des demandes ont été regroupées"""
+        self._refresh_inflight = False
+        if self._refresh_again:
+            self.refresh_info()
+    
+    def force_refresh(self):
+        """Actualise en ignorant le cache"""
+        self.manager.invalidate()
+        self.refresh_info()
+    
+    def toggle_watch(self):
+        """Active ou arrête la surveillance des changements matériels"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+            self.watch_button.config(text="👁️ Surveiller")
+            self.log("⏹️ Surveillance arrêtée")
+            return
+        
+        from hwid_watch import HWIDWatcher, describe_event
+        watcher = self._watcher = HWIDWatcher(self.manager)
+        mode = "signaux du noyau" if watcher.event_driven else "vérifications espacées"
+        self.watch_button.config(text="⏹️ Arrêter la surveillance")
+        self.log(f"👁️ Surveillance active ({mode})")
+        
+        def on_change(events, info):
+            for event in events:
+                self._post("field", event["Field"], info.get(event["Field"]))
+                self.log(describe_event(event))
+        
+        def watch():
+            try:
+                watcher.run(on_change)
+            except Exception as e:
+                self.log(f"❌ Erreur de surveillance: {str(e)}")
+            finally:
+                watcher.close()
+        
+        threading.Thread(target=watch, daemon=True).start()
+    
+    def display_info(self, info):
+        """Affiche les informations HWID (champs manquants: collecte en cours)"""
+        self.info_text.delete(1.0, tk.END)
+        self.info_text.insert(tk.END, "╔" + "═" * 78 + "╗\n")
+        self.info_text.insert(tk.END, "║" + " " * 25 + "INFORMATIONS HWID" + " " * 36 + "║\n")
+        self.info_text.insert(tk.END, "╚" + "═" * 78 + "╝\n\n")
+        
+        self._fields = self.manager.registry.fields()
+        for key in self._fields:
+            value = info.get(key, PENDING_VALUE)
+            self.info_text.insert(tk.END, f"  {key:.<35} {value}\n")
+        self._layout_ready = True
+    
+    def _set_field(self, name, value):
+        """Met à jour la ligne d'un champ dès que son collecteur a terminé"""
+        if name not in self._fields:
+            return
+        line = INFO_FIRST_LINE + self._fields.index(name)
+        self.info_text.delete(f"{line}.0", f"{line}.end")
+        self.info_text.insert(f"{line}.0", f"  {name:.<35} {value}")
+    
     def modify_guid(self):
         """Modifie le Machine GUID"""
         if not self.manager.is_admin():
@@ -230,6 +385,7 @@ class HWIDManagerGUI:
                         font=('Consolas', 10),
                         insertbackground='#89b4fa')
         entry.pack(pady=10)
+        import uuid
         entry.insert(0, str(uuid.uuid4()))
         
         def apply():
@@ -279,6 +435,7 @@ class HWIDManagerGUI:
         entry.pack(pady=10)
         
         # Génère un Product ID au format Windows
+        import uuid
         sample_id = f"{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}"
         entry.insert(0, sample_id)
         
@@ -322,8 +479,17 @@ class HWIDManagerGUI:
     def generate_hwid(self):
         """Génère un nouveau HWID composite"""
         self.log("🔑 Génération d'un nouveau HWID...")
-        hwid = self.manager.generate_composite_hwid()
         
+        def compute():
+            try:
+                self._post("hwid", self.manager.generate_composite_hwid())
+            except Exception as e:
+                self.log(f"❌ Erreur lors de la génération: {str(e)}")
+        
+        threading.Thread(target=compute, daemon=True).start()
+    
+    def show_hwid_dialog(self, hwid):
+        """Affiche le HWID composite généré"""
         dialog = tk.Toplevel(self.root)
         dialog.title("HWID Composite Généré")
         dialog.geometry("600x200")
@@ -521,7 +687,10 @@ class HWIDManagerGUI:
 def main():
     """Lance l'interface graphique"""
     root = tk.Tk()
-    app = HWIDManagerGUI(root)
+    # HWID_GUI_LOG: export du journal complet; HWID_GUI_LOG_LINES: lignes affichées
+    app = HWIDManagerGUI(root,
+                         log_lines=int(os.environ.get("HWID_GUI_LOG_LINES", DEFAULT_MAX_LINES)),
+                         log_file=os.environ.get("HWID_GUI_LOG"))
     root.mainloop()
 
 
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Journal d'activité borné
+LogBuffer conserve les dernières lignes dans un tampon circulaire; les messages
+écrits depuis n'importe quel thread sont mis en attente puis récupérés par lots
+(drain) par le thread d'affichage. Le journal complet peut être exporté vers un
+fichier à rotation (logging.handlers.RotatingFileHandler)
+"""
+
+import collections
+import logging
+import logging.handlers
+import threading
+from typing import List, Optional
+
+# Nombre de lignes conservées par défaut
+DEFAULT_MAX_LINES = 1000
+
+# Rotation du fichier d'export: taille maximale et nombre d'archives
+LOG_FILE_MAX_BYTES = 1024 * 1024
+LOG_FILE_BACKUPS = 3
+
+_FILE_FORMAT = "%(asctime)s %(message)s"
+
+
+class LogBuffer:
+    """
+    Tampon circulaire des messages du journal
+    write() est appelable depuis n'importe quel thread; drain() retourne les
+    messages en attente (au plus max_lines, les plus anciens sont abandonnés)
+    """
+
+    def __init__(self, max_lines: int = DEFAULT_MAX_LINES, path: Optional[str] = None,
+                 max_bytes: int = LOG_FILE_MAX_BYTES, backups: int = LOG_FILE_BACKUPS):
+        if max_lines < 1:
+            raise ValueError("max_lines doit être positif")
+        self.max_lines = max_lines
+        self.lines = collections.deque(maxlen=max_lines)
+        self._pending = collections.deque(maxlen=max_lines)
+        self._lock = threading.Lock()
+        # Messages sortis du tampon depuis la création
+        self.dropped = 0
+        self._handler = None
+        if path is not None:
+            self.export_to(path, max_bytes, backups)
+
+    def export_to(self, path: str, max_bytes: int = LOG_FILE_MAX_BYTES,
+                  backups: int = LOG_FILE_BACKUPS):
+        """Recopie désormais chaque message dans un fichier à rotation"""
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8', delay=True)
+        handler.setFormatter(logging.Formatter(_FILE_FORMAT))
+        with self._lock:
+            previous, self._handler = self._handler, handler
+        if previous is not None:
+            previous.close()
+
+    def write(self, message: str):
+        """Ajoute un message (une entrée par appel, même sur plusieurs lignes)"""
+        message = str(message)
+        with self._lock:
+            if len(self.lines) == self.max_lines:
+                self.dropped += 1
+            self.lines.append(message)
+            self._pending.append(message)
+            handler = self._handler
+        if handler is not None:
+            handler.handle(logging.LogRecord("hwid", logging.INFO, __file__, 0,
+                                             message, None, None))
+
+    def drain(self) -> List[str]:
+        """Retourne et retire les messages en attente d'affichage"""
+        with self._lock:
+            batch = list(self._pending)
+            self._pending.clear()
+        return batch
+
+    def text(self) -> str:
+        """Contenu actuel du tampon"""
+        with self._lock:
+            return "\n".join(self.lines)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.lines)
+
+    def close(self):
+        with self._lock:
+            handler, self._handler = self._handler, None
+        if handler is not None:
+            handler.close()
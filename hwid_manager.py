@@ -4,171 +4,425 @@ HWID Manager - Programme pour afficher et modifier le Hardware ID
 ATTENTION: Utiliser uniquement à des fins éducatives et légales
 """
 
-import subprocess
-import winreg
-import uuid
-import hashlib
-import platform
+import json
 import os
 import sys
-from typing import Dict, List, Optional
+import threading
+import time
+import functools
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from hwid_cache import SnapshotCache, default_cache_path
+from hwid_fingerprint import (COMPOSITE_COMPONENTS, FINGERPRINT_VERSION, SUPPORTED_VERSIONS,
+                              FingerprintTree, blockers, composite_hwid)
+from hwid_metrics import CollectionMetrics, RefreshMetrics, note
+from hwid_snapshot import HWIDSnapshot, STATUS_ERROR, TIMEOUT_VALUE, parse_value
+
+if TYPE_CHECKING:
+    from hwid_collectors import CollectorRegistry, LazySnapshot
+    from hwid_providers import InventoryProvider
+    from hwid_worker import WorkerSession
+
+# Les modules lourds ou propres à Windows (winreg, subprocess, argparse,
+# concurrent.futures...) sont importés par les fonctions qui s'en servent:
+# l'import de ce module et le premier affichage depuis le cache n'en dépendent pas.
+# Le registre des collecteurs (hwid_collectors) et les backends de collecte
+# (hwid_providers, qui charge hwid_worker) le sont à la création du HWIDManager
+
+# Champs lus par la requête CIM groupée sous Windows
+HARDWARE_FIELDS = ("CPU ID", "Disk Serial", "Motherboard Serial")
+
+
+def required_fields(fields: Optional[Iterable[str]] = None) -> set:
+    """Champs à collecter pour produire les champs demandés (tous par défaut)"""
+    from hwid_collectors import REGISTRY
+    return set(REGISTRY.required(fields))
+
+
+class _Flight:
+    """Collecte en cours, partagée par tous les appelants qui l'attendent"""
+
+    __slots__ = ("fields", "done", "result", "error", "waiters")
+
+    def __init__(self, fields: frozenset):
+        self.fields = fields
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Dédoublonnage des collectes concurrentes
+    Un appel dont les champs sont couverts par une collecte déjà en cours attend
+    son résultat au lieu de relancer les processus; sinon il devient le meneur
+    d'une nouvelle collecte. Le meneur publie son résultat (ou son exception)
+    à tous les appelants en attente
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = []
+        # Appels servis par une collecte déjà en cours
+        self.shared = 0
+
+    def do(self, fields: Tuple[str, ...],
+           task: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """Exécute task (ou rejoint une collecte en cours) et retourne les champs demandés"""
+        wanted = frozenset(fields)
+        with self._lock:
+            flight = next((flight for flight in self._flights if wanted <= flight.fields), None)
+            leader = flight is None
+            if leader:
+                flight = _Flight(wanted)
+                self._flights.append(flight)
+            else:
+                flight.waiters += 1
+                self.shared += 1
+        if not leader:
+            flight.done.wait()
+            note(backend="partagé")
+            if flight.error is not None:
+                raise flight.error
+            return {name: flight.result[name] for name in fields}
+        try:
+            flight.result = task()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                self._flights.remove(flight)
+            flight.done.set()
+        return flight.result
+
+    def in_flight(self) -> int:
+        """Nombre de collectes en cours"""
+        with self._lock:
+            return len(self._flights)
+
 
 class HWIDManager:
-    """Gestionnaire pour obtenir et modifier les identifiants matériels"""
+    """
+    Gestionnaire pour obtenir et modifier les identifiants matériels
+    Les méthodes de lecture (get_all_hwid_info, collect, snapshot,
+    generate_composite_hwid) peuvent être appelées depuis plusieurs threads:
+    les appels simultanés qui demandent les mêmes champs partagent une seule
+    collecte (voir SingleFlight), le cache et l'empreinte sont protégés par
+    des verrous
+    """
     
-    def __init__(self):
+    def __init__(self, session: Optional["WorkerSession"] = None,
+                 query_timeout: float = 10.0,
+                 cache: Optional[SnapshotCache] = None,
+                 provider: Optional["InventoryProvider"] = None,
+                 metrics: Optional[CollectionMetrics] = None,
+                 fingerprint_version: int = FINGERPRINT_VERSION,
+                 registry: Optional["CollectorRegistry"] = None):
         self.hwid_info = {}
-        
+        # Horodatage de la dernière valeur obtenue pour chaque champ
+        self.field_stamps = {}
+        # Durées, backends et fallbacks par collecteur (trace JSON lines via HWID_TRACE)
+        self.metrics = metrics if metrics is not None else CollectionMetrics(os.environ.get("HWID_TRACE"))
+        # Cache des champs (durée de validité par champ, voir hwid_cache.FIELD_TTLS)
+        self.cache = cache if cache is not None else SnapshotCache()
+        # Backend de collecte en lecture seule (Windows, Linux, fixture...)
+        if provider is None:
+            from hwid_providers import default_provider
+            provider = default_provider(session=session, query_timeout=query_timeout)
+        self.provider = provider
+        # Version du HWID composite (1 = recette historique, voir hwid_fingerprint)
+        self.fingerprint_version = fingerprint_version
+        # Empreinte incrémentale: seuls les composants modifiés sont re-hachés
+        self.fingerprint = FingerprintTree()
+        self._fingerprint_lock = threading.Lock()
+        # Collectes en cours partagées entre appelants concurrents
+        self.flights = SingleFlight()
+        # Collecteurs disponibles (composants historiques et greffons HWID_PLUGINS)
+        if registry is None:
+            from hwid_collectors import REGISTRY, load_plugins
+            load_plugins()
+            registry = REGISTRY
+        self.registry = registry
+    
+    def kill_children(self):
+        """Tue les processus de collecte encore en cours"""
+        self.provider.kill_children()
+    
     def get_machine_guid(self) -> str:
-        """Récupère le MachineGuid depuis le registre Windows"""
-        try:
-            key = winreg.OpenKey(
-                winreg.HKEY_LOCAL_MACHINE,
-                r"SOFTWARE\Microsoft\Cryptography",
-                0,
-                winreg.KEY_READ | winreg.KEY_WOW64_64KEY
-            )
-            value, _ = winreg.QueryValueEx(key, "MachineGuid")
-            winreg.CloseKey(key)
-            return value
-        except Exception as e:
-            return f"Erreur: {str(e)}"
+        """Récupère le MachineGuid (registre Windows, machine-id sous Linux)"""
+        return self.provider.machine_guid()
     
     def get_cpu_id(self) -> str:
         """Récupère l'ID du processeur"""
-        try:
-            # Essayer avec PowerShell (Windows 11)
-            ps_command = "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty ProcessorId"
-            result = subprocess.run(
-                ['powershell', '-Command', ps_command],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-            
-            # Fallback: WMIC (Windows 10 et antérieur)
-            result = subprocess.run(
-                ['wmic', 'cpu', 'get', 'ProcessorId'],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                return lines[1].strip()
-            return "Non disponible"
-        except Exception as e:
-            return f"Erreur: {str(e)}"
+        return self.provider.cpu_id()
     
     def get_disk_serial(self) -> str:
         """Récupère le numéro de série du disque dur"""
-        try:
-            # Essayer avec PowerShell (Windows 11)
-            ps_command = "Get-CimInstance -ClassName Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber"
-            result = subprocess.run(
-                ['powershell', '-Command', ps_command],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-            
-            # Fallback: WMIC (Windows 10 et antérieur)
-            result = subprocess.run(
-                ['wmic', 'diskdrive', 'get', 'SerialNumber'],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            lines = result.stdout.strip().split('\n')
-            serials = [line.strip() for line in lines[1:] if line.strip()]
-            return serials[0] if serials else "Non disponible"
-        except Exception as e:
-            return f"Erreur: {str(e)}"
+        return self.provider.disk_serial()
     
     def get_motherboard_serial(self) -> str:
         """Récupère le numéro de série de la carte mère"""
-        try:
-            # Essayer avec PowerShell (Windows 11)
-            ps_command = "Get-CimInstance -ClassName Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber"
-            result = subprocess.run(
-                ['powershell', '-Command', ps_command],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            if result.returncode == 0 and result.stdout.strip():
-                return result.stdout.strip()
-            
-            # Fallback: WMIC (Windows 10 et antérieur)
-            result = subprocess.run(
-                ['wmic', 'baseboard', 'get', 'SerialNumber'],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            lines = result.stdout.strip().split('\n')
-            if len(lines) > 1:
-                return lines[1].strip()
-            return "Non disponible"
-        except Exception as e:
-            return f"Erreur: {str(e)}"
+        return self.provider.motherboard_serial()
     
     def get_mac_address(self) -> str:
         """Récupère l'adresse MAC"""
-        try:
-            mac = ':'.join(['{:02x}'.format((uuid.getnode() >> elements) & 0xff)
-                           for elements in range(0, 2*6, 2)][::-1])
-            return mac
-        except Exception as e:
-            return f"Erreur: {str(e)}"
+        return self.provider.mac_address()
     
     def get_windows_product_id(self) -> str:
         """Récupère le Product ID de Windows"""
+        return self.provider.product_id()
+    
+    def _read_group(self, names: Tuple[str, ...]) -> Dict[str, str]:
+        """
+        Lit un groupe de champs; les groupes dotés d'une lecture groupée (CPU,
+        disque et carte mère: une seule requête CIM) l'utilisent dès qu'ils
+        comptent plusieurs champs, les collecteurs individuels servant de secours
+        """
+        collectors = [self.registry.get(name) for name in names]
+        batch = {}
+        read_batch = self.registry.batch(collectors[0].group)
+        if len(names) > 1 and read_batch is not None:
+            batch = read_batch(self)
+        return {collector.name: batch.get(collector.name) or collector.read(self, {})
+                for collector in collectors}
+    
+    def _cached(self, fields: Tuple[str, ...],
+                task: Callable[[], Dict[str, str]]) -> Callable[[], Dict[str, str]]:
+        """
+        Enveloppe une tâche: les champs encore valides en cache ne sont pas
+        recollectés et les appels simultanés partagent la même collecte
+        """
+        def load() -> Optional[Dict[str, str]]:
+            cached = {name: self.cache.get(name) for name in fields}
+            if all(value is not None for value in cached.values()):
+                note(backend="cache")
+                for name in fields:
+                    self.field_stamps[name] = self.cache.stamp(name)
+                return cached
+            return None
+        
+        def refresh() -> Dict[str, str]:
+            # Le meneur relit le cache: une collecte a pu se terminer entre-temps
+            values = load()
+            if values is not None:
+                return values
+            values = task()
+            now = time.time()
+            for name, value in values.items():
+                self.field_stamps[name] = now
+                if value != TIMEOUT_VALUE:
+                    self.cache.put(name, value, now)
+            return values
+        
+        def run() -> Dict[str, str]:
+            values = load()
+            if values is not None:
+                return values
+            return self.flights.do(fields, refresh)
+        return run
+    
+    def _collection_tasks(self, fields: Optional[Iterable[str]] = None,
+                          refresh: Optional[RefreshMetrics] = None
+                          ) -> List[Tuple[Tuple[str, ...], Callable[[], Dict[str, str]]]]:
+        """
+        Tâches de collecte indépendantes: (champs produits, fonction), des
+        moins coûteuses aux plus coûteuses (les champs gratuits s'affichent d'abord)
+        Les mesures sont rattachées à l'actualisation refresh
+        """
+        return [(names, self._instrumented(names, self._cached(names, task), refresh))
+                for names, task in self._raw_tasks(fields)]
+    
+    def _instrumented(self, fields: Tuple[str, ...], task: Callable[[], Dict[str, str]],
+                      refresh: Optional[RefreshMetrics] = None) -> Callable[[], Dict[str, str]]:
+        """Enveloppe une tâche pour enregistrer sa durée, son backend et son statut"""
+        def run() -> Dict[str, str]:
+            with self.metrics.measure(", ".join(fields), self.provider.name, refresh) as record:
+                values = task()
+                if any(value == TIMEOUT_VALUE for value in values.values()):
+                    record.status = "timeout"
+                elif any(parse_value(str(value))[0] == STATUS_ERROR for value in values.values()):
+                    record.status = "error"
+                return values
+        return run
+    
+    def _raw_tasks(self, fields: Optional[Iterable[str]] = None
+                   ) -> List[Tuple[Tuple[str, ...], Callable[[], Dict[str, str]]]]:
+        """
+        Tâches de collecte sans passer par le cache
+        Si fields est fourni, seuls les groupes nécessaires à ces champs sont collectés
+        """
+        return [(names, functools.partial(self._read_group, names))
+                for names, _ in self.registry.groups(fields, self.provider.name)]
+    
+    def collect_snapshot(self, fields: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Collecte tous les composants matériels en une seule passe
+        Les classes CIM sont lues par une requête groupée; les getters
+        individuels (avec leur fallback WMIC) ne servent qu'en cas d'échec
+        Avec fields, seuls les collecteurs nécessaires à ces champs s'exécutent
+        """
+        snapshot = {}
+        refresh = self.metrics.begin_refresh()
+        for _, task in self._collection_tasks(fields, refresh):
+            snapshot.update(task())
+        self.metrics.end_refresh(refresh)
+        self.hwid_info = snapshot
+        self.cache.save()
+        return snapshot
+    
+    def invalidate(self, *fields: str, persist: bool = True):
+        """
+        Invalide les champs indiqués dans le cache (tous si aucun n'est donné)
+        La prochaine collecte interrogera à nouveau le système
+        persist=False: le fichier de cache n'est pas réécrit (revalidation
+        suivie d'une collecte, qui ne l'écrit que si une valeur a changé)
+        """
+        self.cache.invalidate(fields or None)
+        if persist:
+            self.cache.save()
+    
+    def generate_composite_hwid(self, snapshot: Optional[Dict[str, str]] = None,
+                                version: Optional[int] = None) -> str:
+        """
+        Génère un HWID composite basé sur plusieurs composants
+        Si aucun snapshot n'est fourni, une collecte complète est effectuée.
+        Les composants en erreur ou hors délai ne sont jamais hachés: le résultat
+        est alors TIMEOUT_VALUE ou une valeur "Erreur: ..." qui les nomme.
+        version: 1 (par défaut, voir FINGERPRINT_VERSION) = recette historique,
+        2 = empreinte par composant; en version 2, self.fingerprint.last_changed
+        indique les composants responsables du dernier changement d'empreinte
+        """
+        version = self.fingerprint_version if version is None else version
+        if snapshot is None:
+            snapshot = self.collect_snapshot(COMPOSITE_COMPONENTS)
+        timed_out, failed = blockers(snapshot)
+        if timed_out or failed or version != self.fingerprint.version:
+            return composite_hwid(snapshot, version)
+        # Seules les feuilles des composants modifiés sont recalculées
+        with self._fingerprint_lock:
+            self.fingerprint.update_many(snapshot)
+            return self.fingerprint.hexdigest()
+    
+    def _format_info(self, snapshot: Dict[str, str],
+                     fields: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Construit le dictionnaire d'informations (champs demandés) à partir d'un snapshot"""
+        registered = self.registry.fields()
+        names = registered if fields is None else [name for name in registered if name in set(fields)]
+        info = dict(snapshot)
+        # Champs dérivés (HWID composite...), calculés après leurs dépendances
+        for collector in self.registry.derived(names):
+            info[collector.name] = collector.read(
+                self, {name: info.get(name) for name in collector.depends})
+        return {name: info[name] for name in names}
+    
+    def cached_info(self) -> Optional[Dict[str, str]]:
+        """
+        Informations HWID reconstruites depuis les dernières valeurs en cache
+        (même expirées), sans aucune collecte; None si le cache est incomplet
+        """
+        snapshot = self.cache.snapshot()
+        if any(name not in snapshot for names, _ in self.registry.groups() for name in names):
+            return None
+        return self._format_info(snapshot)
+    
+    def get_all_hwid_info(self, deadline: Optional[float] = None,
+                          fields: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Récupère toutes les informations HWID (ou seulement les champs demandés)
+        Avec deadline (secondes), la collecte devient concurrente et les champs
+        non obtenus à temps valent TIMEOUT_VALUE
+        """
+        if deadline is not None:
+            return self.collect(deadline=deadline, fields=fields)
+        return self._format_info(self.collect_snapshot(fields), fields)
+    
+    def read_through(self, fields: Iterable[str]) -> Dict[str, str]:
+        """
+        Lecture à la demande (LazySnapshot): collecte les groupes des champs
+        indiqués via le cache, sans actualisation publiée dans les métriques
+        ni écriture du cache persistant
+        """
+        fields = list(fields)
+        snapshot = {}
+        for _, task in self._collection_tasks(fields, RefreshMetrics()):
+            snapshot.update(task())
+        return self._format_info(snapshot, fields)
+    
+    def lazy_snapshot(self, fields: Optional[Iterable[str]] = None) -> "LazySnapshot":
+        """
+        Inventaire évalué à la demande (mapping {champ: valeur}): rien n'est
+        collecté avant le premier accès à un champ, et l'itération parcourt
+        les champs des moins coûteux aux plus coûteux
+        """
+        from hwid_collectors import LazySnapshot
+        return LazySnapshot(self, fields)
+    
+    def snapshot(self, deadline: Optional[float] = None,
+                 fields: Optional[Iterable[str]] = None) -> HWIDSnapshot:
+        """
+        Collecte et retourne un HWIDSnapshot typé (statut et horodatage par champ)
+        Le HWID composite est horodaté comme son composant le plus récent
+        """
+        info = self.get_all_hwid_info(deadline=deadline, fields=fields)
+        stamps = {name: self.field_stamps[name] for name in info if name in self.field_stamps}
+        if "Composite HWID" in info:
+            stamps["Composite HWID"] = max(self.field_stamps.get(name, 0.0)
+                                           for name in COMPOSITE_COMPONENTS)
+        return HWIDSnapshot.from_info(info, stamps=stamps)
+    
+    def collect(self, max_workers: int = 4,
+                on_field: Optional[Callable[[str, str], None]] = None,
+                deadline: Optional[float] = None,
+                fields: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Collecte concurrente: retourne le même dictionnaire que get_all_hwid_info
+        Les tâches s'exécutent dans un pool de threads (max_workers) et
+        on_field(nom, valeur) est appelé depuis le thread de collecte
+        dès qu'un champ est disponible
+        Si deadline (secondes) expire, les champs manquants valent TIMEOUT_VALUE
+        et les processus enfants encore actifs sont tués
+        """
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+        
+        snapshot = {}
+        refresh = self.metrics.begin_refresh()
+        executor = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        tasks = {executor.submit(task): names for names, task in self._collection_tasks(fields, refresh)}
+        end = None if deadline is None else time.monotonic() + deadline
+        pending = set(tasks)
         try:
-            key = winreg.OpenKey(
-                winreg.HKEY_LOCAL_MACHINE,
-                r"SOFTWARE\Microsoft\Windows NT\CurrentVersion",
-                0,
-                winreg.KEY_READ | winreg.KEY_WOW64_64KEY
-            )
-            value, _ = winreg.QueryValueEx(key, "ProductId")
-            winreg.CloseKey(key)
-            return value
-        except Exception as e:
-            return f"Erreur: {str(e)}"
-    
-    def generate_composite_hwid(self) -> str:
-        """Génère un HWID composite basé sur plusieurs composants"""
-        components = [
-            self.get_machine_guid(),
-            self.get_cpu_id(),
-            self.get_disk_serial(),
-            self.get_motherboard_serial(),
-            self.get_mac_address()
-        ]
+            while pending:
+                remaining = None if end is None else end - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    values = future.result()
+                    snapshot.update(values)
+                    if on_field is not None:
+                        for name, value in values.items():
+                            on_field(name, value)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
         
-        # Combine tous les composants et crée un hash
-        combined = ''.join(str(c) for c in components)
-        hwid_hash = hashlib.sha256(combined.encode()).hexdigest()
-        return hwid_hash
-    
-    def get_all_hwid_info(self) -> Dict[str, str]:
-        """Récupère toutes les informations HWID"""
-        return {
-            "Machine GUID": self.get_machine_guid(),
-            "CPU ID": self.get_cpu_id(),
-            "Disk Serial": self.get_disk_serial(),
-            "Motherboard Serial": self.get_motherboard_serial(),
-            "MAC Address": self.get_mac_address(),
-            "Windows Product ID": self.get_windows_product_id(),
-            "Composite HWID": self.generate_composite_hwid(),
-            "Platform": platform.platform(),
-            "Computer Name": platform.node()
-        }
+        if pending:
+            self.kill_children()
+            for future in pending:
+                for name in tasks[future]:
+                    snapshot[name] = TIMEOUT_VALUE
+                    if on_field is not None:
+                        on_field(name, TIMEOUT_VALUE)
+        
+        self.metrics.end_refresh(refresh)
+        self.hwid_info = snapshot
+        self.cache.save()
+        info = self._format_info(snapshot, fields)
+        if on_field is not None and "Composite HWID" in info:
+            on_field("Composite HWID", info["Composite HWID"])
+        return info
     
     def modify_machine_guid(self, new_guid: Optional[str] = None) -> bool:
         """
@@ -180,7 +434,10 @@ class HWIDManager:
             return False
         
         try:
+            # Hors Windows, l'import échoue: modification indisponible
+            import winreg
             if new_guid is None:
+                import uuid
                 new_guid = str(uuid.uuid4())
             
             key = winreg.OpenKey(
@@ -192,6 +449,7 @@ class HWIDManager:
             winreg.SetValueEx(key, "MachineGuid", 0, winreg.REG_SZ, new_guid)
             winreg.CloseKey(key)
             
+            self.invalidate("Machine GUID")
             print(f"✅ MachineGuid modifié: {new_guid}")
             return True
         except Exception as e:
@@ -208,7 +466,9 @@ class HWIDManager:
             return False
         
         try:
+            import winreg
             if new_product_id is None:
+                import uuid
                 # Génère un ProductId aléatoire au format Windows
                 new_product_id = f"{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}-{uuid.uuid4().hex[:5]}"
             
@@ -221,6 +481,7 @@ class HWIDManager:
             winreg.SetValueEx(key, "ProductId", 0, winreg.REG_SZ, new_product_id)
             winreg.CloseKey(key)
             
+            self.invalidate("Windows Product ID")
             print(f"✅ ProductId modifié: {new_product_id}")
             return True
         except Exception as e:
@@ -230,27 +491,25 @@ class HWIDManager:
     def get_network_adapters(self) -> List[Dict[str, str]]:
         """Récupère la liste des adaptateurs réseau"""
         try:
-            ps_command = """
-            Get-NetAdapter | Where-Object {$_.Status -eq 'Up'} | Select-Object Name, InterfaceDescription, MacAddress | ConvertTo-Json
-            """
-            result = subprocess.run(
-                ['powershell', '-Command', ps_command],
-                capture_output=True,
-                text=True,
-                creationflags=subprocess.CREATE_NO_WINDOW
-            )
-            
-            if result.returncode == 0 and result.stdout.strip():
-                import json
-                adapters = json.loads(result.stdout)
-                if isinstance(adapters, dict):
-                    adapters = [adapters]
-                return adapters
-            return []
+            adapters = self.flights.do(("Network Adapters",),
+                                       lambda: {"Network Adapters": self.provider.network_adapters()})
+            return list(adapters["Network Adapters"])
         except Exception as e:
             print(f"❌ Erreur lors de la récupération des adaptateurs: {str(e)}")
             return []
     
+    def get_devices(self, kinds: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Énumère tous les disques, cartes mères et cartes réseau en une seule
+        requête (Windows) ou depuis sysfs (Linux); les périphériques sont
+        produits au fil de l'analyse. kinds filtre par type ("disk", "adapter"...)
+        """
+        wanted = None if kinds is None else set(kinds)
+        with self.metrics.measure("Devices", self.provider.name):
+            for device in self.provider.devices():
+                if wanted is None or device["Kind"] in wanted:
+                    yield device
+    
     def spoof_mac_address(self, adapter_name: str = None, new_mac: Optional[str] = None) -> bool:
         """
         Modifie l'adresse MAC d'une interface réseau via le registre
@@ -261,6 +520,7 @@ class HWIDManager:
             return False
         
         try:
+            import subprocess
             # Si aucun adaptateur spécifié, lister les adaptateurs disponibles
             if adapter_name is None:
                 adapters = self.get_network_adapters()
@@ -358,6 +618,7 @@ class HWIDManager:
             
             if "SUCCESS" in result.stdout:
                 # Redémarrer l'adaptateur réseau
+                self.invalidate("MAC Address")
                 print(f"✅ Adresse MAC modifiée: {new_mac}")
                 print("🔄 Redémarrage de l'adaptateur réseau...")
                 
@@ -418,6 +679,7 @@ class HWIDManager:
             return False
         
         try:
+            import subprocess
             keys_to_backup = [
                 r"HKEY_LOCAL_MACHINE\SOFTWARE\Microsoft\Cryptography",
                 r"HKEY_LOCAL_MACHINE\SOFTWARE\Microsoft\Windows NT\CurrentVersion"
@@ -450,6 +712,7 @@ class HWIDManager:
             return False
         
         try:
+            import subprocess
             if not os.path.exists(backup_file):
                 print(f"❌ Fichier de sauvegarde introuvable: {backup_file}")
                 return False
@@ -471,6 +734,7 @@ class HWIDManager:
             )
             
             if result.returncode == 0:
+                self.invalidate("Machine GUID", "Windows Product ID")
                 print(f"✅ Restauration réussie depuis: {backup_file}")
                 print("ℹ️  Redémarrage recommandé pour appliquer les changements.")
                 return True
@@ -497,11 +761,155 @@ def print_banner():
     print(banner)
 
 
+def resolve_field(name: str) -> str:
+    """
+    Retrouve un champ HWID à partir de son nom ou d'un alias
+    (insensible à la casse, espaces/tirets/soulignés équivalents: cpu-id, CPU_ID...)
+    """
+    def normalize(value: str) -> str:
+        return value.lower().replace('-', ' ').replace('_', ' ').strip()
+    
+    from hwid_collectors import REGISTRY, load_plugins
+    load_plugins()
+    wanted = normalize(name)
+    for field in REGISTRY.fields():
+        if normalize(field) == wanted:
+            return field
+    import argparse
+    raise argparse.ArgumentTypeError(
+        f"champ inconnu: {name} (disponibles: {', '.join(REGISTRY.fields())})")
+
+
+def run_batch(argv: List[str]) -> int:
+    """
+    Mode non interactif en lecture seule: affiche le snapshot en JSON ou NDJSON
+    Seuls les collecteurs nécessaires aux champs demandés sont exécutés
+    """
+    import argparse
+    from datetime import datetime, timezone
+    
+    parser = argparse.ArgumentParser(
+        prog="hwid_manager.py",
+        description="Inventaire HWID non interactif (lecture seule)")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("--json", dest="format", action="store_const", const="json",
+                        help="Un objet JSON (tableau si plusieurs échantillons)")
+    output.add_argument("--ndjson", dest="format", action="store_const", const="ndjson",
+                        help="Un objet JSON par ligne et par échantillon")
+    parser.add_argument("-f", "--field", dest="fields", action="append", type=resolve_field,
+                        metavar="CHAMP", help="Champ à collecter (répétable, ex: cpu-id)")
+    parser.add_argument("-n", "--repeat", type=int, default=1,
+                        help="Nombre d'échantillons (0 = infini)")
+    parser.add_argument("-i", "--interval", type=float, default=1.0,
+                        help="Intervalle entre deux échantillons (secondes)")
+    parser.add_argument("--deadline", type=float, default=None,
+                        help="Durée maximale d'une collecte (secondes)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Utiliser le cache persistant au lieu d'une collecte fraîche")
+    parser.add_argument("--fingerprint-version", type=int, choices=SUPPORTED_VERSIONS,
+                        default=FINGERPRINT_VERSION,
+                        help="Version du HWID composite (1 = recette historique)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Surveille les composants: un événement NDJSON par changement")
+    parser.add_argument("--max-interval", type=float, default=300.0,
+                        help="Intervalle maximal entre deux vérifications en surveillance (secondes)")
+    parser.add_argument("--devices", nargs="?", const="all", metavar="TYPES",
+                        help="Énumère les périphériques en NDJSON (disk,baseboard,adapter)")
+    parser.add_argument("--list-fields", action="store_true", help="Liste les champs disponibles")
+    parser.set_defaults(format="json")
+    args = parser.parse_args(argv)
+    
+    if args.list_fields:
+        from hwid_collectors import REGISTRY, load_plugins
+        load_plugins()
+        for field in REGISTRY.fields():
+            print(field)
+        return 0
+    
+    if args.cache:
+        cache = SnapshotCache(path=default_cache_path())
+    elif args.watch:
+        # Les champs stables jusqu'au redémarrage ne sont lus qu'une fois
+        cache = SnapshotCache()
+    else:
+        # Durée de validité nulle: chaque échantillon interroge le système
+        cache = SnapshotCache(ttls={}, default_ttl=0)
+    manager = HWIDManager(cache=cache, fingerprint_version=args.fingerprint_version)
+    
+    if args.watch:
+        return watch_batch(manager, args.fields, args.interval, args.max_interval)
+    
+    if args.devices:
+        kinds = None if args.devices == "all" else args.devices.split(",")
+        try:
+            for device in manager.get_devices(kinds):
+                sys.stdout.write(json.dumps(device, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+        finally:
+            manager.provider.close()
+        return 0
+    
+    samples = []
+    count = 0
+    try:
+        while args.repeat == 0 or count < args.repeat:
+            if count:
+                time.sleep(max(0.0, args.interval))
+            info = manager.get_all_hwid_info(deadline=args.deadline, fields=args.fields)
+            record = {"Timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds')}
+            record.update(info)
+            count += 1
+            if args.format == "ndjson":
+                sys.stdout.write(json.dumps(record, ensure_ascii=False) + "\n")
+                sys.stdout.flush()
+            else:
+                samples.append(record)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        manager.provider.close()
+    
+    if args.format == "json":
+        result = samples[0] if len(samples) == 1 else samples
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+def watch_batch(manager: HWIDManager, fields: Optional[List[str]],
+                min_interval: float, max_interval: float) -> int:
+    """
+    Mode surveillance: écrit l'état initial puis un objet NDJSON par changement
+    de composant, jusqu'à l'interruption (Ctrl+C)
+    """
+    from datetime import datetime, timezone
+    from hwid_watch import HWIDWatcher
+    
+    def emit(record: Dict):
+        stamped = {"Timestamp": datetime.now(timezone.utc).isoformat(timespec='seconds')}
+        stamped.update(record)
+        sys.stdout.write(json.dumps(stamped, ensure_ascii=False) + "\n")
+        sys.stdout.flush()
+    
+    watcher = HWIDWatcher(manager, fields, min_interval, max_interval)
+    try:
+        emit(watcher.baseline())
+        watcher.run(lambda events, info: [emit(event) for event in events])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        manager.provider.close()
+    return 0
+
+
 def main():
     """Fonction principale en mode console"""
+    if len(sys.argv) > 1:
+        sys.exit(run_batch(sys.argv[1:]))
+    
     print_banner()
     
-    manager = HWIDManager()
+    manager = HWIDManager(cache=SnapshotCache(path=default_cache_path()))
     
     while True:
         print("\n" + "="*60)
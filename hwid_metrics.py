@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Instrumentation de la collecte
+Pour chaque collecteur: durée, backend ayant répondu, nombre de fallbacks et
+codes de sortie des processus. Les backends signalent ces informations via
+note(), qui s'applique au collecteur en cours d'exécution dans le thread courant
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+_current = threading.local()
+
+# Mesures conservées hors actualisation (get_devices répétés, actions de
+# l'interface...): les plus anciennes sont abandonnées au-delà
+MAX_LOOSE_RECORDS = 256
+
+
+class CollectorRecord:
+    """Mesure d'une exécution de collecteur"""
+
+    __slots__ = ("collector", "started", "duration_ms", "backend", "fallbacks",
+                 "exit_codes", "status")
+
+    def __init__(self, collector: str, backend: str):
+        self.collector = collector
+        self.started = time.time()
+        self.duration_ms = 0.0
+        self.backend = backend
+        self.fallbacks = 0
+        self.exit_codes = []
+        self.status = "ok"
+
+    def to_dict(self) -> Dict:
+        return {
+            "collector": self.collector,
+            "started": round(self.started, 6),
+            "duration_ms": round(self.duration_ms, 3),
+            "backend": self.backend,
+            "fallbacks": self.fallbacks,
+            "exit_codes": list(self.exit_codes),
+            "status": self.status
+        }
+
+
+def note(backend: Optional[str] = None, exit_code: Optional[int] = None,
+         fallback: bool = False):
+    """
+    Renseigne le collecteur en cours dans ce thread (sans effet hors collecte)
+    backend: source qui a répondu; fallback: une méthode de secours a été utilisée
+    """
+    record = getattr(_current, "record", None)
+    if record is None:
+        return
+    if backend is not None:
+        record.backend = backend
+    if exit_code is not None:
+        record.exit_codes.append(exit_code)
+    if fallback:
+        record.fallbacks += 1
+
+
+class RefreshMetrics:
+    """Mesures d'une actualisation (propres à l'appel de begin_refresh)"""
+
+    __slots__ = ("records", "elapsed_ms", "_started")
+
+    def __init__(self):
+        self.records = []
+        # Durée totale (ms), renseignée par end_refresh
+        self.elapsed_ms = None
+        self._started = time.perf_counter()
+
+
+class CollectionMetrics:
+    """
+    Métriques structurées des collectes
+    Chaque actualisation mesure ses collecteurs dans son propre RefreshMetrics:
+    des actualisations simultanées (interface, surveillance, service) ne se
+    mélangent pas. last_refresh contient les mesures de la dernière
+    actualisation terminée, suivies des mesures prises hors actualisation
+    (au plus MAX_LOOSE_RECORDS); chaque mesure est aussi ajoutée au fichier de
+    trace JSON lines s'il est configuré
+    """
+
+    def __init__(self, trace_path: Optional[str] = None):
+        self.trace_path = trace_path
+        self.last_refresh = []
+        # Durée totale (ms) de la dernière actualisation complète
+        self.last_refresh_ms = None
+        self.totals = {}
+        self._lock = threading.Lock()
+
+    def begin_refresh(self) -> RefreshMetrics:
+        """Commence une actualisation complète; ses mesures passent par measure(refresh=...)"""
+        return RefreshMetrics()
+
+    def end_refresh(self, refresh: RefreshMetrics):
+        """Termine l'actualisation et la publie comme dernière actualisation"""
+        refresh.elapsed_ms = (time.perf_counter() - refresh._started) * 1000.0
+        with self._lock:
+            self.last_refresh = list(refresh.records)
+            self.last_refresh_ms = refresh.elapsed_ms
+
+    @contextmanager
+    def measure(self, collector: str, backend: str, refresh: Optional[RefreshMetrics] = None):
+        """
+        Mesure le bloc comme exécution du collecteur indiqué, rattachée à
+        l'actualisation refresh (sinon ajoutée à la dernière actualisation)
+        """
+        record = CollectorRecord(collector, backend)
+        previous = getattr(_current, "record", None)
+        _current.record = record
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.duration_ms = (time.perf_counter() - start) * 1000.0
+            _current.record = previous
+            self._store(record, refresh)
+
+    def _store(self, record: CollectorRecord, refresh: Optional[RefreshMetrics] = None):
+        with self._lock:
+            if refresh is not None:
+                refresh.records.append(record)
+            else:
+                self.last_refresh.append(record)
+                if len(self.last_refresh) > MAX_LOOSE_RECORDS:
+                    del self.last_refresh[:-MAX_LOOSE_RECORDS]
+            total = self.totals.setdefault(record.collector, {"runs": 0, "fallbacks": 0, "total_ms": 0.0})
+            total["runs"] += 1
+            total["fallbacks"] += record.fallbacks
+            total["total_ms"] += record.duration_ms
+        if self.trace_path:
+            try:
+                with open(self.trace_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record.to_dict(), ensure_ascii=False) + "\n")
+            except OSError:
+                pass
+
+    def to_dict(self) -> Dict:
+        """Dernière actualisation et cumuls par collecteur"""
+        with self._lock:
+            return {
+                "last_refresh_ms": self.last_refresh_ms,
+                "last_refresh": [record.to_dict() for record in self.last_refresh],
+                "totals": {name: dict(total) for name, total in self.totals.items()}
+            }
+
+    def summary(self) -> str:
+        """Résumé d'une ligne de la dernière actualisation"""
+        with self._lock:
+            records = list(self.last_refresh)
+            elapsed = self.last_refresh_ms
+        if not records:
+            return "⏱️ Aucune collecte mesurée"
+        if elapsed is None:
+            elapsed = sum(record.duration_ms for record in records)
+        slowest = max(records, key=lambda record: record.duration_ms)
+        fallbacks = sum(record.fallbacks for record in records)
+        failed = [record for record in records if record.status != "ok"]
+        parts = [
+            f"⏱️ {len(records)} collecteurs en {elapsed:.0f} ms",
+            f"plus lent: {slowest.collector} {slowest.duration_ms:.0f} ms ({slowest.backend})",
+            f"{fallbacks} fallback(s)"
+        ]
+        if failed:
+            parts.append("échecs: " + ", ".join(f"{record.collector} ({record.status})" for record in failed))
+        return " | ".join(parts)
+
+    def records(self) -> List[CollectorRecord]:
+        with self._lock:
+            return list(self.last_refresh)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Composants additionnels (greffon)
+BIOS UUID, cartes graphiques et barrettes mémoire, enregistrés dans le
+registre des collecteurs à l'import du module. Activation:
+
+    HWID_PLUGINS=hwid_plugins python hwid_manager.py --json
+
+Ces champs s'ajoutent au dictionnaire de get_all_hwid_info; ils ne font pas
+partie du HWID composite ni du format binaire de HWIDSnapshot. Leur coût dépend
+du backend: requête CIM (processus) sous Windows, lecture de fichiers sous Linux
+"""
+
+import glob
+import os
+import struct
+from typing import List
+
+from hwid_collectors import COST_CHEAP, COST_SPAWN, REGISTRY
+
+# Type SMBIOS d'un module mémoire (Memory Device)
+SMBIOS_MEMORY_DEVICE = 17
+
+# Coût des lectures: processus PowerShell sous Windows, fichiers sysfs sous Linux
+PLUGIN_COST = {"windows": COST_SPAWN, "linux": COST_CHEAP}
+
+
+def _join(values: List[str]) -> str:
+    return "; ".join(value for value in values if value)
+
+
+def _read_sysfs(provider, *parts: str) -> str:
+    """Lit un fichier sysfs; non disponible s'il est absent ou réservé à root"""
+    try:
+        with open(os.path.join(provider.root, *parts), 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except (FileNotFoundError, PermissionError):
+        raise NotImplementedError
+
+
+def windows_bios_uuid(provider) -> str:
+    products = provider.cim_values("Win32_ComputerSystemProduct", ("UUID",))
+    return _join([product.get("UUID", "") for product in products])
+
+
+def linux_bios_uuid(provider) -> str:
+    return _read_sysfs(provider, "sys", "class", "dmi", "id", "product_uuid")
+
+
+def windows_gpu(provider) -> str:
+    controllers = provider.cim_values("Win32_VideoController", ("Name", "PNPDeviceID"))
+    return _join([controller.get("Name", "") for controller in controllers])
+
+
+def linux_gpu(provider) -> str:
+    """Cartes DRM: identifiants PCI vendeur:périphérique et pilote"""
+    cards = []
+    for path in sorted(glob.glob(os.path.join(provider.root, "sys", "class", "drm", "card[0-9]*"))):
+        if "-" in os.path.basename(path):
+            # Connecteurs (card0-HDMI-A-1): pas une carte
+            continue
+        device = os.path.join(path, "device")
+        try:
+            with open(os.path.join(device, "vendor"), 'r') as f:
+                vendor = f.read().strip().replace("0x", "")
+            with open(os.path.join(device, "device"), 'r') as f:
+                model = f.read().strip().replace("0x", "")
+        except OSError:
+            continue
+        driver = os.path.basename(os.path.realpath(os.path.join(device, "driver")))
+        cards.append(f"{vendor}:{model} ({driver})" if os.path.exists(os.path.join(device, "driver"))
+                     else f"{vendor}:{model}")
+    if not cards:
+        raise NotImplementedError
+    return _join(cards)
+
+
+def windows_memory(provider) -> str:
+    modules = provider.cim_values("Win32_PhysicalMemory", ("Capacity", "SerialNumber", "PartNumber"))
+    described = []
+    for module in modules:
+        size = int(module.get("Capacity") or 0) // (1024 ** 3)
+        described.append(f"{size} Go {module.get('PartNumber', '').strip()} "
+                         f"S/N {module.get('SerialNumber', '').strip()}".replace("  ", " "))
+    return _join(described)
+
+
+def parse_memory_device(raw: bytes) -> str:
+    """
+    Décrit une structure SMBIOS de type 17: taille, référence et numéro de série
+    (chaîne vide pour un emplacement libre)
+    """
+    if len(raw) < 0x1B or raw[0] != SMBIOS_MEMORY_DEVICE:
+        return ""
+    length = raw[1]
+    size = struct.unpack_from("<H", raw, 0x0C)[0]
+    if size in (0, 0xFFFF):
+        return ""
+    if size == 0x7FFF and length >= 0x20:
+        megabytes = struct.unpack_from("<I", raw, 0x1C)[0] & 0x7FFFFFFF
+    elif size & 0x8000:
+        megabytes = (size & 0x7FFF) // 1024
+    else:
+        megabytes = size
+    strings = raw[length:].split(b"\0")
+
+    def string(offset: int) -> str:
+        index = raw[offset] if offset < length else 0
+        if not index or index > len(strings):
+            return ""
+        return strings[index - 1].decode('ascii', 'replace').strip()
+
+    size_text = f"{megabytes // 1024} Go" if megabytes >= 1024 else f"{megabytes} Mo"
+    return f"{size_text} {string(0x1A)} S/N {string(0x18)}".replace("  ", " ")
+
+
+def linux_memory(provider) -> str:
+    """Barrettes décrites par les tables SMBIOS (lisibles par root uniquement)"""
+    pattern = os.path.join(provider.root, "sys", "firmware", "dmi", "entries",
+                           f"{SMBIOS_MEMORY_DEVICE}-*", "raw")
+    modules = []
+    for path in sorted(glob.glob(pattern)):
+        try:
+            with open(path, 'rb') as f:
+                modules.append(parse_memory_device(f.read()))
+        except PermissionError:
+            raise NotImplementedError
+    if not any(modules):
+        raise NotImplementedError
+    return _join(modules)
+
+
+REGISTRY.register_component("BIOS UUID", {"windows": windows_bios_uuid, "linux": linux_bios_uuid},
+                            cost=PLUGIN_COST, replace=True)
+REGISTRY.register_component("GPU", {"windows": windows_gpu, "linux": linux_gpu},
+                            cost=PLUGIN_COST, replace=True)
+REGISTRY.register_component("RAM Modules", {"windows": windows_memory, "linux": linux_memory},
+                            cost=PLUGIN_COST, replace=True)
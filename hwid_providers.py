@@ -0,0 +1,799 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Backends de collecte en lecture seule
+Chaque backend fournit les composants matériels d'une plateforme:
+Windows (registre, PowerShell/CIM, WMIC), Linux (sysfs, sans processus)
+et rejeu d'un fichier de fixture pour les tests et les mesures
+"""
+
+import glob
+import json
+import math
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from hwid_metrics import note
+from hwid_snapshot import STATUS_OK, UNAVAILABLE, parse_value
+from hwid_worker import WorkerSession, WorkerError, WorkerTimeout
+
+# Drapeau de création de processus sans fenêtre (Windows uniquement; valeur
+# de subprocess.CREATE_NO_WINDOW, importé seulement au lancement d'un processus)
+CREATE_NO_WINDOW = 0x08000000 if sys.platform == 'win32' else 0
+
+# Requête CIM groupée: un seul processus PowerShell pour toutes les classes WMI
+# (bloc & { } : la préférence d'erreur reste locale à la requête et ne s'applique
+# pas aux commandes suivantes de la session persistante)
+CIM_BATCH_COMMAND = (
+    "& { $ErrorActionPreference = 'SilentlyContinue'; "
+    "[PSCustomObject]@{"
+    "CpuId = (Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty ProcessorId) -join \"`n\"; "
+    "DiskSerial = (Get-CimInstance -ClassName Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber); "
+    "MotherboardSerial = (Get-CimInstance -ClassName Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber) -join \"`n\""
+    "} | ConvertTo-Json -Compress }"
+)
+
+# Correspondance entre les clés de la requête groupée et les champs HWID
+CIM_BATCH_FIELDS = {
+    "CpuId": "CPU ID",
+    "DiskSerial": "Disk Serial",
+    "MotherboardSerial": "Motherboard Serial"
+}
+
+# Types de périphériques énumérés par devices()
+DEVICE_KINDS = ("disk", "baseboard", "adapter")
+
+# Énumération complète en une requête: un objet JSON compact par ligne et par
+# périphérique (tous les disques, la carte mère et toutes les cartes réseau),
+# dans un bloc & { } comme CIM_BATCH_COMMAND
+DEVICES_COMMAND = (
+    "& { $ErrorActionPreference = 'SilentlyContinue'; "
+    "Get-CimInstance -ClassName Win32_DiskDrive | ForEach-Object { [PSCustomObject]@{"
+    "Kind = 'disk'; Name = $_.DeviceID; Model = $_.Model; Serial = $_.SerialNumber; "
+    "Size = $_.Size; Interface = $_.InterfaceType} | ConvertTo-Json -Compress }; "
+    "Get-CimInstance -ClassName Win32_BaseBoard | ForEach-Object { [PSCustomObject]@{"
+    "Kind = 'baseboard'; Manufacturer = $_.Manufacturer; Product = $_.Product; "
+    "Serial = $_.SerialNumber} | ConvertTo-Json -Compress }; "
+    "Get-NetAdapter | ForEach-Object { [PSCustomObject]@{"
+    "Kind = 'adapter'; Name = $_.Name; Description = $_.InterfaceDescription; "
+    "MacAddress = $_.MacAddress; Status = [string]$_.Status; Physical = $_.HardwareInterface; "
+    "Speed = $_.LinkSpeed} | ConvertTo-Json -Compress } }"
+)
+
+
+def _guard(read: Callable[[], str]) -> str:
+    """Exécute une lecture et convertit les erreurs en valeur affichable"""
+    try:
+        value = read()
+        return value if value else UNAVAILABLE
+    except NotImplementedError:
+        return UNAVAILABLE
+    except Exception as e:
+        return f"Erreur: {str(e)}"
+
+
+def _format_node(node: int) -> str:
+    """Formate un entier 48 bits en adresse MAC xx:xx:xx:xx:xx:xx"""
+    return ':'.join(['{:02x}'.format((node >> elements) & 0xff)
+                     for elements in range(0, 2*6, 2)][::-1])
+
+
+def normalize_mac(address: str) -> str:
+    """Adresse MAC au format xx:xx:xx:xx:xx:xx (séparateurs Windows acceptés)"""
+    return address.strip().replace('-', ':').lower()
+
+
+def parse_device(line: str) -> Optional[Dict]:
+    """
+    Analyse une ligne de l'énumération (objet JSON) et normalise le périphérique;
+    None pour une ligne vide ou invalide
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("Kind") not in DEVICE_KINDS:
+        return None
+    device = {}
+    for name, value in data.items():
+        if value is None or value == "":
+            continue
+        if name == "Size":
+            try:
+                device[name] = int(value)
+            except (TypeError, ValueError):
+                continue
+        elif name == "Physical":
+            device[name] = bool(value)
+        elif name == "MacAddress":
+            device[name] = normalize_mac(str(value))
+        else:
+            device[name] = str(value).strip()
+    return device
+
+
+class InventoryProvider:
+    """
+    Interface d'un backend de collecte en lecture seule
+    Les méthodes publiques ne lèvent jamais d'exception: elles retournent la
+    valeur, UNAVAILABLE, ou une chaîne "Erreur: ..."; les sous-classes
+    implémentent les méthodes _read_*
+    """
+
+    name = "generic"
+    # Nombre de processus lancés par ce backend depuis sa création
+    spawns = 0
+
+    @property
+    def spawn_count(self) -> int:
+        """Nombre total de processus enfants lancés (y compris les workers)"""
+        return self.spawns
+
+    def machine_guid(self) -> str:
+        return _guard(self._read_machine_guid)
+
+    def component(self, name: str, read: Optional[Callable] = None) -> str:
+        """
+        Composant additionnel enregistré par un greffon (hwid_collectors):
+        read(provider) si le greffon gère ce backend, sinon _read_component
+        """
+        if read is not None:
+            return _guard(lambda: read(self))
+        return _guard(lambda: self._read_component(name))
+
+    def _read_component(self, name: str) -> str:
+        raise NotImplementedError
+
+    def cpu_id(self) -> str:
+        return _guard(self._read_cpu_id)
+
+    def disk_serial(self) -> str:
+        return _guard(self._read_disk_serial)
+
+    def motherboard_serial(self) -> str:
+        return _guard(self._read_motherboard_serial)
+
+    def mac_address(self) -> str:
+        return _guard(self._read_mac_address)
+
+    def product_id(self) -> str:
+        return _guard(self._read_product_id)
+
+    def platform_name(self) -> str:
+        import platform
+        return _guard(platform.platform)
+
+    def computer_name(self) -> str:
+        import platform
+        return _guard(platform.node)
+
+    def hardware_batch(self) -> Dict[str, str]:
+        """
+        Lit CPU ID, Disk Serial et Motherboard Serial en une seule opération
+        si le backend le permet; les champs absents seront lus individuellement
+        """
+        return {}
+
+    def network_adapters(self) -> List[Dict[str, str]]:
+        """Adaptateurs réseau actifs: [{Name, InterfaceDescription, MacAddress}]"""
+        return []
+
+    def devices(self) -> Iterator[Dict]:
+        """
+        Énumère tous les disques, la carte mère et toutes les cartes réseau
+        ({"Kind": "disk" | "baseboard" | "adapter", ...}), au fil de la lecture.
+        Par défaut, reconstitués à partir des lectures individuelles
+        """
+        serial = self.disk_serial()
+        if parse_value(serial)[0] == STATUS_OK:
+            yield {"Kind": "disk", "Serial": serial}
+        serial = self.motherboard_serial()
+        if parse_value(serial)[0] == STATUS_OK:
+            yield {"Kind": "baseboard", "Serial": serial}
+        for adapter in self.network_adapters():
+            yield {"Kind": "adapter", "Name": adapter.get("Name", ""),
+                   "Description": adapter.get("InterfaceDescription", ""),
+                   "MacAddress": normalize_mac(adapter.get("MacAddress", "")), "Status": "Up"}
+
+    def kill_children(self):
+        """Tue les processus de collecte encore en cours"""
+
+    def close(self):
+        """Libère les ressources du backend"""
+
+    def _read_machine_guid(self) -> str:
+        raise NotImplementedError
+
+    def _read_cpu_id(self) -> str:
+        raise NotImplementedError
+
+    def _read_disk_serial(self) -> str:
+        raise NotImplementedError
+
+    def _read_motherboard_serial(self) -> str:
+        raise NotImplementedError
+
+    def _read_mac_address(self) -> str:
+        import uuid
+        node = uuid.getnode()
+        # Sans carte lisible, getnode() retourne un nombre aléatoire marqué
+        # multicast (bit 0x01 du premier octet): ce n'est pas une adresse matérielle
+        if (node >> 40) & 0x01:
+            raise NotImplementedError
+        return _format_node(node)
+
+    def _read_product_id(self) -> str:
+        raise NotImplementedError
+
+
+class WindowsProvider(InventoryProvider):
+    """Backend Windows: registre, requêtes CIM via PowerShell, fallback WMIC"""
+
+    name = "windows"
+
+    def __init__(self, session: Optional[WorkerSession] = None, query_timeout: float = 10.0):
+        # Délai maximal (secondes) accordé à chaque requête de collecte
+        self.query_timeout = query_timeout
+        # Session PowerShell persistante partagée par toutes les requêtes en lecture
+        self.session = session if session is not None else WorkerSession()
+        self._children = set()
+        self._children_lock = threading.Lock()
+
+    @property
+    def spawn_count(self) -> int:
+        worker_spawns = self.session.spawns if self.session is not None else 0
+        return self.spawns + worker_spawns
+
+    def _run_powershell(self, command: str) -> Tuple[int, str]:
+        """
+        Exécute une commande PowerShell en lecture et retourne (code, sortie)
+        Passe par la session persistante si elle est disponible, sinon
+        lance un processus PowerShell dédié
+        """
+        if self.session is not None:
+            try:
+                stdout = self.session.request(command, timeout=self.query_timeout)
+                note(backend="powershell-worker", exit_code=0)
+                return 0, stdout
+            except WorkerTimeout:
+                note(backend="powershell-worker", exit_code=-1)
+                return -1, ""
+            except WorkerError:
+                note(fallback=True)
+
+        return self._run_command(['powershell', '-Command', command])
+
+    def _run_command(self, args: List[str]) -> Tuple[int, str]:
+        """
+        Lance une commande en lecture avec le délai query_timeout
+        Le processus est suivi pour pouvoir être tué par kill_children();
+        en cas de dépassement il est tué et le code retourné vaut -1
+        """
+        import subprocess
+        proc = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            creationflags=CREATE_NO_WINDOW
+        )
+        with self._children_lock:
+            self._children.add(proc)
+            self.spawns += 1
+        try:
+            stdout, _ = proc.communicate(timeout=self.query_timeout)
+            note(backend=args[0], exit_code=proc.returncode)
+            return proc.returncode, stdout
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            note(backend=args[0], exit_code=-1)
+            return -1, ""
+        finally:
+            with self._children_lock:
+                self._children.discard(proc)
+
+    def _stream_command(self, args: List[str]) -> Iterator[str]:
+        """
+        Lance une commande en lecture et retourne ses lignes au fil de l'eau
+        Le processus est suivi par kill_children() et tué après query_timeout
+        ou si la lecture est abandonnée
+        """
+        import subprocess
+        proc = subprocess.Popen(
+            args,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            creationflags=CREATE_NO_WINDOW
+        )
+        with self._children_lock:
+            self._children.add(proc)
+            self.spawns += 1
+        timer = threading.Timer(self.query_timeout, proc.kill)
+        timer.daemon = True
+        timer.start()
+        try:
+            for line in proc.stdout:
+                yield line
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.stdout.close()
+            proc.wait()
+            note(backend=args[0], exit_code=proc.returncode)
+            with self._children_lock:
+                self._children.discard(proc)
+
+    def devices(self) -> Iterator[Dict]:
+        """
+        Énumération complète en une seule requête PowerShell (DEVICES_COMMAND),
+        lue au fil de l'eau par le worker comme par le processus de secours
+        """
+        if self.session is not None:
+            produced = False
+            try:
+                for line in self.session.stream(DEVICES_COMMAND, timeout=self.query_timeout):
+                    device = parse_device(line)
+                    if device is not None:
+                        produced = True
+                        yield device
+                note(backend="powershell-worker", exit_code=0)
+                return
+            except WorkerTimeout:
+                note(backend="powershell-worker", exit_code=-1)
+                return
+            except WorkerError:
+                if produced:
+                    # Relancer l'énumération produirait les mêmes périphériques deux fois
+                    note(backend="powershell-worker", exit_code=1)
+                    return
+                note(fallback=True)
+        for line in self._stream_command(['powershell', '-Command', DEVICES_COMMAND]):
+            device = parse_device(line)
+            if device is not None:
+                yield device
+
+    def kill_children(self):
+        """Tue les processus de collecte encore en cours (et le worker PowerShell)"""
+        with self._children_lock:
+            children = list(self._children)
+        for proc in children:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+        if self.session is not None:
+            self.session.abort()
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+    @staticmethod
+    def _read_registry(path: str, name: str) -> str:
+        """Lit une valeur sous HKEY_LOCAL_MACHINE (vue 64 bits)"""
+        import winreg
+        note(backend="registry")
+        key = winreg.OpenKey(
+            winreg.HKEY_LOCAL_MACHINE,
+            path,
+            0,
+            winreg.KEY_READ | winreg.KEY_WOW64_64KEY
+        )
+        value, _ = winreg.QueryValueEx(key, name)
+        winreg.CloseKey(key)
+        return value
+
+    def _read_machine_guid(self) -> str:
+        return self._read_registry(r"SOFTWARE\Microsoft\Cryptography", "MachineGuid")
+
+    def _read_product_id(self) -> str:
+        return self._read_registry(r"SOFTWARE\Microsoft\Windows NT\CurrentVersion", "ProductId")
+
+    def _read_cpu_id(self) -> str:
+        # Essayer avec PowerShell (Windows 11)
+        ps_command = "Get-CimInstance -ClassName Win32_Processor | Select-Object -ExpandProperty ProcessorId"
+        returncode, stdout = self._run_powershell(ps_command)
+        if returncode == 0 and stdout.strip():
+            return stdout.strip()
+
+        # Fallback: WMIC (Windows 10 et antérieur)
+        note(fallback=True)
+        _, stdout = self._run_command(['wmic', 'cpu', 'get', 'ProcessorId'])
+        lines = stdout.strip().split('\n')
+        if len(lines) > 1:
+            return lines[1].strip()
+        return UNAVAILABLE
+
+    def _read_disk_serial(self) -> str:
+        # Essayer avec PowerShell (Windows 11)
+        ps_command = "Get-CimInstance -ClassName Win32_DiskDrive | Select-Object -First 1 -ExpandProperty SerialNumber"
+        returncode, stdout = self._run_powershell(ps_command)
+        if returncode == 0 and stdout.strip():
+            return stdout.strip()
+
+        # Fallback: WMIC (Windows 10 et antérieur)
+        note(fallback=True)
+        _, stdout = self._run_command(['wmic', 'diskdrive', 'get', 'SerialNumber'])
+        lines = stdout.strip().split('\n')
+        serials = [line.strip() for line in lines[1:] if line.strip()]
+        return serials[0] if serials else UNAVAILABLE
+
+    def _read_motherboard_serial(self) -> str:
+        # Essayer avec PowerShell (Windows 11)
+        ps_command = "Get-CimInstance -ClassName Win32_BaseBoard | Select-Object -ExpandProperty SerialNumber"
+        returncode, stdout = self._run_powershell(ps_command)
+        if returncode == 0 and stdout.strip():
+            return stdout.strip()
+
+        # Fallback: WMIC (Windows 10 et antérieur)
+        note(fallback=True)
+        _, stdout = self._run_command(['wmic', 'baseboard', 'get', 'SerialNumber'])
+        lines = stdout.strip().split('\n')
+        if len(lines) > 1:
+            return lines[1].strip()
+        return UNAVAILABLE
+
+    def cim_values(self, class_name: str, properties: Iterable[str]) -> List[Dict[str, str]]:
+        """
+        Lit des propriétés de toutes les instances d'une classe CIM en une requête
+        (greffons: BIOS, GPU, mémoire); retourne une liste de {propriété: valeur}
+        """
+        selected = ", ".join(properties)
+        returncode, stdout = self._run_powershell(
+            f"Get-CimInstance -ClassName {class_name} | Select-Object {selected} | ConvertTo-Json -Compress")
+        if returncode != 0 or not stdout.strip():
+            raise RuntimeError(f"requête CIM {class_name} en échec")
+        data = json.loads(stdout)
+        if isinstance(data, dict):
+            data = [data]
+        return [{name: str(value).strip() for name, value in item.items() if value is not None}
+                for item in data]
+
+    def hardware_batch(self) -> Dict[str, str]:
+        """
+        Interroge toutes les classes CIM en une seule requête PowerShell
+        Retourne un dictionnaire vide si la requête groupée échoue
+        """
+        try:
+            returncode, stdout = self._run_powershell(CIM_BATCH_COMMAND)
+            if returncode != 0 or not stdout.strip():
+                return {}
+            data = json.loads(stdout)
+            if not isinstance(data, dict):
+                return {}
+            return {CIM_BATCH_FIELDS[name]: str(value).strip()
+                    for name, value in data.items() if value and name in CIM_BATCH_FIELDS}
+        except Exception:
+            return {}
+
+    def network_adapters(self) -> List[Dict[str, str]]:
+        ps_command = """
+        Get-NetAdapter | Where-Object {$_.Status -eq 'Up'} | Select-Object Name, InterfaceDescription, MacAddress | ConvertTo-Json
+        """
+        returncode, stdout = self._run_powershell(ps_command)
+
+        if returncode == 0 and stdout.strip():
+            adapters = json.loads(stdout)
+            if isinstance(adapters, dict):
+                adapters = [adapters]
+            return adapters
+        return []
+
+
+class LinuxProvider(InventoryProvider):
+    """
+    Backend Linux natif: lit /etc/machine-id, /proc/cpuinfo et sysfs
+    (/sys/class/dmi/id, /sys/block, /sys/class/net) sans lancer de processus
+    """
+
+    name = "linux"
+
+    # Drapeaux CPUID feature EDX (feuille 1) tels que nommés par /proc/cpuinfo
+    CPUID_EDX_FLAGS = (
+        "fpu", "vme", "de", "pse", "tsc", "msr", "pae", "mce",
+        "cx8", "apic", None, "sep", "mtrr", "pge", "mca", "cmov",
+        "pat", "pse36", "pn", "clflush", None, "dts", "acpi", "mmx",
+        "fxsr", "sse", "sse2", "ss", "ht", "tm", "ia64", "pbe"
+    )
+
+    def __init__(self, root: str = "/"):
+        # Racine du système de fichiers (permet de lire une arborescence capturée)
+        self.root = root
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _read_file(self, *parts: str) -> str:
+        with open(self._path(*parts), 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+
+    def _read_machine_guid(self) -> str:
+        for candidate in (("etc", "machine-id"), ("var", "lib", "dbus", "machine-id")):
+            try:
+                return self._read_file(*candidate)
+            except FileNotFoundError:
+                continue
+        raise NotImplementedError
+
+    def _read_cpu_id(self) -> str:
+        """
+        Reconstitue l'équivalent du ProcessorId Windows (EDX:EAX de CPUID feuille 1)
+        à partir de la famille, du modèle, du stepping et des drapeaux du CPU 0
+        """
+        cpu = {}
+        for line in self._read_file("proc", "cpuinfo").splitlines():
+            if not line.strip():
+                break
+            name, _, value = line.partition(':')
+            cpu[name.strip()] = value.strip()
+
+        if "Serial" in cpu:
+            return cpu["Serial"]
+        if "cpu family" not in cpu:
+            raise NotImplementedError
+
+        family = int(cpu["cpu family"])
+        model = int(cpu.get("model", 0))
+        stepping = int(cpu.get("stepping", 0))
+        base_family = min(family, 0xF)
+        eax = (stepping & 0xF) | ((model & 0xF) << 4) | (base_family << 8)
+        eax |= ((model >> 4) & 0xF) << 16 | ((family - base_family) & 0xFF) << 20
+
+        flags = set(cpu.get("flags", "").split())
+        edx = 0
+        for bit, flag in enumerate(self.CPUID_EDX_FLAGS):
+            if flag in flags:
+                edx |= 1 << bit
+        return f"{edx:08X}{eax:08X}"
+
+    def _block_devices(self) -> List[str]:
+        """Disques physiques (ceux qui ont un périphérique associé), triés"""
+        devices = []
+        for path in sorted(glob.glob(self._path("sys", "block", "*"))):
+            if os.path.exists(os.path.join(path, "device")):
+                devices.append(path)
+        return devices
+
+    @staticmethod
+    def _disk_serial(path: str) -> str:
+        """Numéro de série d'un disque de /sys/block (chaîne vide s'il est illisible)"""
+        for name in ("serial", "wwid"):
+            try:
+                with open(os.path.join(path, "device", name), 'r') as f:
+                    serial = f.read().strip()
+            except OSError:
+                continue
+            if serial:
+                return serial
+        try:
+            # Page VPD 0x80 (SCSI/SATA): 4 octets d'en-tête puis le numéro de série
+            with open(os.path.join(path, "device", "vpd_pg80"), 'rb') as f:
+                return f.read()[4:].decode('ascii', 'replace').strip()
+        except OSError:
+            return ""
+
+    def _read_disk_serial(self) -> str:
+        for path in self._block_devices():
+            serial = self._disk_serial(path)
+            if serial:
+                return serial
+        raise NotImplementedError
+
+    def _read_motherboard_serial(self) -> str:
+        try:
+            return self._read_file("sys", "class", "dmi", "id", "board_serial")
+        except (FileNotFoundError, PermissionError):
+            # Absent (machine virtuelle, ARM) ou réservé à root: non disponible
+            raise NotImplementedError
+
+    def _interfaces(self) -> List[Dict[str, str]]:
+        """Interfaces réseau avec une adresse matérielle non nulle (hors loopback)"""
+        interfaces = []
+        for path in sorted(glob.glob(self._path("sys", "class", "net", "*"))):
+            try:
+                with open(os.path.join(path, "address"), 'r') as f:
+                    address = f.read().strip()
+            except OSError:
+                continue
+            if not address or address == "00:00:00:00:00:00":
+                continue
+            try:
+                with open(os.path.join(path, "operstate"), 'r') as f:
+                    state = f.read().strip()
+            except OSError:
+                state = "unknown"
+            interfaces.append({
+                "Name": os.path.basename(path),
+                "MacAddress": address,
+                "Physical": os.path.exists(os.path.join(path, "device")),
+                "Up": state == "up"
+            })
+        return interfaces
+
+    def _read_mac_address(self) -> str:
+        interfaces = self._interfaces()
+        # Préférer une interface physique, comme uuid.getnode()
+        for interface in interfaces:
+            if interface["Physical"]:
+                return interface["MacAddress"]
+        if interfaces:
+            return interfaces[0]["MacAddress"]
+        raise NotImplementedError
+
+    def network_adapters(self) -> List[Dict[str, str]]:
+        return [{
+            "Name": interface["Name"],
+            "InterfaceDescription": "Physique" if interface["Physical"] else "Virtuelle",
+            "MacAddress": interface["MacAddress"]
+        } for interface in self._interfaces() if interface["Up"]]
+
+    @staticmethod
+    def _sysfs_value(path: str) -> str:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                return f.read().strip()
+        except OSError:
+            return ""
+
+    def devices(self) -> Iterator[Dict]:
+        """Énumération complète depuis sysfs, sans processus"""
+        note(backend="sysfs")
+        for path in self._block_devices():
+            device = {"Kind": "disk", "Name": os.path.basename(path),
+                      "Model": self._sysfs_value(os.path.join(path, "device", "model")),
+                      "Serial": self._disk_serial(path)}
+            sectors = self._sysfs_value(os.path.join(path, "size"))
+            if sectors.isdigit():
+                # Taille exprimée en secteurs de 512 octets, quel que soit le disque
+                device["Size"] = int(sectors) * 512
+            yield {name: value for name, value in device.items() if value != ""}
+        dmi = self._path("sys", "class", "dmi", "id")
+        board = {"Kind": "baseboard",
+                 "Manufacturer": self._sysfs_value(os.path.join(dmi, "board_vendor")),
+                 "Product": self._sysfs_value(os.path.join(dmi, "board_name")),
+                 "Serial": self._sysfs_value(os.path.join(dmi, "board_serial"))}
+        if any(board[name] for name in ("Manufacturer", "Product", "Serial")):
+            yield {name: value for name, value in board.items() if value != ""}
+        for interface in self._interfaces():
+            path = self._path("sys", "class", "net", interface["Name"])
+            device = {"Kind": "adapter", "Name": interface["Name"],
+                      "MacAddress": interface["MacAddress"],
+                      "Status": "Up" if interface["Up"] else "Down",
+                      "Physical": interface["Physical"]}
+            driver = os.path.join(path, "device", "driver")
+            if os.path.exists(driver):
+                device["Description"] = os.path.basename(os.path.realpath(driver))
+            speed = self._sysfs_value(os.path.join(path, "speed"))
+            if speed.lstrip('-').isdigit() and int(speed) > 0:
+                device["Speed"] = f"{speed} Mbps"
+            yield device
+
+
+class FixtureProvider(InventoryProvider):
+    """
+    Backend de rejeu: retourne les valeurs d'un fichier JSON {champ: valeur}
+    (clés identiques à celles de get_all_hwid_info, plus "Network Adapters")
+    La clé optionnelle "_latency" décrit le coût de chaque requête du backend
+    enregistré: {requête: {"median_ms", "sigma", "spawns"}}; la durée est tirée
+    d'une loi log-normale et les processus sont comptabilisés sans être lancés.
+    La requête "hardware_batch" simule la lecture groupée de Windows
+    """
+
+    name = "fixture"
+
+    def __init__(self, fixture, latency: Optional[Dict[str, Dict]] = None,
+                 scale: float = 1.0, seed: Optional[int] = None):
+        if isinstance(fixture, str):
+            with open(fixture, 'r', encoding='utf-8') as f:
+                fixture = json.load(f)
+        self.fixture = dict(fixture)
+        self.latency = latency if latency is not None else self.fixture.pop("_latency", {})
+        self.fixture.pop("_latency", None)
+        # Facteur appliqué aux latences simulées (0 = aucune attente)
+        self.scale = scale
+        import random
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _replay(self, query: str):
+        """Simule le coût enregistré d'une requête (attente et processus)"""
+        cost = self.latency.get(query)
+        if not cost:
+            return
+        with self._lock:
+            self.spawns += cost.get("spawns", 0)
+            median = cost.get("median_ms", 0.0)
+            delay = self._random.lognormvariate(math.log(median), cost.get("sigma", 0.0)) if median > 0 else 0.0
+        if delay and self.scale:
+            time.sleep(delay * self.scale / 1000.0)
+
+    def _value(self, field: str) -> str:
+        self._replay(field)
+        if field not in self.fixture:
+            raise NotImplementedError
+        return self.fixture[field]
+
+    def hardware_batch(self) -> Dict[str, str]:
+        if "hardware_batch" not in self.latency:
+            return {}
+        self._replay("hardware_batch")
+        return {field: self.fixture[field] for field in CIM_BATCH_FIELDS.values()
+                if self.fixture.get(field)}
+
+    def _read_machine_guid(self) -> str:
+        return self._value("Machine GUID")
+
+    def _read_cpu_id(self) -> str:
+        return self._value("CPU ID")
+
+    def _read_disk_serial(self) -> str:
+        return self._value("Disk Serial")
+
+    def _read_motherboard_serial(self) -> str:
+        return self._value("Motherboard Serial")
+
+    def _read_mac_address(self) -> str:
+        return self._value("MAC Address")
+
+    def _read_product_id(self) -> str:
+        return self._value("Windows Product ID")
+
+    def platform_name(self) -> str:
+        return _guard(lambda: self._value("Platform"))
+
+    def computer_name(self) -> str:
+        return _guard(lambda: self._value("Computer Name"))
+
+    def _read_component(self, name: str) -> str:
+        return self._value(name)
+
+    def network_adapters(self) -> List[Dict[str, str]]:
+        self._replay("Network Adapters")
+        return list(self.fixture.get("Network Adapters", []))
+
+    def devices(self) -> Iterator[Dict]:
+        """Périphériques de la clé "Devices", sinon reconstitués depuis les champs"""
+        if "Devices" not in self.fixture:
+            yield from super().devices()
+            return
+        self._replay("devices")
+        for device in self.fixture["Devices"]:
+            parsed = parse_device(json.dumps(device))
+            if parsed is not None:
+                yield parsed
+
+    @staticmethod
+    def record(provider: InventoryProvider, path: str) -> Dict:
+        """Capture les valeurs d'un backend dans un fichier de fixture"""
+        fixture = {
+            "Machine GUID": provider.machine_guid(),
+            "CPU ID": provider.cpu_id(),
+            "Disk Serial": provider.disk_serial(),
+            "Motherboard Serial": provider.motherboard_serial(),
+            "MAC Address": provider.mac_address(),
+            "Windows Product ID": provider.product_id(),
+            "Platform": provider.platform_name(),
+            "Computer Name": provider.computer_name(),
+            "Network Adapters": provider.network_adapters(),
+            "Devices": list(provider.devices())
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        return fixture
+
+
+def default_provider(session: Optional[WorkerSession] = None,
+                     query_timeout: float = 10.0) -> InventoryProvider:
+    """Choisit le backend adapté à la plateforme courante"""
+    if sys.platform == 'win32':
+        return WindowsProvider(session=session, query_timeout=query_timeout)
+    if sys.platform.startswith('linux'):
+        return LinuxProvider()
+    return InventoryProvider()
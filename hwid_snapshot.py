@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Enregistrement typé d'un inventaire
+HWIDSnapshot est un enregistrement immuable à __slots__: une valeur, un statut
+(ok, non disponible, erreur, délai dépassé, non collecté) et un horodatage par
+champ, avec une sérialisation binaire compacte
+"""
+
+import struct
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+# Champs retournés par get_all_hwid_info (ordre d'affichage)
+HWID_FIELDS = (
+    "Machine GUID",
+    "CPU ID",
+    "Disk Serial",
+    "Motherboard Serial",
+    "MAC Address",
+    "Windows Product ID",
+    "Composite HWID",
+    "Platform",
+    "Computer Name"
+)
+
+# Nom d'attribut de chaque champ (même ordre que HWID_FIELDS)
+FIELD_ATTRS = (
+    "machine_guid",
+    "cpu_id",
+    "disk_serial",
+    "motherboard_serial",
+    "mac_address",
+    "product_id",
+    "composite_hwid",
+    "platform",
+    "computer_name"
+)
+
+# Valeur retournée quand un composant n'existe pas sur le backend
+UNAVAILABLE = "Non disponible"
+
+# Valeur des champs dont la collecte a dépassé le délai imparti
+TIMEOUT_VALUE = "Délai dépassé"
+
+# Préfixe des valeurs d'erreur retournées par les getters
+ERROR_PREFIX = "Erreur: "
+
+# Statut d'un champ
+STATUS_OK = 0
+STATUS_UNAVAILABLE = 1
+STATUS_ERROR = 2
+STATUS_TIMEOUT = 3
+STATUS_MISSING = 4
+
+STATUS_NAMES = ("ok", "unavailable", "error", "timeout", "missing")
+
+# Format binaire: en-tête (magique, version, nombre de champs), puis par champ
+# statut (u8), horodatage (f64) et longueur de la valeur UTF-8 (u32; u16 dans
+# la version 1, toujours lue)
+_MAGIC = b"HS"
+_VERSION = 2
+_HEADER = struct.Struct("<2sBB")
+_FIELD = struct.Struct("<BdI")
+_FIELDS_BY_VERSION = {1: struct.Struct("<BdH"), _VERSION: _FIELD}
+
+_INDEX = {name: i for i, name in enumerate(HWID_FIELDS)}
+_INDEX.update({attr: i for i, attr in enumerate(FIELD_ATTRS)})
+
+
+def parse_value(value: Optional[str]) -> Tuple[int, str]:
+    """Convertit une valeur affichable (getters) en (statut, valeur ou détail)"""
+    if value is None:
+        return STATUS_MISSING, ""
+    if value == UNAVAILABLE:
+        return STATUS_UNAVAILABLE, ""
+    if value == TIMEOUT_VALUE:
+        return STATUS_TIMEOUT, ""
+    if value.startswith(ERROR_PREFIX):
+        return STATUS_ERROR, value[len(ERROR_PREFIX):]
+    if value == ERROR_PREFIX.rstrip():
+        return STATUS_ERROR, ""
+    return STATUS_OK, value
+
+
+def format_value(status: int, value: str) -> Optional[str]:
+    """Inverse de parse_value: valeur affichable (None si non collecté)"""
+    if status == STATUS_OK:
+        return value
+    if status == STATUS_UNAVAILABLE:
+        return UNAVAILABLE
+    if status == STATUS_TIMEOUT:
+        return TIMEOUT_VALUE
+    if status == STATUS_ERROR:
+        return ERROR_PREFIX + value
+    return None
+
+
+class HWIDSnapshot:
+    """
+    Inventaire immuable d'une machine
+    Chaque attribut (machine_guid, cpu_id...) contient la valeur si le statut
+    est STATUS_OK, le message d'erreur si STATUS_ERROR, sinon une chaîne vide.
+    Les statuts et horodatages sont conservés sous forme compacte (bytes)
+    """
+
+    __slots__ = FIELD_ATTRS + ("_status", "_stamps")
+
+    def __init__(self, values: Dict[str, Optional[str]],
+                 stamps: Optional[Dict[str, float]] = None,
+                 timestamp: Optional[float] = None):
+        """
+        values: {champ: valeur affichable} avec les clés de HWID_FIELDS
+        (ou les noms d'attributs); les champs absents sont STATUS_MISSING
+        stamps: horodatage par champ, timestamp par défaut (maintenant)
+        """
+        default_stamp = time.time() if timestamp is None else timestamp
+        stamps = stamps or {}
+        status = bytearray(len(HWID_FIELDS))
+        times = []
+        for i, (name, attr) in enumerate(zip(HWID_FIELDS, FIELD_ATTRS)):
+            raw = values.get(name, values.get(attr))
+            code, value = parse_value(raw)
+            status[i] = code
+            object.__setattr__(self, attr, value)
+            times.append(0.0 if code == STATUS_MISSING
+                         else stamps.get(name, stamps.get(attr, default_stamp)))
+        object.__setattr__(self, "_status", bytes(status))
+        object.__setattr__(self, "_stamps", struct.pack(f"<{len(times)}d", *times))
+
+    @classmethod
+    def _raw(cls, values, status: bytes, stamps: bytes) -> "HWIDSnapshot":
+        """Construction directe sans analyse des valeurs"""
+        snapshot = cls.__new__(cls)
+        for attr, value in zip(FIELD_ATTRS, values):
+            object.__setattr__(snapshot, attr, value)
+        object.__setattr__(snapshot, "_status", status)
+        object.__setattr__(snapshot, "_stamps", stamps)
+        return snapshot
+
+    def __setattr__(self, name, value):
+        raise AttributeError("HWIDSnapshot est immuable")
+
+    def __delattr__(self, name):
+        raise AttributeError("HWIDSnapshot est immuable")
+
+    def status(self, field: str) -> int:
+        """Statut d'un champ (nom HWID ou nom d'attribut)"""
+        return self._status[_INDEX[field]]
+
+    def timestamp(self, field: str) -> float:
+        """Horodatage de collecte d'un champ (0.0 si non collecté)"""
+        return struct.unpack_from("<d", self._stamps, 8 * _INDEX[field])[0]
+
+    def value(self, field: str) -> Optional[str]:
+        """Valeur du champ si elle a été obtenue, sinon None"""
+        index = _INDEX[field]
+        if self._status[index] != STATUS_OK:
+            return None
+        return getattr(self, FIELD_ATTRS[index])
+
+    def ok(self, field: str) -> bool:
+        return self._status[_INDEX[field]] == STATUS_OK
+
+    def display(self, field: str) -> Optional[str]:
+        """Valeur affichable, identique à celle des getters de HWIDManager"""
+        index = _INDEX[field]
+        return format_value(self._status[index], getattr(self, FIELD_ATTRS[index]))
+
+    def items(self) -> Iterator[Tuple[str, int, str, float]]:
+        """Itère sur (champ, statut, valeur ou détail, horodatage)"""
+        stamps = struct.unpack(f"<{len(HWID_FIELDS)}d", self._stamps)
+        for i, name in enumerate(HWID_FIELDS):
+            yield name, self._status[i], getattr(self, FIELD_ATTRS[i]), stamps[i]
+
+    def to_info(self) -> Dict[str, str]:
+        """Dictionnaire compatible avec get_all_hwid_info (champs collectés)"""
+        return {name: format_value(code, value)
+                for name, code, value, _ in self.items() if code != STATUS_MISSING}
+
+    @classmethod
+    def from_info(cls, info: Dict[str, str], stamps: Optional[Dict[str, float]] = None,
+                  timestamp: Optional[float] = None) -> "HWIDSnapshot":
+        """Construit un snapshot depuis le dictionnaire de get_all_hwid_info"""
+        return cls(info, stamps=stamps, timestamp=timestamp)
+
+    def replace(self, field: str, value: Optional[str],
+                stamp: Optional[float] = None) -> "HWIDSnapshot":
+        """Copie du snapshot avec un champ remplacé (valeur affichable)"""
+        index = _INDEX[field]
+        code, parsed = parse_value(value)
+        values = [getattr(self, attr) for attr in FIELD_ATTRS]
+        values[index] = parsed
+        status = bytearray(self._status)
+        status[index] = code
+        stamps = bytearray(self._stamps)
+        struct.pack_into("<d", stamps, 8 * index,
+                         0.0 if code == STATUS_MISSING else (time.time() if stamp is None else stamp))
+        return self._raw(values, bytes(status), bytes(stamps))
+
+    def to_bytes(self) -> bytes:
+        """Sérialisation binaire compacte"""
+        parts = [_HEADER.pack(_MAGIC, _VERSION, len(HWID_FIELDS))]
+        stamps = struct.unpack(f"<{len(HWID_FIELDS)}d", self._stamps)
+        for i, attr in enumerate(FIELD_ATTRS):
+            encoded = getattr(self, attr).encode('utf-8')
+            parts.append(_FIELD.pack(self._status[i], stamps[i], len(encoded)))
+            parts.append(encoded)
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data) -> "HWIDSnapshot":
+        """Désérialise un snapshot produit par to_bytes (bytes ou memoryview)"""
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC or version not in _FIELDS_BY_VERSION or count != len(HWID_FIELDS):
+            raise ValueError("Format de snapshot non reconnu")
+        field = _FIELDS_BY_VERSION[version]
+        offset = _HEADER.size
+        values = []
+        status = bytearray(count)
+        stamps = []
+        for i in range(count):
+            code, stamp, length = field.unpack_from(data, offset)
+            offset += field.size
+            values.append(bytes(data[offset:offset + length]).decode('utf-8'))
+            offset += length
+            status[i] = code
+            stamps.append(stamp)
+        return cls._raw(values, bytes(status), struct.pack(f"<{count}d", *stamps))
+
+    def __eq__(self, other):
+        if not isinstance(other, HWIDSnapshot):
+            return NotImplemented
+        return self.to_bytes() == other.to_bytes()
+
+    def __hash__(self):
+        return hash(self.to_bytes())
+
+    def __repr__(self):
+        fields = ", ".join(f"{attr}={getattr(self, attr)!r}" for attr in FIELD_ATTRS
+                           if self._status[_INDEX[attr]] == STATUS_OK)
+        return f"HWIDSnapshot({fields})"
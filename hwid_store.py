@@ -0,0 +1,769 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Stockage d'inventaires de parc
+Magasin binaire en ajout seul: chaque chaîne distincte (plateforme, numéro de
+série...) est écrite une seule fois dans un dictionnaire et désignée par sa
+position; chaque enregistrement a une taille fixe (horodatage, un identifiant
+de chaîne et un statut par champ). Les lectures passent par mmap sans charger
+le magasin en mémoire.
+
+Usage:
+    python hwid_manager.py --ndjson -n 0 | python hwid_store.py ingest parc/
+    python hwid_store.py scan parc/ [-f mac-address] [--limit 10]
+    python hwid_store.py count parc/ [-f machine-guid --value 3f2b...]
+    python hwid_store.py lookup parc/ -f mac-address --value a4:bb:6d:12:34:56
+    python hwid_store.py stats parc/
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hwid_snapshot import (FIELD_ATTRS, HWIDSnapshot, HWID_FIELDS, STATUS_MISSING, STATUS_OK,
+                           format_value, parse_value)
+
+STRINGS_FILE = "strings.dat"
+STRINGS_INDEX_FILE = "strings.idx"
+RECORDS_FILE = "records.dat"
+INDEX_DIRECTORY = "index"
+
+# Champs indexés (recherche des machines partageant une valeur)
+INDEXED_FIELDS = (
+    "Machine GUID",
+    "CPU ID",
+    "Disk Serial",
+    "Motherboard Serial",
+    "MAC Address",
+    "Composite HWID"
+)
+
+# Identifiant de la chaîne vide (valeurs non disponibles, hors délai...)
+EMPTY_ID = 0
+
+_STRINGS_MAGIC = b"HWSD\x01\x00\x00\x00"
+_LENGTH = struct.Struct("<I")
+
+# Enregistrement: horodatage (f64), identifiants de chaînes (u64) puis statuts (u8)
+_RECORDS_HEADER = struct.Struct("<4sBB2x")
+_RECORDS_MAGIC = b"HWSR"
+_RECORDS_VERSION = 1
+_FIELD_COUNT = len(HWID_FIELDS)
+_RECORD_LAYOUT = f"<d{_FIELD_COUNT}Q{_FIELD_COUNT}B"
+_RECORD = struct.Struct(_RECORD_LAYOUT + f"{-struct.calcsize(_RECORD_LAYOUT) % 8}x")
+_ID = struct.Struct("<Q")
+_STATUS = struct.Struct("<B")
+
+# Tables de hachage: en-tête (magique, capacité, entrées, couverture) puis cases (clé, valeur)
+_TABLE_HEADER = struct.Struct("<8sQQQ")
+_TABLE_MAGIC = b"HWSI\x01\x00\x00\x00"
+_SLOT = struct.Struct("<QQ")
+_CHAIN_MAGIC = b"HWSC\x01\x00\x00\x00"
+INITIAL_CAPACITY = 1024
+# Nombre de chaînes gardées en mémoire pendant l'ajout
+RECENT_STRINGS = 65536
+MAX_LOAD = 0.7
+_GOLDEN = 0x9E3779B97F4A7C15
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+_INDEX = {name: i for i, name in enumerate(HWID_FIELDS)}
+_ID_OFFSET = 8
+_STATUS_OFFSET = 8 + 8 * _FIELD_COUNT
+
+
+def parse_timestamp(value: Optional[str]) -> float:
+    """Horodatage ISO 8601 (champ Timestamp du mode --ndjson) en secondes epoch"""
+    if not value:
+        return time.time()
+    stamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def format_timestamp(stamp: float) -> str:
+    return datetime.fromtimestamp(stamp, timezone.utc).isoformat(timespec='seconds')
+
+
+class _MappedFile:
+    """Fichier en ajout seul relu via mmap (projection renouvelée quand il grandit)"""
+
+    def __init__(self, path: str, header: bytes, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        if not readonly and not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(header)
+        self._writer = None if readonly else open(path, 'ab')
+        self._dirty = False
+        self._reader = open(path, 'rb')
+        self._map = None
+        self._mapped = 0
+
+    def size(self) -> int:
+        if self._writer is not None:
+            return self._writer.tell()
+        return os.fstat(self._reader.fileno()).st_size
+
+    def append(self, data: bytes) -> int:
+        """Ajoute des octets et retourne leur position"""
+        position = self._writer.tell()
+        self._writer.write(data)
+        self._dirty = True
+        return position
+
+    def view(self, end: int):
+        """Projection couvrant au moins les end premiers octets"""
+        if end > self._mapped:
+            if self._dirty:
+                self._writer.flush()
+                self._dirty = False
+            # L'ancienne projection reste valide tant que des vues y font référence
+            self._mapped = os.fstat(self._reader.fileno()).st_size
+            self._map = mmap.mmap(self._reader.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def flush(self):
+        if self._writer is not None and self._dirty:
+            self._writer.flush()
+            self._dirty = False
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Des vues sans copie sont encore utilisées: libération par le ramasse-miettes
+                pass
+            self._map = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._reader.close()
+
+
+class HashTable:
+    """
+    Table de hachage persistante à adressage ouvert (sondage linéaire), projetée
+    en mémoire: clés et valeurs u64, clé 0 réservée aux cases vides. Une même clé
+    peut apparaître plusieurs fois (insert) ou être unique (put).
+    La capacité double quand le taux de remplissage dépasse MAX_LOAD
+    """
+
+    def __init__(self, path: str, readonly: bool = False, capacity: int = INITIAL_CAPACITY):
+        self.path = path
+        self.readonly = readonly
+        self._file = None
+        self._map = None
+        self.capacity = 0
+        self.used = 0
+        self._covered = 0
+        if not os.path.exists(path):
+            if readonly:
+                return
+            self._create(path, capacity)
+        self._open()
+
+    @staticmethod
+    def _create(path: str, capacity: int):
+        with open(path, 'wb') as f:
+            f.write(_TABLE_HEADER.pack(_TABLE_MAGIC, capacity, 0, 0))
+            f.truncate(_TABLE_HEADER.size + capacity * _SLOT.size)
+
+    def _open(self):
+        self._file = open(self.path, 'rb' if self.readonly else 'r+b')
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE)
+        magic, self.capacity, self.used, self._covered = _TABLE_HEADER.unpack_from(self._map, 0)
+        if magic != _TABLE_MAGIC or self.capacity & (self.capacity - 1):
+            raise ValueError(f"Index non reconnu: {self.path}")
+        self._shift = 64 - (self.capacity.bit_length() - 1)
+
+    @property
+    def covered(self) -> int:
+        """Position (enregistrement ou octet) jusqu'à laquelle la table est à jour"""
+        return self._covered
+
+    @covered.setter
+    def covered(self, value: int):
+        self._covered = value
+        if self._map is not None:
+            _TABLE_HEADER.pack_into(self._map, 0, _TABLE_MAGIC, self.capacity, self.used, value)
+
+    def _slots(self, key: int) -> Iterator[Tuple[int, int, int]]:
+        """Cases sondées pour la clé: (position, clé, valeur), jusqu'à une case vide"""
+        if self._map is None:
+            return
+        slot = ((key * _GOLDEN) & _MASK64) >> self._shift
+        mask = self.capacity - 1
+        while True:
+            position = _TABLE_HEADER.size + slot * _SLOT.size
+            found, value = _SLOT.unpack_from(self._map, position)
+            yield position, found, value
+            if found == 0:
+                return
+            slot = (slot + 1) & mask
+
+    def find(self, key: int) -> Iterator[int]:
+        """Valeurs associées à la clé"""
+        for _, found, value in self._slots(key):
+            if found == key:
+                yield value
+
+    def get(self, key: int) -> Optional[int]:
+        return next(self.find(key), None)
+
+    def insert(self, key: int, value: int):
+        """Ajoute une entrée (sans remplacer les entrées de même clé)"""
+        if (self.used + 1) > self.capacity * MAX_LOAD:
+            self._grow()
+        for position, found, _ in self._slots(key):
+            if found == 0:
+                _SLOT.pack_into(self._map, position, key, value)
+                self.used += 1
+                _TABLE_HEADER.pack_into(self._map, 0, _TABLE_MAGIC, self.capacity, self.used, self._covered)
+                return
+
+    def put(self, key: int, value: int) -> Optional[int]:
+        """Associe la valeur à la clé (remplace l'entrée existante); retourne l'ancienne valeur"""
+        for position, found, previous in self._slots(key):
+            if found == key:
+                _SLOT.pack_into(self._map, position, key, value)
+                return previous
+        self.insert(key, value)
+        return None
+
+    def _grow(self):
+        """Double la capacité et réinsère toutes les entrées"""
+        entries = [_SLOT.unpack_from(self._map, _TABLE_HEADER.size + slot * _SLOT.size)
+                   for slot in range(self.capacity)]
+        covered = self._covered
+        capacity = self.capacity * 2
+        self.close()
+        temporary = self.path + ".tmp"
+        self._create(temporary, capacity)
+        os.replace(temporary, self.path)
+        self._open()
+        for key, value in entries:
+            if key:
+                self.insert(key, value)
+        self.covered = covered
+
+    def flush(self):
+        if self._map is not None and not self.readonly:
+            self._map.flush()
+
+    def close(self):
+        if self._map is not None:
+            self.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _hash_bytes(data: bytes) -> int:
+    """Hash 64 bits stable d'une chaîne encodée (jamais nul)"""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little') or 1
+
+
+class StringDictionary:
+    """
+    Dictionnaire de chaînes en ajout seul: longueur (u32) puis octets UTF-8
+    L'identifiant d'une chaîne est sa position dans le fichier; l'index
+    persistant (hash de la chaîne -> identifiant) évite de relire le dictionnaire
+    """
+
+    def __init__(self, path: str, index_path: str, readonly: bool = False):
+        self._file = _MappedFile(path, _STRINGS_MAGIC, readonly)
+        self._index = HashTable(index_path, readonly)
+        self._readonly = readonly
+        # Chaînes récemment utilisées (plateformes, CPU... répétés à chaque inventaire)
+        self._recent = {}
+        # Position jusqu'à laquelle l'index est à jour en mémoire; la valeur
+        # persistée (index.covered) n'avance qu'à flush(), une fois les chaînes
+        # écrites, et ne couvre donc jamais des octets absents du dictionnaire
+        self._covered = self._index.covered
+        if not readonly:
+            # Rattrapage des chaînes écrites sans mise à jour de l'index (les
+            # entrées déjà insérées avant un arrêt brutal ne sont pas dupliquées)
+            for position, encoded in self._entries(self._covered):
+                key = _hash_bytes(encoded)
+                if position not in self._index.find(key):
+                    self._index.insert(key, position)
+            self._covered = self._file.size()
+            self._index.covered = self._covered
+
+    def _entries(self, start: int) -> Iterator[Tuple[int, bytes]]:
+        """Chaînes du dictionnaire à partir de la position indiquée"""
+        position = max(start, len(_STRINGS_MAGIC))
+        end = self._file.size()
+        if position >= end:
+            return
+        view = self._file.view(end)
+        while position + _LENGTH.size <= end:
+            length, = _LENGTH.unpack_from(view, position)
+            yield position, view[position + _LENGTH.size:position + _LENGTH.size + length]
+            position += _LENGTH.size + length
+
+    def _find(self, encoded: bytes) -> Optional[int]:
+        for string_id in self._index.find(_hash_bytes(encoded)):
+            if self.raw(string_id) == encoded:
+                return string_id
+        # Chaînes ajoutées après la dernière mise à jour de l'index (lecture seule)
+        for position, candidate in self._entries(self._covered):
+            if candidate == encoded:
+                return position
+        return None
+
+    def intern(self, value: str) -> int:
+        """Identifiant de la chaîne, ajoutée au dictionnaire si nécessaire"""
+        if not value:
+            return EMPTY_ID
+        string_id = self._recent.get(value)
+        if string_id is not None:
+            return string_id
+        encoded = value.encode('utf-8')
+        string_id = self._find(encoded)
+        if string_id is None:
+            string_id = self._file.append(_LENGTH.pack(len(encoded)) + encoded)
+            self._index.insert(_hash_bytes(encoded), string_id)
+            self._covered = self._file.size()
+        if len(self._recent) >= RECENT_STRINGS:
+            self._recent.clear()
+        self._recent[value] = string_id
+        return string_id
+
+    def lookup(self, value: str) -> Optional[int]:
+        """Identifiant d'une chaîne déjà présente, None sinon"""
+        if not value:
+            return EMPTY_ID
+        return self._find(value.encode('utf-8'))
+
+    def raw(self, string_id: int) -> memoryview:
+        """Octets UTF-8 de la chaîne, sans copie"""
+        if string_id == EMPTY_ID:
+            return memoryview(b"")
+        view = self._file.view(string_id + _LENGTH.size)
+        length, = _LENGTH.unpack_from(view, string_id)
+        start = string_id + _LENGTH.size
+        if start + length > len(view):
+            view = self._file.view(start + length)
+        return memoryview(view)[start:start + length]
+
+    def get(self, string_id: int) -> str:
+        return str(self.raw(string_id), 'utf-8') if string_id != EMPTY_ID else ""
+
+    def __len__(self) -> int:
+        return self._index.used + sum(1 for _ in self._entries(self._covered))
+
+    def size(self) -> int:
+        return self._file.size()
+
+    def flush(self):
+        # Les chaînes d'abord: l'index ne peut couvrir que des octets écrits
+        self._file.flush()
+        if not self._readonly:
+            self._index.covered = self._covered
+        self._index.flush()
+
+    def close(self):
+        if not self._readonly:
+            self.flush()
+        self._file.close()
+        self._index.close()
+
+
+class FieldIndex:
+    """
+    Index persistant d'un champ: table des têtes (identifiant de chaîne ->
+    dernier enregistrement + 1) et chaînage (enregistrement -> enregistrement
+    précédent de même valeur + 1, 0 en fin de liste), un u64 par enregistrement.
+    Seules les valeurs obtenues (STATUS_OK) sont indexées
+    """
+
+    def __init__(self, directory: str, field: str, readonly: bool = False):
+        self.field = field
+        attr = FIELD_ATTRS[_INDEX[field]]
+        self._heads_path = os.path.join(directory, attr + ".heads")
+        self._chain_path = os.path.join(directory, attr + ".chain")
+        self.readonly = readonly
+        self._open()
+
+    def _open(self):
+        self.heads = HashTable(self._heads_path, self.readonly)
+        self._chain = None
+        if not self.readonly:
+            entries = 0
+            if os.path.exists(self._chain_path):
+                entries = (os.path.getsize(self._chain_path) - len(_CHAIN_MAGIC)) // _ID.size
+            if entries < self.heads.covered:
+                # Chaînage tronqué ou absent: les têtes référencent des maillons
+                # perdus, l'index est reconstruit depuis le premier enregistrement
+                self.heads.close()
+                for path in (self._heads_path, self._chain_path):
+                    if os.path.exists(path):
+                        os.remove(path)
+                self.heads = HashTable(self._heads_path)
+            elif os.path.exists(self._chain_path):
+                # Chaînage écrit sans mise à jour des têtes: retour au dernier état cohérent
+                with open(self._chain_path, 'r+b') as f:
+                    f.truncate(len(_CHAIN_MAGIC) + _ID.size * self.heads.covered)
+        if not self.readonly or os.path.exists(self._chain_path):
+            self._chain = _MappedFile(self._chain_path, _CHAIN_MAGIC, self.readonly)
+
+    @property
+    def covered(self) -> int:
+        """Nombre d'enregistrements indexés"""
+        if self._chain is None:
+            return 0
+        return min(self.heads.covered, (self._chain.size() - len(_CHAIN_MAGIC)) // _ID.size)
+
+    def reset(self):
+        """Supprime l'index (reconstruit ensuite depuis le premier enregistrement)"""
+        self.close()
+        for path in (self._heads_path, self._chain_path):
+            if os.path.exists(path):
+                os.remove(path)
+        self._open()
+
+    def add(self, index: int, string_id: int):
+        """Indexe l'enregistrement suivant (EMPTY_ID: valeur non indexée)"""
+        previous = self.heads.put(string_id, index + 1) if string_id != EMPTY_ID else None
+        self._chain.append(_ID.pack(previous or 0))
+        self.heads.covered = index + 1
+
+    def records(self, string_id: int) -> Iterator[int]:
+        """Enregistrements indexés ayant cette valeur, du plus récent au plus ancien"""
+        head = self.heads.get(string_id)
+        if not head:
+            return
+        # Les têtes peuvent déjà référencer des ajouts d'un autre processus
+        covered = self.covered
+        view = self._chain.view(len(_CHAIN_MAGIC) + _ID.size * head)
+        while head:
+            index = head - 1
+            if index < covered:
+                yield index
+            head, = _ID.unpack_from(view, len(_CHAIN_MAGIC) + _ID.size * index)
+
+    def flush(self):
+        self.heads.flush()
+        if self._chain is not None:
+            self._chain.flush()
+
+    def close(self):
+        self.heads.close()
+        if self._chain is not None:
+            self._chain.close()
+            self._chain = None
+
+
+class FleetStore:
+    """
+    Magasin d'inventaires de parc (répertoire contenant strings.dat et records.dat)
+    Les enregistrements sont numérotés dans l'ordre d'ajout; l'accès à un champ
+    ne lit que les octets de ce champ dans la projection mmap.
+    Les champs de INDEXED_FIELDS ont un index persistant (répertoire index/),
+    mis à jour à chaque ajout et rattrapé à l'ouverture en écriture
+    """
+
+    def __init__(self, path: str, readonly: bool = False, indexed: bool = True):
+        self.path = path
+        self.readonly = readonly
+        self.indexes = {}
+        if not readonly:
+            os.makedirs(path, exist_ok=True)
+        self.strings = StringDictionary(os.path.join(path, STRINGS_FILE),
+                                        os.path.join(path, STRINGS_INDEX_FILE), readonly)
+        records_path = os.path.join(path, RECORDS_FILE)
+        if not readonly:
+            self._truncate_partial(records_path)
+        self._records = _MappedFile(
+            records_path, _RECORDS_HEADER.pack(_RECORDS_MAGIC, _RECORDS_VERSION, _FIELD_COUNT), readonly)
+        header = self._records.view(_RECORDS_HEADER.size)
+        magic, version, count = _RECORDS_HEADER.unpack_from(header, 0)
+        if magic != _RECORDS_MAGIC or version != _RECORDS_VERSION or count != _FIELD_COUNT:
+            self.close()
+            raise ValueError(f"Format de magasin non reconnu: {records_path}")
+        if indexed:
+            directory = os.path.join(path, INDEX_DIRECTORY)
+            if not readonly:
+                os.makedirs(directory, exist_ok=True)
+            self.indexes = {field: FieldIndex(directory, field, readonly) for field in INDEXED_FIELDS}
+            if not readonly:
+                self._catch_up()
+
+    def _catch_up(self):
+        """Indexe les enregistrements ajoutés sans mise à jour des index"""
+        total = len(self)
+        for field, index in self.indexes.items():
+            if index.covered > total:
+                index.reset()
+            for number, status, string_id in self.iter_column(field, index.covered):
+                index.add(number, string_id if status == STATUS_OK else EMPTY_ID)
+
+    @staticmethod
+    def _truncate_partial(path: str):
+        """Supprime un enregistrement incomplet (écriture interrompue)"""
+        if not os.path.exists(path):
+            return
+        size = os.path.getsize(path)
+        extra = (size - _RECORDS_HEADER.size) % _RECORD.size if size > _RECORDS_HEADER.size else 0
+        if extra:
+            with open(path, 'r+b') as f:
+                f.truncate(size - extra)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return (self._records.size() - _RECORDS_HEADER.size) // _RECORD.size
+
+    def _offset(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Enregistrement inexistant")
+        return _RECORDS_HEADER.size + index * _RECORD.size
+
+    def _view(self, offset: int):
+        return self._records.view(offset + _RECORD.size)
+
+    # Écriture
+
+    def append(self, info: Dict[str, Optional[str]], timestamp: Optional[float] = None) -> int:
+        """
+        Ajoute un inventaire (dictionnaire de get_all_hwid_info ou HWIDSnapshot)
+        et retourne son numéro d'enregistrement
+        """
+        if isinstance(info, HWIDSnapshot):
+            if timestamp is None:
+                timestamp = max(stamp for _, _, _, stamp in info.items())
+            info = info.to_info()
+        ids = []
+        statuses = []
+        for name in HWID_FIELDS:
+            status, value = parse_value(info.get(name))
+            statuses.append(status)
+            ids.append(self.strings.intern(value))
+        self._records.append(_RECORD.pack(time.time() if timestamp is None else timestamp,
+                                          *ids, *statuses))
+        number = len(self) - 1
+        for field, index in self.indexes.items():
+            i = _INDEX[field]
+            index.add(number, ids[i] if statuses[i] == STATUS_OK else EMPTY_ID)
+        return number
+
+    def ingest(self, lines: Iterable[str]) -> int:
+        """
+        Ajoute les inventaires d'un flux NDJSON (hwid_manager.py --ndjson)
+        ligne par ligne; retourne le nombre d'enregistrements ajoutés
+        """
+        added = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            self.append(record, parse_timestamp(record.get("Timestamp")))
+            added += 1
+        self.flush()
+        return added
+
+    def flush(self):
+        # Le dictionnaire d'abord: un enregistrement ne référence jamais une chaîne absente
+        self.strings.flush()
+        self._records.flush()
+        for index in self.indexes.values():
+            index.flush()
+
+    def close(self):
+        self.strings.close()
+        self._records.close()
+        for index in self.indexes.values():
+            index.close()
+
+    # Lecture
+
+    def timestamp(self, index: int) -> float:
+        offset = self._offset(index)
+        return struct.unpack_from("<d", self._view(offset), offset)[0]
+
+    def status(self, index: int, field: str) -> int:
+        offset = self._offset(index)
+        return _STATUS.unpack_from(self._view(offset), offset + _STATUS_OFFSET + _INDEX[field])[0]
+
+    def value_id(self, index: int, field: str) -> int:
+        """Identifiant de chaîne du champ (comparable sans décodage)"""
+        offset = self._offset(index)
+        return _ID.unpack_from(self._view(offset), offset + _ID_OFFSET + 8 * _INDEX[field])[0]
+
+    def value(self, index: int, field: str) -> Optional[str]:
+        """Valeur du champ si elle a été obtenue, sinon None"""
+        if self.status(index, field) != STATUS_OK:
+            return None
+        return self.strings.get(self.value_id(index, field))
+
+    def display(self, index: int, field: str) -> Optional[str]:
+        """Valeur affichable, identique à celle des getters de HWIDManager"""
+        return format_value(self.status(index, field),
+                            self.strings.get(self.value_id(index, field)))
+
+    def record(self, index: int) -> Tuple[float, Tuple[int, ...], bytes]:
+        """Enregistrement brut: (horodatage, identifiants, statuts)"""
+        offset = self._offset(index)
+        fields = _RECORD.unpack_from(self._view(offset), offset)
+        return fields[0], fields[1:1 + _FIELD_COUNT], bytes(fields[1 + _FIELD_COUNT:])
+
+    def info(self, index: int) -> Dict[str, str]:
+        """Dictionnaire compatible avec get_all_hwid_info (champs collectés)"""
+        _, ids, statuses = self.record(index)
+        return {name: format_value(status, self.strings.get(string_id))
+                for name, string_id, status in zip(HWID_FIELDS, ids, statuses)
+                if status != STATUS_MISSING}
+
+    def snapshot(self, index: int) -> HWIDSnapshot:
+        return HWIDSnapshot(self.info(index), timestamp=self.timestamp(index))
+
+    def iter_column(self, field: str, start: int = 0,
+                    stop: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        Parcourt un champ: (numéro, statut, identifiant de chaîne)
+        Seuls les octets de ce champ sont lus, aucune chaîne n'est décodée
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        view = self._view(self._offset(stop - 1))
+        id_offset = _ID_OFFSET + 8 * _INDEX[field]
+        status_offset = _STATUS_OFFSET + _INDEX[field]
+        offset = _RECORDS_HEADER.size + start * _RECORD.size
+        for index in range(start, stop):
+            yield (index, view[offset + status_offset],
+                   _ID.unpack_from(view, offset + id_offset)[0])
+            offset += _RECORD.size
+
+    def scan(self, fields: Optional[Iterable[str]] = None, start: int = 0,
+             stop: Optional[int] = None) -> Iterator[Dict[str, str]]:
+        """Inventaires successifs (champs demandés), décodés un par un"""
+        names = HWID_FIELDS if fields is None else [name for name in HWID_FIELDS if name in set(fields)]
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop):
+            stamp, ids, statuses = self.record(index)
+            record = {"Timestamp": format_timestamp(stamp)}
+            for name in names:
+                i = _INDEX[name]
+                if statuses[i] != STATUS_MISSING:
+                    record[name] = format_value(statuses[i], self.strings.get(ids[i]))
+            yield record
+
+    def lookup(self, field: str, value: str) -> List[int]:
+        """
+        Numéros des enregistrements dont le champ a la valeur indiquée (ordre d'ajout)
+        Via l'index pour les valeurs obtenues des champs indexés, sinon par parcours
+        """
+        status, parsed = parse_value(value)
+        string_id = self.strings.lookup(parsed)
+        if string_id is None:
+            return []
+        index = self.indexes.get(field)
+        if index is None or status != STATUS_OK:
+            return [number for number, code, found in self.iter_column(field)
+                    if code == status and found == string_id]
+        numbers = list(index.records(string_id))
+        numbers.reverse()
+        # Enregistrements ajoutés après la dernière mise à jour de l'index (lecture seule)
+        numbers.extend(number for number, code, found in self.iter_column(field, index.covered)
+                       if code == status and found == string_id)
+        return numbers
+
+    def count(self, field: Optional[str] = None, value: Optional[str] = None) -> int:
+        """Nombre d'enregistrements (dont le champ a la valeur indiquée)"""
+        if field is None:
+            return len(self)
+        return len(self.lookup(field, value))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "records": len(self),
+            "record_size": _RECORD.size,
+            "strings": len(self.strings),
+            "strings_bytes": self.strings.size(),
+            "records_bytes": self._records.size()
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande du magasin"""
+    from hwid_manager import resolve_field
+
+    parser = argparse.ArgumentParser(description="Magasin d'inventaires HWID de parc")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ingest = commands.add_parser("ingest", help="Ajoute des inventaires NDJSON")
+    ingest.add_argument("store", help="Répertoire du magasin")
+    ingest.add_argument("inputs", nargs="*", help="Fichiers NDJSON (entrée standard par défaut)")
+
+    scan = commands.add_parser("scan", help="Affiche les inventaires en NDJSON")
+    scan.add_argument("store", help="Répertoire du magasin")
+    scan.add_argument("-f", "--field", dest="fields", action="append", type=resolve_field,
+                      metavar="CHAMP", help="Champ à afficher (répétable)")
+    scan.add_argument("--start", type=int, default=0, help="Premier enregistrement")
+    scan.add_argument("--limit", type=int, default=None, help="Nombre maximal d'enregistrements")
+
+    count = commands.add_parser("count", help="Compte les enregistrements")
+    count.add_argument("store", help="Répertoire du magasin")
+    count.add_argument("-f", "--field", type=resolve_field, metavar="CHAMP")
+    count.add_argument("--value", help="Valeur recherchée pour le champ")
+
+    lookup = commands.add_parser("lookup", help="Inventaires ayant une valeur donnée")
+    lookup.add_argument("store", help="Répertoire du magasin")
+    lookup.add_argument("-f", "--field", type=resolve_field, metavar="CHAMP", required=True)
+    lookup.add_argument("--value", required=True, help="Valeur recherchée")
+
+    stats = commands.add_parser("stats", help="Taille du magasin")
+    stats.add_argument("store", help="Répertoire du magasin")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "ingest":
+        with FleetStore(args.store) as store:
+            added = 0
+            if not args.inputs:
+                added = store.ingest(sys.stdin)
+            for path in args.inputs:
+                with open(path, 'r', encoding='utf-8') as f:
+                    added += store.ingest(f)
+            print(f"✅ {added} inventaire(s) ajouté(s) ({len(store)} au total)", file=sys.stderr)
+        return 0
+
+    with FleetStore(args.store, readonly=True) as store:
+        if args.command == "scan":
+            stop = None if args.limit is None else args.start + args.limit
+            for record in store.scan(args.fields, args.start, stop):
+                print(json.dumps(record, ensure_ascii=False))
+        elif args.command == "count":
+            if (args.field is None) != (args.value is None):
+                parser.error("--field et --value s'utilisent ensemble")
+            print(store.count(args.field, args.value))
+        elif args.command == "lookup":
+            for number in store.lookup(args.field, args.value):
+                print(json.dumps(dict(Record=number, **store.info(number)), ensure_ascii=False))
+        else:
+            print(json.dumps(store.stats(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Surveillance des changements matériels
+Un événement n'est émis que lorsqu'un composant change. Sous Linux, les
+collecteurs ne sont relancés que sur signal du noyau (uevents des disques et
+cartes réseau, changements de liens via netlink); ailleurs, les vérifications
+s'espacent tant que rien ne change (de min_interval à max_interval)
+"""
+
+import select
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from hwid_fingerprint import COMPOSITE_COMPONENTS
+from hwid_fleet import diff_records
+from hwid_snapshot import HWID_FIELDS
+
+# Champs recollectés selon le sous-système signalé par le noyau
+SIGNAL_FIELDS = {
+    "block": ("Disk Serial",),
+    "net": ("MAC Address",)
+}
+
+DEFAULT_MIN_INTERVAL = 2.0
+DEFAULT_MAX_INTERVAL = 300.0
+
+# Regroupement des signaux reçus en rafale (secondes)
+DEBOUNCE = 0.5
+
+# Durée maximale d'une attente sans vérifier la demande d'arrêt (secondes)
+STOP_POLL = 0.5
+
+NETLINK_ROUTE = 0
+NETLINK_KOBJECT_UEVENT = 15
+RTMGRP_LINK = 1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+_UEVENT_ACTIONS = (b"add", b"remove", b"change", b"move")
+_NLMSG_HEADER = struct.Struct("=IHHII")
+
+
+def describe_event(event: Dict) -> str:
+    """Description d'un changement pour le journal"""
+    if event["Event"] == "added":
+        return f"🔔 {event['Field']} apparu: {event['New']}"
+    if event["Event"] == "removed":
+        return f"🔔 {event['Field']} disparu (était {event['Old']})"
+    return f"🔔 {event['Field']}: {event['Old']} → {event['New']}"
+
+
+class NetlinkSignals:
+    """
+    Signaux de changement du noyau Linux: uevents (ajout ou retrait de disques
+    et cartes réseau) et messages de liens réseau (RTMGRP_LINK)
+    """
+
+    def __init__(self):
+        if not hasattr(socket, "AF_NETLINK"):
+            raise OSError("netlink indisponible sur ce système")
+        self._sockets = {}
+        for kind, protocol, kind_type, groups in (
+                ("uevent", NETLINK_KOBJECT_UEVENT, socket.SOCK_DGRAM, 1),
+                ("route", NETLINK_ROUTE, socket.SOCK_RAW, RTMGRP_LINK)):
+            try:
+                sock = socket.socket(socket.AF_NETLINK, kind_type, protocol)
+                sock.bind((0, groups))
+                sock.setblocking(False)
+                self._sockets[sock] = kind
+            except OSError:
+                continue
+        if not self._sockets:
+            raise OSError("abonnement netlink refusé")
+
+    @staticmethod
+    def _uevent_fields(data: bytes) -> Iterable[str]:
+        keys = dict(item.split(b"=", 1) for item in data.split(b"\0") if b"=" in item)
+        if keys.get(b"ACTION") not in _UEVENT_ACTIONS:
+            return ()
+        return SIGNAL_FIELDS.get(keys.get(b"SUBSYSTEM", b"").decode('ascii', 'replace'), ())
+
+    @staticmethod
+    def _route_fields(data: bytes) -> Iterable[str]:
+        offset = 0
+        while offset + _NLMSG_HEADER.size <= len(data):
+            length, kind, _, _, _ = _NLMSG_HEADER.unpack_from(data, offset)
+            if kind in (RTM_NEWLINK, RTM_DELLINK):
+                return SIGNAL_FIELDS["net"]
+            if length < _NLMSG_HEADER.size:
+                break
+            offset += (length + 3) & ~3
+        return ()
+
+    def _drain(self, ready) -> Set[str]:
+        fields = set()
+        for sock in ready:
+            while True:
+                try:
+                    data = sock.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError:
+                    # Tampon du socket débordé (ENOBUFS, rafale d'uevents): des
+                    # signaux sont perdus, tous les champs surveillés sont revérifiés
+                    for names in SIGNAL_FIELDS.values():
+                        fields.update(names)
+                    break
+                if self._sockets[sock] == "uevent":
+                    fields.update(self._uevent_fields(data))
+                else:
+                    fields.update(self._route_fields(data))
+        return fields
+
+    def wait(self, timeout: float, stop: threading.Event) -> Set[str]:
+        """
+        Attend un signal pertinent (au plus timeout secondes) et retourne les
+        champs concernés; les signaux suivants sont regroupés pendant DEBOUNCE
+        """
+        deadline = time.monotonic() + timeout
+        fields = set()
+        while not stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select(list(self._sockets), [], [], min(remaining, STOP_POLL))
+            fields |= self._drain(ready)
+            if fields:
+                # Une rafale (branchement d'un disque, lien qui remonte) en un seul événement
+                deadline = min(deadline, time.monotonic() + DEBOUNCE)
+        return fields
+
+    def close(self):
+        for sock in self._sockets:
+            sock.close()
+        self._sockets = {}
+
+
+class HWIDWatcher:
+    """
+    Surveille les champs indiqués et appelle on_change(événements, informations)
+    à chaque changement de composant (événements de hwid_fleet.diff_records)
+    """
+
+    def __init__(self, manager, fields: Optional[Iterable[str]] = None,
+                 min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL,
+                 signals: Optional[bool] = None):
+        """
+        signals: None = signaux du noyau si le backend lit la machine Linux
+        locale, False = vérifications périodiques uniquement
+        """
+        self.manager = manager
+        self.fields = tuple(HWID_FIELDS if fields is None else fields)
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.current = None
+        self.checks = 0
+        self._stop = threading.Event()
+        self._signals = None
+        if signals is None:
+            signals = manager.provider.name == "linux"
+        if signals:
+            try:
+                self._signals = NetlinkSignals()
+            except OSError:
+                self._signals = None
+
+    @property
+    def event_driven(self) -> bool:
+        """Vrai si les collecteurs ne sont relancés que sur signal du noyau"""
+        return self._signals is not None
+
+    def _expand(self, fields: Iterable[str]) -> List[str]:
+        """Champs surveillés à relire (le HWID composite suit ses composants)"""
+        wanted = set(fields) & set(self.fields)
+        if "Composite HWID" in self.fields and wanted & set(COMPOSITE_COMPONENTS):
+            wanted.add("Composite HWID")
+        return [name for name in self.fields if name in wanted]
+
+    def _polled_fields(self) -> List[str]:
+        """Champs susceptibles de changer sans redémarrage (durée de validité finie)"""
+        ttls = self.manager.cache.ttls
+        default = self.manager.cache.default_ttl
+        return self._expand(name for name in self.fields if ttls.get(name, default) is not None)
+
+    def baseline(self) -> Dict[str, str]:
+        """Relève l'état de référence"""
+        self.current = self.manager.get_all_hwid_info(fields=self.fields)
+        return dict(self.current)
+
+    def check(self, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Relit les champs indiqués (par défaut ceux qui peuvent changer sans
+        redémarrage) en ignorant le cache, et retourne les changements
+        """
+        if self.current is None:
+            self.baseline()
+        names = self._polled_fields() if fields is None else self._expand(fields)
+        if not names:
+            return []
+        # Sans réécriture du cache persistant: seule une valeur modifiée l'écrit
+        self.manager.invalidate(*[name for name in names if name != "Composite HWID"], persist=False)
+        # Les composants du HWID composite sont relus avec lui (lecture groupée du
+        # matériel): leurs changements expliquent celui du composite
+        if "Composite HWID" in names:
+            names = [name for name in self.fields if name in names or name in COMPOSITE_COMPONENTS]
+        info = self.manager.get_all_hwid_info(fields=names)
+        self.checks += 1
+        events = diff_records(self.current, info, names)
+        self.current.update(info)
+        return events
+
+    def wait(self) -> Optional[Set[str]]:
+        """Attend le prochain signal (champs signalés) ou l'échéance (None)"""
+        if self._signals is not None:
+            fields = self._signals.wait(self.interval, self._stop)
+            return fields or None
+        self._stop.wait(self.interval)
+        return None
+
+    def run(self, on_change: Callable[[List[Dict], Dict[str, str]], None]):
+        """
+        Boucle de surveillance (jusqu'à stop()). Avec les signaux du noyau, une
+        vérification complète n'a lieu que toutes les max_interval secondes;
+        sinon l'intervalle double après chaque vérification sans changement
+        """
+        if self.current is None:
+            self.baseline()
+        self.interval = self.max_interval if self.event_driven else self.min_interval
+        while not self._stop.is_set():
+            signalled = self.wait()
+            if self._stop.is_set():
+                break
+            events = self.check(signalled)
+            if events:
+                on_change(events, dict(self.current))
+            if self.event_driven:
+                self.interval = self.max_interval
+            elif events:
+                self.interval = self.min_interval
+            else:
+                self.interval = min(self.interval * 2, self.max_interval)
+
+    def stop(self):
+        self._stop.set()
+
+    def close(self):
+        self.stop()
+        if self._signals is not None:
+            self._signals.close()
+            self._signals = None
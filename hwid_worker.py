@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+"""
+HWID Manager - Session PowerShell persistante
+Un processus worker unique reçoit les requêtes sur stdin et répond sur stdout
+(une trame JSON par ligne), ce qui évite de relancer PowerShell à chaque requête;
+une requête "stream" reçoit sa sortie au fil de l'eau, une trame par ligne
+"""
+
+import base64
+import itertools
+import json
+import queue
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional
+
+# Boucle exécutée par le worker PowerShell: une requête JSON par ligne en entrée,
+# une réponse JSON compacte par ligne en sortie (précédée, pour une requête
+# "stream", d'une trame {"id", "line"} par objet produit par la commande)
+POWERSHELL_WORKER_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+[Console]::InputEncoding = [System.Text.Encoding]::UTF8
+[Console]::OutputEncoding = [System.Text.Encoding]::UTF8
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    $request = $line | ConvertFrom-Json
+    try {
+        if ($request.stream) {
+            Invoke-Expression $request.command | ForEach-Object {
+                [Console]::Out.WriteLine((@{ id = $request.id; line = [string]$_ } | ConvertTo-Json -Compress))
+                [Console]::Out.Flush()
+            }
+            $response = @{ id = $request.id; ok = $true; stdout = '' }
+        } else {
+            $output = Invoke-Expression $request.command | Out-String
+            $response = @{ id = $request.id; ok = $true; stdout = $output.Trim() }
+        }
+    } catch {
+        $response = @{ id = $request.id; ok = $false; error = $_.Exception.Message }
+    }
+    [Console]::Out.WriteLine(($response | ConvertTo-Json -Compress))
+    [Console]::Out.Flush()
+}
+"""
+
+
+class WorkerError(Exception):
+    """Erreur de communication avec le worker"""
+
+
+class WorkerTimeout(WorkerError):
+    """Le worker n'a pas répondu dans le délai imparti"""
+
+
+def powershell_worker_argv() -> List[str]:
+    """Ligne de commande du worker PowerShell (script passé en base64 UTF-16LE)"""
+    encoded = base64.b64encode(POWERSHELL_WORKER_SCRIPT.encode('utf-16-le')).decode('ascii')
+    return ['powershell', '-NoLogo', '-NoProfile', '-NonInteractive', '-EncodedCommand', encoded]
+
+
+class WorkerSession:
+    """
+    Session longue durée vers un processus worker
+    Le transport est défini par argv: tout programme qui respecte le protocole
+    (JSON par ligne: {"id", "command"} -> {"id", "ok", "stdout"|"error"}, et
+    pour {"id", "command", "stream": true}, des trames {"id", "line"} d'abord)
+    peut remplacer PowerShell, par exemple `python hwid_worker.py --replay fixture.json`
+    Le worker traite une requête à la fois: les requêtes de threads différents
+    sont sérialisées sur la session, si bien que les collectes parallèles
+    (collect avec deadline) ne se recouvrent pas sous Windows; une requête qui
+    ne doit pas attendre les autres passe par sa propre session
+    """
+
+    def __init__(self, argv: Optional[List[str]] = None, timeout: float = 15.0,
+                 idle_timeout: float = 60.0):
+        self.argv = argv if argv is not None else powershell_worker_argv()
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.restarts = 0
+        # Nombre de processus worker lancés depuis la création de la session
+        self.spawns = 0
+        self._proc = None
+        self._responses = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._idle_timer = None
+        # Génération du minuteur d'inactivité: un minuteur déjà déclenché mais
+        # remplacé entre-temps (nouvelle requête) ne doit pas arrêter le worker
+        self._idle_generation = 0
+        self._aborted = False
+
+    @property
+    def alive(self) -> bool:
+        """Indique si le processus worker est en cours d'exécution"""
+        return self._proc is not None and self._proc.poll() is None
+
+    def _start(self):
+        """Démarre le processus worker et son thread de lecture"""
+        import subprocess
+        creationflags = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        self._proc = subprocess.Popen(
+            self.argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            creationflags=creationflags
+        )
+        self.spawns += 1
+        self._responses = queue.Queue()
+        threading.Thread(target=self._read_loop,
+                         args=(self._proc, self._responses),
+                         daemon=True).start()
+
+    @staticmethod
+    def _read_loop(proc, responses):
+        """Lit les trames de réponse; None signale la fin du flux"""
+        for line in proc.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                responses.put(json.loads(line))
+            except ValueError:
+                continue
+        responses.put(None)
+
+    def _kill(self):
+        """Termine le processus worker courant"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except Exception:
+            pass
+
+    def _send(self, request_id: int, command: str, timeout: float, stream: bool = False) -> Dict:
+        """Envoie une requête et attend sa première trame de réponse"""
+        request = {"id": request_id, "command": command}
+        if stream:
+            request["stream"] = True
+        self._proc.stdin.write(json.dumps(request) + "\n")
+        self._proc.stdin.flush()
+        return self._receive(request_id, timeout)
+
+    def _receive(self, request_id: int, timeout: float) -> Dict:
+        """Attend la prochaine trame de la requête (celles d'une requête abandonnée sont ignorées)"""
+        while True:
+            try:
+                response = self._responses.get(timeout=timeout)
+            except queue.Empty:
+                self._kill()
+                raise WorkerTimeout(f"Pas de réponse du worker après {timeout}s")
+            if response is None:
+                raise BrokenPipeError("Le worker s'est arrêté")
+            if response.get("id") == request_id:
+                return response
+
+    def request(self, command: str, timeout: Optional[float] = None) -> str:
+        """
+        Exécute une commande dans le worker et retourne sa sortie standard
+        Le worker est redémarré une fois s'il a planté entre deux requêtes
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._aborted = False
+            self._cancel_idle_timer()
+            try:
+                for attempt in range(2):
+                    if not self.alive:
+                        if self._proc is not None:
+                            self.restarts += 1
+                        self._kill()
+                        self._start()
+                    try:
+                        response = self._send(next(self._ids), command, timeout)
+                        break
+                    except (BrokenPipeError, OSError, ValueError) as e:
+                        self._kill()
+                        if self._aborted:
+                            raise WorkerTimeout("Requête interrompue")
+                        self.restarts += 1
+                        if attempt == 1:
+                            raise WorkerError(f"Worker indisponible: {e}")
+            finally:
+                self._arm_idle_timer()
+
+        if not response.get("ok"):
+            raise WorkerError(response.get("error") or "Erreur inconnue")
+        return response.get("stdout") or ""
+
+    def stream(self, command: str, timeout: Optional[float] = None) -> Iterator[str]:
+        """
+        Exécute une commande dans le worker et produit sa sortie ligne par ligne,
+        sans attendre la fin de la commande; timeout borne l'attente de chaque
+        ligne. La session reste réservée jusqu'à la fin ou l'abandon de la
+        lecture, et le worker n'est redémarré que si aucune ligne n'a été produite
+        """
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self._aborted = False
+            self._cancel_idle_timer()
+            try:
+                for attempt in range(2):
+                    if not self.alive:
+                        if self._proc is not None:
+                            self.restarts += 1
+                        self._kill()
+                        self._start()
+                    request_id = next(self._ids)
+                    produced = False
+                    try:
+                        response = self._send(request_id, command, timeout, stream=True)
+                        while "line" in response:
+                            produced = True
+                            yield response["line"]
+                            response = self._receive(request_id, timeout)
+                        break
+                    except (BrokenPipeError, OSError, ValueError) as e:
+                        self._kill()
+                        if self._aborted:
+                            raise WorkerTimeout("Requête interrompue")
+                        self.restarts += 1
+                        if produced or attempt == 1:
+                            raise WorkerError(f"Worker indisponible: {e}")
+            finally:
+                self._arm_idle_timer()
+
+        if not response.get("ok"):
+            raise WorkerError(response.get("error") or "Erreur inconnue")
+
+    def _arm_idle_timer(self):
+        """Programme l'arrêt du worker après une période d'inactivité"""
+        if self.idle_timeout and self.alive:
+            self._idle_generation += 1
+            self._idle_timer = threading.Timer(self.idle_timeout, self._idle_shutdown,
+                                               args=(self._idle_generation,))
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        self._idle_generation += 1
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _idle_shutdown(self, generation: int):
+        with self._lock:
+            if generation != self._idle_generation:
+                return
+            self._idle_timer = None
+            self._kill()
+
+    def abort(self):
+        """
+        Tue le worker sans attendre la requête en cours (appelable depuis
+        un autre thread); la requête interrompue lève WorkerTimeout
+        """
+        self._aborted = True
+        proc = self._proc
+        if proc is not None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+    def close(self):
+        """Arrête le worker"""
+        with self._lock:
+            self._cancel_idle_timer()
+            self._kill()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def serve_replay(fixture_path: str):
+    """
+    Worker de substitution: répond aux commandes depuis un fichier JSON
+    {commande: sortie}, pour tester les sessions sans PowerShell
+    """
+    with open(fixture_path, 'r', encoding='utf-8') as f:
+        fixture = json.load(f)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        command = request.get("command")
+        if command in fixture and request.get("stream"):
+            for output in fixture[command].splitlines():
+                sys.stdout.write(json.dumps({"id": request.get("id"), "line": output}) + "\n")
+            response = {"id": request.get("id"), "ok": True, "stdout": ""}
+        elif command in fixture:
+            response = {"id": request.get("id"), "ok": True, "stdout": fixture[command]}
+        else:
+            response = {"id": request.get("id"), "ok": False, "error": f"Commande inconnue: {command}"}
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--replay":
+        serve_replay(sys.argv[2])
+    else:
+        print("Usage: python hwid_worker.py --replay fixture.json")
+        sys.exit(2)
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la collecte par champs: collect() sur plusieurs groupes et mode non
+interactif (run_batch) rejoué sur une fixture
+"""
+
+import contextlib
+import io
+import json
+import unittest
+from unittest import mock
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_cache import SnapshotCache
+from hwid_manager import HWIDManager, run_batch
+from hwid_providers import FixtureProvider
+
+# Un champ par groupe de collecte: registre, lecture groupée du matériel, réseau, système
+MULTI_GROUP_FIELDS = ["Machine GUID", "CPU ID", "Disk Serial", "MAC Address", "Computer Name"]
+
+
+class CollectTest(unittest.TestCase):
+
+    def manager(self) -> HWIDManager:
+        return HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE), cache=SnapshotCache())
+
+    def test_collect_returns_every_requested_field(self):
+        manager = self.manager()
+        self.assertGreater(len(manager.registry.groups(MULTI_GROUP_FIELDS)), 1)
+        info = manager.collect(fields=MULTI_GROUP_FIELDS)
+        self.assertEqual(list(info), MULTI_GROUP_FIELDS)
+        for name in MULTI_GROUP_FIELDS:
+            self.assertEqual(info[name], DEFAULT_FIXTURE[name])
+
+    def test_deadline_collection_matches_sequential(self):
+        sequential = self.manager().get_all_hwid_info()
+        concurrent = self.manager().get_all_hwid_info(deadline=30)
+        self.assertEqual(concurrent, sequential)
+
+    def test_on_field_reports_each_field(self):
+        seen = {}
+        info = self.manager().collect(on_field=seen.__setitem__)
+        self.assertEqual(seen, info)
+
+
+class RunBatchTest(unittest.TestCase):
+
+    def run_batch(self, *argv: str) -> str:
+        output = io.StringIO()
+        with mock.patch("hwid_providers.default_provider",
+                        lambda **kwargs: FixtureProvider(DEFAULT_FIXTURE)), \
+                contextlib.redirect_stdout(output):
+            self.assertEqual(run_batch(list(argv)), 0)
+        return output.getvalue()
+
+    def test_json_selected_fields(self):
+        record = json.loads(self.run_batch("--json", "-f", "cpu-id", "-f", "mac_address"))
+        self.assertEqual(set(record), {"Timestamp", "CPU ID", "MAC Address"})
+        self.assertEqual(record["CPU ID"], DEFAULT_FIXTURE["CPU ID"])
+
+    def test_ndjson_samples(self):
+        lines = self.run_batch("--ndjson", "-n", "3", "-i", "0", "-f", "Composite HWID").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(len({record["Composite HWID"] for record in records}), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du registre des collecteurs et de l'inventaire évalué à la demande
+"""
+
+import os
+import tempfile
+import unittest
+
+from hwid_bench import load_fixture
+from hwid_cache import SnapshotCache
+from hwid_collectors import COST_CHEAP, COST_SPAWN, CollectorRegistry
+from hwid_manager import HWIDManager
+from hwid_providers import FixtureProvider
+
+
+class CollectorCostTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = CollectorRegistry()
+        self.registry.register_component("Sysfs", {}, cost={"windows": COST_SPAWN, "linux": COST_CHEAP})
+        self.registry.register_component("Fixe", {}, cost=COST_CHEAP)
+
+    def test_cost_per_backend(self):
+        self.assertEqual(self.registry.cost(["Sysfs"], "linux"), COST_CHEAP)
+        self.assertEqual(self.registry.cost(["Sysfs"], "windows"), COST_SPAWN)
+        # Backend non décrit: la classe la plus élevée
+        self.assertEqual(self.registry.cost(["Sysfs"], "fixture"), COST_SPAWN)
+        self.assertEqual(self.registry.cost(["Fixe"], "windows"), COST_CHEAP)
+
+    def test_groups_ordered_per_backend(self):
+        self.registry.register_component("Processus", {}, cost=COST_SPAWN)
+        linux = [names for names, _ in self.registry.groups(backend="linux")]
+        self.assertLess(linux.index(("Sysfs",)), linux.index(("Processus",)))
+        windows = dict(self.registry.groups(backend="windows"))
+        self.assertEqual(windows[("Sysfs",)], COST_SPAWN)
+
+    def test_unknown_cost_rejected(self):
+        with self.assertRaises(ValueError):
+            self.registry.register_component("Faux", {}, cost={"linux": 7})
+
+
+class LazySnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache.json")
+        self.provider = FixtureProvider(load_fixture(None), scale=0)
+        self.manager = HWIDManager(provider=self.provider, cache=SnapshotCache(path=self.path))
+
+    def test_cheap_fields_first(self):
+        snapshot = self.manager.lazy_snapshot()
+        self.assertEqual(list(snapshot)[-1], "Composite HWID")
+        self.assertEqual(snapshot["Computer Name"], "BENCH-PC")
+        self.assertEqual(self.provider.spawn_count, 0)
+
+    def test_group_read_once(self):
+        snapshot = self.manager.lazy_snapshot()
+        for name in ("CPU ID", "Disk Serial", "Motherboard Serial"):
+            snapshot[name]
+        # Une seule lecture groupée du matériel pour les trois champs
+        self.assertEqual(self.provider.spawn_count, 1)
+        self.assertEqual(self.manager.metrics.totals["CPU ID, Disk Serial, Motherboard Serial"]["runs"], 1)
+        self.assertEqual(snapshot.to_info(), self.manager.get_all_hwid_info())
+
+    def test_read_through_does_not_persist(self):
+        snapshot = self.manager.lazy_snapshot()
+        snapshot.to_info()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.manager.metrics.last_refresh, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
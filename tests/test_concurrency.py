@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du single-flight: des appels simultanés sans cache partagent la collecte
+en cours (même mesure que hwid_bench.py --stress)
+"""
+
+import threading
+import time
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE, WINDOWS_LATENCY_PROFILE, measure_stress
+from hwid_manager import SingleFlight
+
+
+class SingleFlightTest(unittest.TestCase):
+
+    def test_spawns_constant_with_callers(self):
+        fixture = dict(DEFAULT_FIXTURE, _latency=WINDOWS_LATENCY_PROFILE)
+        results = [measure_stress(callers, fixture, 0.05, 1234) for callers in (1, 4, 16)]
+        for result in results:
+            self.assertTrue(result["consistent"], result)
+            self.assertEqual(result["spawns"], results[0]["spawns"], result)
+        self.assertGreater(results[-1]["shared"], 0)
+
+    def test_leader_error_reaches_followers(self):
+        flights = SingleFlight()
+        runs = []
+
+        def failing_batch():
+            runs.append(1)
+            # Le meneur échoue une fois les trois autres appelants en attente
+            deadline = time.monotonic() + 5
+            while flights.shared < 3 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            raise RuntimeError("échec du lot")
+
+        errors = []
+
+        def call(fields):
+            try:
+                flights.do(fields, failing_batch)
+            except RuntimeError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call, args=(("CPU ID", "Disk Serial"),))
+        leader.start()
+        while not flights.in_flight():
+            time.sleep(0.001)
+        followers = [threading.Thread(target=call, args=(("CPU ID",),)) for _ in range(3)]
+        for thread in followers:
+            thread.start()
+        for thread in [leader] + followers:
+            thread.join()
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(len(errors), 4)
+        self.assertFalse(flights.in_flight())
+
+
+if __name__ == "__main__":
+    unittest.main()
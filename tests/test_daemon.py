@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du service d'inventaire local sur socket Unix
+"""
+
+import os
+import socket
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_cache import SnapshotCache
+from hwid_daemon import UNIX_SOCKET_MODE, InventoryDaemon, query
+from hwid_manager import HWIDManager
+from hwid_providers import FixtureProvider
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "sockets Unix indisponibles")
+class UnixSocketTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "hwid.sock")
+        manager = HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE), cache=SnapshotCache())
+        self.daemon = InventoryDaemon(manager, interval=3600)
+
+    def test_socket_created_with_restricted_mode(self):
+        previous = os.umask(0o022)
+        try:
+            self.daemon.bind(unix_path=self.path)
+            self.addCleanup(self.daemon.stop)
+            self.assertEqual(os.umask(0o022), 0o022)
+        finally:
+            os.umask(previous)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), UNIX_SOCKET_MODE)
+
+    def test_umask_never_changed(self):
+        with mock.patch("os.umask", side_effect=AssertionError("umask modifié")):
+            self.daemon.bind(unix_path=self.path)
+        self.addCleanup(self.daemon.stop)
+        self.assertTrue(stat.S_ISSOCK(os.lstat(self.path).st_mode))
+
+    def test_replaces_stale_socket(self):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(self.path)
+        stale.close()
+        self.daemon.bind(unix_path=self.path)
+        self.addCleanup(self.daemon.stop)
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(client.close)
+        client.connect(self.path)
+
+    def test_refuses_to_replace_regular_file(self):
+        with open(self.path, "w") as f:
+            f.write("ne pas supprimer")
+        with self.assertRaises(FileExistsError):
+            self.daemon.bind(unix_path=self.path)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "ne pas supprimer")
+
+    def test_clear_error_without_unix_server(self):
+        with mock.patch("hwid_daemon._UnixHTTPServer", None):
+            with self.assertRaisesRegex(OSError, "sockets Unix indisponibles"):
+                self.daemon.bind(unix_path=self.path)
+        self.assertFalse(os.path.lexists(self.path))
+
+    def test_serves_and_revalidates(self):
+        self.daemon.bind(unix_path=self.path)
+        self.daemon.start()
+        self.addCleanup(self.daemon.stop)
+        status, etag, document = query("/fields/cpu-id", unix_path=self.path)
+        self.assertEqual(status, 200)
+        self.assertEqual(document["CPU ID"], DEFAULT_FIXTURE["CPU ID"])
+        self.assertEqual(query("/fields/cpu-id", unix_path=self.path, etag=etag)[0], 304)
+        self.assertEqual(query("/fields/inconnu", unix_path=self.path)[0], 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
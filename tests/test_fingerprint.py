@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'empreinte composite: stabilité des encodages v2, arbre incrémental
+et compatibilité de la version 1 avec la recette historique
+"""
+
+import hashlib
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_fingerprint import (COMPOSITE_COMPONENTS, FINGERPRINT_VERSION, LEGACY_VERSION,
+                              TREE_VERSION, FingerprintTree, composite_hwid, encode_leaf,
+                              fingerprint, leaf_digest, root_digest)
+from hwid_manager import HWIDManager
+from hwid_providers import FixtureProvider
+
+COMPONENTS = {
+    "Machine GUID": "3f2b8c1e-7a4d-4e5f-9b6a-1c2d3e4f5a6b",
+    "CPU ID": "BFEBFBFF000906EA",
+    "Disk Serial": "S4EWNX0R123456",
+    "Motherboard Serial": "210987654321",
+    "MAC Address": "a4:bb:6d:12:34:56"
+}
+
+# Empreinte v2 de COMPONENTS: ne doit jamais changer (HWID archivés)
+COMPONENTS_V2 = "bae0e743431c1b9eaba33c6611c063c99db80b6f4a0b07f0a67042fe12d06807"
+
+
+def baseline_composite(values) -> str:
+    """Recette de generate_composite_hwid avant l'empreinte versionnée"""
+    combined = ''.join(str(values[name]) for name in COMPOSITE_COMPONENTS)
+    return hashlib.sha256(combined.encode()).hexdigest()
+
+
+class EncodingTest(unittest.TestCase):
+
+    def test_leaf_encoding_is_stable(self):
+        self.assertEqual(encode_leaf("CPU ID", "BFEBFBFF000906EA").hex(),
+                         "09000000687769642d6c6561660206000000435055204944"
+                         "001000000042464542464246463030303930364541")
+        # Composant non disponible: statut explicite, valeur vide
+        self.assertEqual(encode_leaf("CPU ID", "Non disponible").hex(),
+                         "09000000687769642d6c65616602060000004350552049440100000000")
+
+    def test_root_digest_is_stable(self):
+        leaves = [leaf_digest(name, COMPONENTS[name]) for name in COMPOSITE_COMPONENTS]
+        self.assertEqual(root_digest(leaves).hex(), COMPONENTS_V2)
+        self.assertEqual(fingerprint(COMPONENTS, TREE_VERSION), COMPONENTS_V2)
+
+    def test_boundaries_are_unambiguous(self):
+        # v1 confond les découpages, v2 les distingue
+        shifted = dict(COMPONENTS, **{"Machine GUID": COMPONENTS["Machine GUID"] + "B",
+                                      "CPU ID": COMPONENTS["CPU ID"][1:]})
+        self.assertEqual(fingerprint(shifted, LEGACY_VERSION), fingerprint(COMPONENTS, LEGACY_VERSION))
+        self.assertNotEqual(fingerprint(shifted, TREE_VERSION), COMPONENTS_V2)
+
+    def test_blocked_components(self):
+        self.assertEqual(composite_hwid(dict(COMPONENTS, **{"CPU ID": "Délai dépassé"})), "Délai dépassé")
+        self.assertTrue(composite_hwid(dict(COMPONENTS, **{"Disk Serial": "Erreur: refusé"}))
+                        .startswith("Erreur: "))
+
+
+class LegacyVersionTest(unittest.TestCase):
+
+    def test_default_is_legacy(self):
+        self.assertEqual(FINGERPRINT_VERSION, LEGACY_VERSION)
+
+    def test_v1_matches_baseline_recipe(self):
+        self.assertEqual(fingerprint(COMPONENTS, LEGACY_VERSION), baseline_composite(COMPONENTS))
+
+    def test_displayed_composite_is_unchanged(self):
+        manager = HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE))
+        info = manager.get_all_hwid_info()
+        self.assertEqual(info["Composite HWID"], baseline_composite(info))
+        self.assertEqual(manager.generate_composite_hwid(info), baseline_composite(info))
+        self.assertEqual(manager.generate_composite_hwid(info, version=TREE_VERSION),
+                         fingerprint(info, TREE_VERSION))
+
+
+class FingerprintTreeTest(unittest.TestCase):
+
+    def test_matches_full_fingerprint(self):
+        tree = FingerprintTree(COMPONENTS)
+        self.assertEqual(tree.hexdigest(), COMPONENTS_V2)
+
+    def test_update_many_reports_changed_components(self):
+        tree = FingerprintTree(COMPONENTS)
+        self.assertEqual(tree.update_many(COMPONENTS), [])
+        changed = dict(COMPONENTS, **{"MAC Address": "02:00:00:00:00:01", "Disk Serial": "NEW"})
+        self.assertEqual(tree.update_many(changed), ["Disk Serial", "MAC Address"])
+        self.assertEqual(tree.last_changed, ["Disk Serial", "MAC Address"])
+        self.assertEqual(tree.hexdigest(), fingerprint(changed, TREE_VERSION))
+        # Une mise à jour sans effet conserve last_changed
+        self.assertFalse(tree.update("CPU ID", COMPONENTS["CPU ID"]))
+        self.assertEqual(tree.last_changed, ["Disk Serial", "MAC Address"])
+        self.assertTrue(tree.update("CPU ID", "AUTRE"))
+        self.assertEqual(tree.last_changed, ["CPU ID"])
+
+    def test_diff(self):
+        first = FingerprintTree(COMPONENTS)
+        second = FingerprintTree(dict(COMPONENTS, **{"Motherboard Serial": "X"}))
+        self.assertEqual(first.diff(second), ["Motherboard Serial"])
+        self.assertEqual(first.diff(FingerprintTree(COMPONENTS)), [])
+
+    def test_incomplete_tree(self):
+        tree = FingerprintTree({"CPU ID": COMPONENTS["CPU ID"]})
+        self.assertIsNone(tree.hexdigest())
+        tree.update_many(COMPONENTS)
+        self.assertEqual(tree.hexdigest(), COMPONENTS_V2)
+
+    def test_legacy_version_is_not_incremental(self):
+        with self.assertRaises(ValueError):
+            FingerprintTree(version=LEGACY_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
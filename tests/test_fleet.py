@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de l'analyse de parc: recherche de doublons (les machines sont comptées,
+pas les inventaires), rattachement k-of-n des inventaires aux actifs,
+comparaison de deux parcs, tri externe et recalcul hors ligne des empreintes
+"""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import hwid_fleet
+from hwid_fingerprint import LEGACY_VERSION, TREE_VERSION, composite_hwid
+from hwid_fleet import (AssetMatcher, UnsortedInput, component_hash, diff_fleets, diff_records,
+                        find_duplicates, iter_records, recompute, sort_records)
+from hwid_store import FleetStore
+
+
+def inventory(name: str, mac: str, guid: str) -> dict:
+    return {"Timestamp": "2026-10-18T00:00:00+00:00", "Computer Name": name, "MAC Address": mac,
+            "Machine GUID": guid, "Windows Product ID": f"00330-{name}"}
+
+
+class DuplicateFinderTest(unittest.TestCase):
+
+    def source(self, records) -> str:
+        fd, path = tempfile.mkstemp(suffix=".ndjson")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n")
+        self.addCleanup(os.unlink, path)
+        return path
+
+    def test_repeated_samples_of_one_host(self):
+        source = self.source([inventory("POSTE-01", "a4:bb:6d:12:34:56", "guid-1")] * 5)
+        clusters, total = find_duplicates(source)
+        self.assertEqual(total, 5)
+        self.assertEqual(clusters, [])
+
+    def test_clones_counted_once_each(self):
+        # Trois clones d'une même image, chacun inventorié trois fois
+        clones = [inventory(f"VM-{i}", f"02:00:00:00:00:0{i}", "guid-image") for i in range(3)]
+        source = self.source(clones * 3 + [inventory("POSTE-01", "a4:bb:6d:12:34:56", "guid-1")])
+        clusters, total = find_duplicates(source)
+        self.assertEqual(total, 10)
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]["Value"], "guid-image")
+        self.assertEqual(clusters[0]["Count"], 3)
+        self.assertEqual(sorted(clusters[0]["Machines"]), ["VM-0", "VM-1", "VM-2"])
+
+    def test_spilled_groups_deduplicate(self):
+        clones = [inventory(f"VM-{i}", f"02:00:00:00:00:{i:02x}", "guid-image") for i in range(40)]
+        hosts = [inventory(f"POSTE-{i}", f"a4:00:00:00:00:{i:02x}", f"guid-{i}") for i in range(40)]
+        source = self.source(clones + hosts + clones + hosts)
+        expected, _ = find_duplicates(source)
+        spilled, total = find_duplicates(source, max_keys=8)
+        self.assertEqual(total, 160)
+        self.assertEqual([(c["Value"], c["Count"]) for c in spilled],
+                         [(c["Value"], c["Count"]) for c in expected])
+        self.assertEqual([(c["Value"], c["Count"]) for c in spilled], [("guid-image", 40)])
+
+
+ASSET = {
+    "Machine GUID": "3f2b8c1e-7a4d-4e5f-9b6a-1c2d3e4f5a6b",
+    "CPU ID": "BFEBFBFF000906EA",
+    "Disk Serial": "S4EWNX0R123456",
+    "Motherboard Serial": "210987654321",
+    "MAC Address": "a4:bb:6d:12:34:56"
+}
+
+
+class AssetMatcherTest(unittest.TestCase):
+
+    def matcher(self, **kwargs) -> AssetMatcher:
+        matcher = AssetMatcher(**kwargs)
+        self.addCleanup(matcher.close)
+        return matcher
+
+    def test_replaced_component_keeps_asset(self):
+        matcher = self.matcher()
+        other = matcher.add({name: value + "-X" for name, value in ASSET.items()})
+        asset = matcher.add(ASSET)
+        found = matcher.match(dict(ASSET, **{"Disk Serial": "NOUVEAU-DISQUE"}))
+        self.assertNotEqual(asset, other)
+        self.assertEqual(found, (asset, ["Machine GUID", "CPU ID", "Motherboard Serial", "MAC Address"]))
+        # Moins de k composants concordants: aucun actif
+        self.assertIsNone(matcher.match({"Machine GUID": ASSET["Machine GUID"],
+                                         "CPU ID": ASSET["CPU ID"]}))
+
+    def test_junk_values_are_ignored(self):
+        self.assertEqual(component_hash("Motherboard Serial", "To be filled by O.E.M."), 0)
+        self.assertEqual(component_hash("MAC Address", "00-00-00-00-00-00"), 0)
+        junk = {"Motherboard Serial": "To be filled by O.E.M.", "Disk Serial": "0123456789",
+                "MAC Address": "00:00:00:00:00:00"}
+        matcher = self.matcher()
+        matcher.add(dict(ASSET, **junk))
+        # Seuls deux composants réels concordent: les valeurs par défaut ne comptent pas
+        self.assertIsNone(matcher.match(dict(junk, **{"Machine GUID": ASSET["Machine GUID"],
+                                                      "CPU ID": ASSET["CPU ID"]})))
+
+    def test_common_values_are_not_searched(self):
+        matcher = self.matcher(k=1, max_postings=2)
+        matcher.add({"CPU ID": "MODELE-COURANT", "Disk Serial": "D1"})
+        matcher.add({"CPU ID": "MODELE-COURANT", "Disk Serial": "D2"})
+        self.assertIsNotNone(matcher.match({"CPU ID": "MODELE-COURANT"}))
+        matcher.add({"CPU ID": "MODELE-COURANT", "Disk Serial": "D3"})
+        # Valeur partagée par plus de max_postings actifs: plus utilisée pour la recherche
+        self.assertIsNone(matcher.match({"CPU ID": "MODELE-COURANT"}))
+        self.assertEqual(matcher.match({"CPU ID": "MODELE-COURANT", "Disk Serial": "D3"}),
+                         (2, ["CPU ID", "Disk Serial"]))
+
+    def test_link_updates_asset(self):
+        matcher = self.matcher()
+        asset, agreed, created = matcher.link(ASSET)
+        self.assertTrue(created)
+        self.assertEqual(agreed, [])
+        replaced_disk = dict(ASSET, **{"Disk Serial": "NOUVEAU-DISQUE"})
+        self.assertEqual(matcher.link(replaced_disk)[::2], (asset, False))
+        # Le nouveau disque fait désormais partie de l'actif
+        replaced_mac = dict(replaced_disk, **{"MAC Address": "02:00:00:00:00:01",
+                                              "Motherboard Serial": "NOUVELLE-CARTE"})
+        self.assertEqual(matcher.link(replaced_mac),
+                         (asset, ["Machine GUID", "CPU ID", "Disk Serial"], False))
+        self.assertEqual(len(matcher), 1)
+
+    def test_persistent_index(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with AssetMatcher(tmp) as matcher:
+                matcher.add({name: value + "-X" for name, value in ASSET.items()})
+                asset = matcher.add(ASSET)
+            with AssetMatcher(tmp) as matcher:
+                self.assertEqual(len(matcher), 2)
+                self.assertEqual(matcher.match(ASSET)[0], asset)
+
+
+def write_source(test: unittest.TestCase, records) -> str:
+    fd, path = tempfile.mkstemp(suffix=".ndjson")
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    test.addCleanup(os.unlink, path)
+    return path
+
+
+class DiffTest(unittest.TestCase):
+
+    def test_diff_records_events(self):
+        old = {"Disk Serial": "D1", "MAC Address": "a4:bb", "CPU ID": "Non disponible",
+               "Motherboard Serial": "M1", "Platform": "Linux"}
+        new = {"Disk Serial": "D2", "MAC Address": "Non disponible", "CPU ID": "C1",
+               "Motherboard Serial": "Délai dépassé", "Platform": "Linux"}
+        self.assertEqual(diff_records(old, new), [
+            {"Event": "added", "Field": "CPU ID", "New": "C1"},
+            {"Event": "changed", "Field": "Disk Serial", "Old": "D1", "New": "D2"},
+            {"Event": "removed", "Field": "MAC Address", "Old": "a4:bb"}
+        ])
+        # Champ inconnu d'un côté (erreur, hors délai, non collecté): jamais signalé
+        self.assertEqual(diff_records({"Disk Serial": "D1"}, {"Disk Serial": "Erreur: refusé"}), [])
+        self.assertEqual(diff_records({"Disk Serial": "D1"}, {}), [])
+
+    def test_merge_join(self):
+        old = write_source(self, [
+            {"Machine GUID": "a", "Computer Name": "A", "Disk Serial": "D1"},
+            {"Machine GUID": "b", "Computer Name": "B1", "Disk Serial": "D2"},
+            {"Machine GUID": "b", "Computer Name": "B2", "Disk Serial": "D3"},
+            {"Machine GUID": "c", "Computer Name": "C", "Disk Serial": "D4"}
+        ])
+        new = write_source(self, [
+            {"Computer Name": "SANS-CLE"},
+            {"Machine GUID": "b", "Computer Name": "B1", "Disk Serial": "D2"},
+            {"Machine GUID": "b", "Computer Name": "B2", "Disk Serial": "D9"},
+            {"Machine GUID": "b", "Computer Name": "B3", "Disk Serial": "D5"},
+            {"Machine GUID": "c", "Computer Name": "C", "Disk Serial": "D4"},
+            {"Machine GUID": "d", "Computer Name": "D", "Disk Serial": "D6"}
+        ])
+        skipped = {}
+        events = list(diff_fleets(old, new, skipped=skipped))
+        self.assertEqual(events, [
+            {"Event": "removed", "Key": "a", "Machine": "A"},
+            {"Event": "changed", "Field": "Disk Serial", "Old": "D3", "New": "D9", "Key": "b", "Machine": "B2"},
+            {"Event": "added", "Key": "b", "Machine": "B3"},
+            {"Event": "added", "Key": "d", "Machine": "D"}
+        ])
+        self.assertEqual(skipped, {new: 1})
+
+    def test_unsorted_input(self):
+        old = write_source(self, [{"Machine GUID": "a"}])
+        new = write_source(self, [{"Machine GUID": "c"}, {"Machine GUID": "b"}])
+        with self.assertRaises(UnsortedInput):
+            list(diff_fleets(old, new))
+
+
+class SortTest(unittest.TestCase):
+
+    def test_multi_run_external_sort(self):
+        records = [{"Machine GUID": f"guid-{(number * 7919) % 101:03d}", "Computer Name": f"PC-{number}"}
+                   for number in range(101)]
+        records.insert(50, {"Computer Name": "SANS-CLE"})
+        source = write_source(self, records)
+        with tempfile.TemporaryDirectory() as spill:
+            output = io.StringIO()
+            self.assertEqual(sort_records(source, output, run_size=10, spill_dir=spill), 102)
+            # Séquences supprimées après la fusion
+            self.assertEqual(os.listdir(spill), [])
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(lines[0], {"Computer Name": "SANS-CLE"})
+        keys = [record["Machine GUID"] for record in lines[1:]]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(sorted(map(json.dumps, lines)), sorted(map(json.dumps, records)))
+        # La sortie triée est une entrée valide de diff_fleets
+        sorted_path = write_source(self, lines)
+        self.assertEqual(list(diff_fleets(sorted_path, sorted_path)), [])
+        self.assertEqual(len(list(iter_records(sorted_path))), 102)
+
+
+def archived(number: int) -> dict:
+    record = {"Computer Name": f"PC-{number}", "Machine GUID": f"guid-{number}",
+              "CPU ID": "BFEBFBFF000906EA", "Disk Serial": f"DISK-{number}",
+              "Motherboard Serial": "210987654321", "MAC Address": f"02:00:00:00:00:{number:02x}"}
+    if number % 5 == 0:
+        record["Disk Serial"] = "Erreur: accès refusé"
+    return record
+
+
+class RecomputeTest(unittest.TestCase):
+
+    RECORDS = [archived(number) for number in range(23)]
+
+    def expected(self, version: int):
+        return [composite_hwid(record, version) for record in self.RECORDS]
+
+    def run_recompute(self, source: str, version: int, workers: int):
+        output = io.StringIO()
+        count, _ = recompute(source, output, version, workers=workers, chunk_size=5)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(count, len(self.RECORDS))
+        self.assertEqual([line["Machine"] for line in lines], [r["Computer Name"] for r in self.RECORDS])
+        return [line["Composite HWID"] for line in lines]
+
+    def test_ndjson_source(self):
+        source = write_source(self, self.RECORDS)
+        for version in (LEGACY_VERSION, TREE_VERSION):
+            self.assertEqual(self.run_recompute(source, version, 1), self.expected(version))
+
+    def test_json_document(self):
+        fd, source = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(self.RECORDS, f)
+        self.addCleanup(os.unlink, source)
+        self.assertEqual(self.run_recompute(source, TREE_VERSION, 1), self.expected(TREE_VERSION))
+        # Un seul inventaire (hwid_manager.py --json)
+        with open(source, 'w', encoding='utf-8') as f:
+            json.dump(self.RECORDS[1], f)
+        output = io.StringIO()
+        self.assertEqual(recompute(source, output, workers=1)[0], 1)
+        self.assertEqual(json.loads(output.getvalue())["Composite HWID"], composite_hwid(self.RECORDS[1]))
+
+    def test_store_source(self):
+        with tempfile.TemporaryDirectory() as path:
+            with FleetStore(path) as store:
+                for record in self.RECORDS:
+                    store.append(record)
+            self.assertEqual(self.run_recompute(path, TREE_VERSION, 1), self.expected(TREE_VERSION))
+            # Magasins fermés après un recalcul dans le processus courant
+            self.assertEqual(hwid_fleet._worker_stores, {})
+            self.assertEqual(self.run_recompute(path, TREE_VERSION, 2), self.expected(TREE_VERSION))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des métriques de collecte: actualisations simultanées sur un même manager
+"""
+
+import threading
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE, WINDOWS_LATENCY_PROFILE
+from hwid_cache import SnapshotCache
+from hwid_manager import HWIDManager
+from hwid_metrics import MAX_LOOSE_RECORDS, CollectionMetrics
+from hwid_providers import FixtureProvider
+
+
+class RefreshMetricsTest(unittest.TestCase):
+
+    def test_interleaved_refreshes_stay_separate(self):
+        metrics = CollectionMetrics()
+        first, second = metrics.begin_refresh(), metrics.begin_refresh()
+        with metrics.measure("CPU ID", "fixture", first):
+            pass
+        with metrics.measure("MAC Address", "fixture", second):
+            pass
+        with metrics.measure("Machine GUID", "fixture", first):
+            pass
+        metrics.end_refresh(first)
+        self.assertEqual([r.collector for r in metrics.last_refresh], ["CPU ID", "Machine GUID"])
+        metrics.end_refresh(second)
+        self.assertEqual([r.collector for r in metrics.last_refresh], ["MAC Address"])
+        self.assertEqual([r.collector for r in first.records], ["CPU ID", "Machine GUID"])
+        self.assertEqual(metrics.totals["CPU ID"]["runs"], 1)
+
+    def test_records_outside_refresh_are_bounded(self):
+        metrics = CollectionMetrics()
+        for number in range(MAX_LOOSE_RECORDS + 50):
+            with metrics.measure(f"devices {number}", "fixture"):
+                pass
+        self.assertEqual(len(metrics.last_refresh), MAX_LOOSE_RECORDS)
+        self.assertEqual(metrics.last_refresh[-1].collector, f"devices {MAX_LOOSE_RECORDS + 49}")
+        refresh = metrics.begin_refresh()
+        with metrics.measure("CPU ID", "fixture", refresh):
+            pass
+        metrics.end_refresh(refresh)
+        self.assertEqual(len(metrics.last_refresh), 1)
+
+    def test_concurrent_refreshes_publish_whole_refresh(self):
+        provider = FixtureProvider(DEFAULT_FIXTURE, latency=WINDOWS_LATENCY_PROFILE, scale=0.02, seed=1)
+        manager = HWIDManager(provider=provider, cache=SnapshotCache(ttls={}, default_ttl=0))
+        groups = len(manager.registry.groups())
+        barrier = threading.Barrier(6)
+        published = []
+
+        def refresh():
+            barrier.wait()
+            manager.collect_snapshot()
+            published.append(len(manager.metrics.records()))
+
+        threads = [threading.Thread(target=refresh) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(published, [groups] * 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
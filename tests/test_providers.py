@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+Tests des backends de collecte: LinuxProvider sur une arborescence capturée,
+FixtureProvider derrière HWIDManager (sans processus ni Windows)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_cache import SnapshotCache
+from hwid_manager import HWIDManager
+from hwid_providers import DEVICES_COMMAND, FixtureProvider, LinuxProvider, WindowsProvider
+from hwid_snapshot import UNAVAILABLE
+from hwid_worker import WorkerSession
+
+WORKER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hwid_worker.py")
+
+CPUINFO = """processor\t: 0
+vendor_id\t: GenuineIntel
+cpu family\t: 6
+model\t\t: 158
+stepping\t: 10
+flags\t\t: fpu vme de pse tsc msr pae mce cx8 apic sep mtrr pge mca cmov pat pse36 clflush dts acpi mmx fxsr sse sse2 ss ht tm pbe
+
+processor\t: 1
+"""
+
+
+def write(root: str, relative: str, content: str):
+    path = os.path.join(root, *relative.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+class LinuxProviderTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = tmp.name
+        write(self.root, "etc/machine-id", "67e3d13727e94486a0cd8c0d55eeb41b\n")
+        write(self.root, "proc/cpuinfo", CPUINFO)
+        write(self.root, "sys/block/loop0/size", "0\n")
+        write(self.root, "sys/block/sda/size", "1953525168\n")
+        write(self.root, "sys/block/sda/device/serial", "S4EWNX0R123456\n")
+        write(self.root, "sys/block/sda/device/model", "Samsung SSD 860\n")
+        write(self.root, "sys/class/dmi/id/board_vendor", "ASUSTeK COMPUTER INC.\n")
+        write(self.root, "sys/class/dmi/id/board_name", "PRIME Z370-A\n")
+        write(self.root, "sys/class/dmi/id/board_serial", "210987654321\n")
+        write(self.root, "sys/class/net/lo/address", "00:00:00:00:00:00\n")
+        write(self.root, "sys/class/net/veth0/address", "02:42:ac:11:00:02\n")
+        write(self.root, "sys/class/net/veth0/operstate", "up\n")
+        write(self.root, "sys/class/net/eth0/address", "a4:bb:6d:12:34:56\n")
+        write(self.root, "sys/class/net/eth0/operstate", "up\n")
+        write(self.root, "sys/class/net/eth0/speed", "1000\n")
+        os.makedirs(os.path.join(self.root, "sys", "class", "net", "eth0", "device"))
+        self.provider = LinuxProvider(root=self.root)
+
+    def test_reads_components_from_files(self):
+        self.assertEqual(self.provider.machine_guid(), "67e3d13727e94486a0cd8c0d55eeb41b")
+        # Équivalent du ProcessorId Windows d'un Core i7-8700 (famille 6, modèle 0x9E)
+        self.assertEqual(self.provider.cpu_id(), "BFEBFBFF000906EA")
+        self.assertEqual(self.provider.disk_serial(), "S4EWNX0R123456")
+        self.assertEqual(self.provider.motherboard_serial(), "210987654321")
+        self.assertEqual(self.provider.product_id(), UNAVAILABLE)
+
+    def test_prefers_physical_adapter(self):
+        self.assertEqual(self.provider.mac_address(), "a4:bb:6d:12:34:56")
+        names = [adapter["Name"] for adapter in self.provider.network_adapters()]
+        self.assertEqual(names, ["eth0", "veth0"])
+
+    def test_missing_files_are_unavailable(self):
+        empty = LinuxProvider(root=os.path.join(self.root, "absent"))
+        self.assertEqual(empty.machine_guid(), UNAVAILABLE)
+        self.assertEqual(empty.motherboard_serial(), UNAVAILABLE)
+
+    def test_devices_from_sysfs(self):
+        self.assertEqual(list(self.provider.devices()), [
+            {"Kind": "disk", "Name": "sda", "Model": "Samsung SSD 860",
+             "Serial": "S4EWNX0R123456", "Size": 1953525168 * 512},
+            {"Kind": "baseboard", "Manufacturer": "ASUSTeK COMPUTER INC.",
+             "Product": "PRIME Z370-A", "Serial": "210987654321"},
+            {"Kind": "adapter", "Name": "eth0", "MacAddress": "a4:bb:6d:12:34:56",
+             "Status": "Up", "Physical": True, "Speed": "1000 Mbps"},
+            {"Kind": "adapter", "Name": "veth0", "MacAddress": "02:42:ac:11:00:02",
+             "Status": "Up", "Physical": False},
+        ])
+
+    def test_spawns_no_process(self):
+        manager = HWIDManager(provider=self.provider, cache=SnapshotCache())
+        manager.get_all_hwid_info()
+        self.assertEqual(self.provider.spawn_count, 0)
+
+
+class FixtureProviderTest(unittest.TestCase):
+
+    def test_manager_returns_fixture_values(self):
+        manager = HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE), cache=SnapshotCache())
+        info = manager.get_all_hwid_info()
+        for name in ("Machine GUID", "CPU ID", "Disk Serial", "Motherboard Serial",
+                     "MAC Address", "Computer Name"):
+            self.assertEqual(info[name], DEFAULT_FIXTURE[name])
+        self.assertEqual(len(info["Composite HWID"]), 64)
+
+    def test_record_and_replay(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.unlink, path)
+        FixtureProvider.record(FixtureProvider(DEFAULT_FIXTURE), path)
+        original = HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE), cache=SnapshotCache())
+        replayed = HWIDManager(provider=FixtureProvider(path), cache=SnapshotCache())
+        self.assertEqual(original.generate_composite_hwid(), replayed.generate_composite_hwid())
+        self.assertEqual(original.get_network_adapters(), replayed.get_network_adapters())
+        self.assertEqual(list(original.get_devices()), list(replayed.get_devices()))
+
+    def test_devices_rebuilt_from_fields(self):
+        devices = list(FixtureProvider(DEFAULT_FIXTURE).devices())
+        self.assertEqual(devices, [
+            {"Kind": "disk", "Serial": "S4EWNX0R123456"},
+            {"Kind": "baseboard", "Serial": "210987654321"},
+            {"Kind": "adapter", "Name": "Ethernet", "Description": "Intel(R) Ethernet Connection",
+             "MacAddress": "a4:bb:6d:12:34:56", "Status": "Up"},
+        ])
+
+    def test_devices_key_is_normalized(self):
+        fixture = dict(DEFAULT_FIXTURE, Devices=[
+            {"Kind": "disk", "Name": "\\\\.\\PHYSICALDRIVE0", "Size": "512110190592", "Model": None},
+            {"Kind": "adapter", "Name": "Ethernet", "MacAddress": "A4-BB-6D-12-34-56", "Physical": 1},
+            {"Kind": "imprimante", "Name": "ignorée"},
+        ])
+        self.assertEqual(list(FixtureProvider(fixture).devices()), [
+            {"Kind": "disk", "Name": "\\\\.\\PHYSICALDRIVE0", "Size": 512110190592},
+            {"Kind": "adapter", "Name": "Ethernet", "MacAddress": "a4:bb:6d:12:34:56", "Physical": True},
+        ])
+
+
+class WindowsProviderTest(unittest.TestCase):
+    """Énumération des périphériques par le worker de substitution (sans PowerShell)"""
+
+    def test_devices_streamed_from_worker(self):
+        lines = [
+            json.dumps({"Kind": "disk", "Name": "\\\\.\\PHYSICALDRIVE0", "Serial": "S4EWNX0R123456"}),
+            "WARNING: ligne parasite",
+            json.dumps({"Kind": "adapter", "Name": "Ethernet", "MacAddress": "A4-BB-6D-12-34-56"}),
+        ]
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({DEVICES_COMMAND: "\n".join(lines)}, f)
+        self.addCleanup(os.unlink, path)
+        session = WorkerSession([sys.executable, WORKER, "--replay", path])
+        self.addCleanup(session.close)
+        provider = WindowsProvider(session=session)
+        self.assertEqual(list(provider.devices()), [
+            {"Kind": "disk", "Name": "\\\\.\\PHYSICALDRIVE0", "Serial": "S4EWNX0R123456"},
+            {"Kind": "adapter", "Name": "Ethernet", "MacAddress": "a4:bb:6d:12:34:56"},
+        ])
+        # Aucun processus PowerShell de secours
+        self.assertEqual(provider.spawn_count, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de HWIDSnapshot: statuts des valeurs affichables et format binaire
+"""
+
+import struct
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_cache import SnapshotCache
+from hwid_collectors import CollectorRegistry, register_builtins
+from hwid_manager import HWIDManager
+from hwid_providers import FixtureProvider
+from hwid_snapshot import (HWIDSnapshot, HWID_FIELDS, STATUS_ERROR, STATUS_MISSING, STATUS_OK,
+                           STATUS_TIMEOUT, STATUS_UNAVAILABLE, TIMEOUT_VALUE, UNAVAILABLE,
+                           format_value, parse_value)
+
+
+class ParseValueTest(unittest.TestCase):
+
+    def test_status_mapping(self):
+        self.assertEqual(parse_value(None), (STATUS_MISSING, ""))
+        self.assertEqual(parse_value(UNAVAILABLE), (STATUS_UNAVAILABLE, ""))
+        self.assertEqual(parse_value(TIMEOUT_VALUE), (STATUS_TIMEOUT, ""))
+        self.assertEqual(parse_value("Erreur: accès refusé"), (STATUS_ERROR, "accès refusé"))
+        self.assertEqual(parse_value("Erreur:"), (STATUS_ERROR, ""))
+        self.assertEqual(parse_value("BENCH-PC"), (STATUS_OK, "BENCH-PC"))
+
+    def test_value_starting_like_error_is_ok(self):
+        self.assertEqual(parse_value("ErreurX"), (STATUS_OK, "ErreurX"))
+        self.assertEqual(parse_value("Erreurs-PC"), (STATUS_OK, "Erreurs-PC"))
+
+    def test_format_is_inverse(self):
+        for value in (None, UNAVAILABLE, TIMEOUT_VALUE, "Erreur: accès refusé", "ErreurX", "A4:BB"):
+            self.assertEqual(format_value(*parse_value(value)), value)
+
+
+class SnapshotBytesTest(unittest.TestCase):
+
+    def snapshot(self, **values) -> HWIDSnapshot:
+        info = {"Machine GUID": "guid", "CPU ID": TIMEOUT_VALUE, "Disk Serial": UNAVAILABLE,
+                "Motherboard Serial": "Erreur: refusé", "Computer Name": "ErreurX"}
+        info.update(values)
+        return HWIDSnapshot(info, timestamp=1700000000.0)
+
+    def test_round_trip(self):
+        snapshot = self.snapshot()
+        restored = HWIDSnapshot.from_bytes(snapshot.to_bytes())
+        self.assertEqual(restored, snapshot)
+        self.assertEqual(restored.to_info(), snapshot.to_info())
+        self.assertEqual(restored.status("CPU ID"), STATUS_TIMEOUT)
+        self.assertEqual(restored.status("Disk Serial"), STATUS_UNAVAILABLE)
+        self.assertEqual(restored.status("Motherboard Serial"), STATUS_ERROR)
+        self.assertEqual(restored.status("Platform"), STATUS_MISSING)
+        self.assertEqual(restored.value("Computer Name"), "ErreurX")
+        self.assertEqual(restored.timestamp("Machine GUID"), 1700000000.0)
+        self.assertEqual(restored.timestamp("Platform"), 0.0)
+
+    def test_round_trip_from_memoryview(self):
+        snapshot = self.snapshot()
+        self.assertEqual(HWIDSnapshot.from_bytes(memoryview(snapshot.to_bytes())), snapshot)
+
+    def test_large_value(self):
+        snapshot = self.snapshot(**{"Windows Product ID": "x" * 70000})
+        restored = HWIDSnapshot.from_bytes(snapshot.to_bytes())
+        self.assertEqual(len(restored.value("Windows Product ID")), 70000)
+
+    def test_reads_version_1(self):
+        snapshot = self.snapshot()
+        parts = [struct.pack("<2sBB", b"HS", 1, len(HWID_FIELDS))]
+        for name, code, value, stamp in snapshot.items():
+            encoded = value.encode('utf-8')
+            parts.append(struct.pack("<BdH", code, stamp, len(encoded)) + encoded)
+        self.assertEqual(HWIDSnapshot.from_bytes(b"".join(parts)), snapshot)
+
+    def test_rejects_unknown_format(self):
+        with self.assertRaises(ValueError):
+            HWIDSnapshot.from_bytes(b"XX" + self.snapshot().to_bytes()[2:])
+
+
+class ManagerSnapshotTest(unittest.TestCase):
+
+    def test_plugin_fields_are_dropped(self):
+        registry = CollectorRegistry()
+        register_builtins(registry)
+        registry.register_component("GPU", {"fixture": lambda provider: "RTX"})
+        manager = HWIDManager(provider=FixtureProvider(DEFAULT_FIXTURE),
+                              cache=SnapshotCache(), registry=registry)
+        info = manager.get_all_hwid_info()
+        self.assertEqual(info["GPU"], "RTX")
+        snapshot = manager.snapshot()
+        expected = {name: value for name, value in info.items() if name in HWID_FIELDS}
+        self.assertEqual(snapshot.to_info(), expected)
+        self.assertNotIn("GPU", snapshot.to_info())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du coût de démarrage: hwid_bench.py --startup exécuté dans un processus
+neuf (les modules déjà importés par la suite de tests faussent la mesure)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from hwid_bench import STARTUP_BUDGET_MS
+
+BENCH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hwid_bench.py")
+
+
+class StartupTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        completed = subprocess.run([sys.executable, BENCH, "--startup", "--json", "--runs", "7"],
+                                   capture_output=True, text=True, timeout=300)
+        if not completed.stdout.strip():
+            raise AssertionError(f"Mesure impossible: {completed.stderr.strip()}")
+        # Les messages d'échec suivent le document JSON
+        cls.result, _ = json.JSONDecoder().raw_decode(completed.stdout)
+        cls.returncode = completed.returncode
+
+    def test_no_forbidden_module_imported(self):
+        self.assertEqual(self.result["forbidden"], [])
+
+    def test_own_import_cost_within_budget(self):
+        self.assertEqual(self.result["budget_ms"], STARTUP_BUDGET_MS)
+        self.assertLessEqual(self.result["own_ms"], self.result["budget_ms"])
+
+    def test_first_paint_served_from_cache(self):
+        self.assertTrue(self.result["first_paint_cached"])
+
+    def test_gate_passes(self):
+        self.assertEqual(self.returncode, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
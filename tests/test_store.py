@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+"""
+Tests du stockage de parc: dictionnaire de chaînes (l'index persistant ne doit
+jamais couvrir des octets absents du fichier de chaînes), table de hachage
+persistante et index des champs de FleetStore
+"""
+
+import os
+import tempfile
+import unittest
+
+from hwid_store import (_RECORD, _TABLE_HEADER, INDEX_DIRECTORY, RECORDS_FILE, FleetStore,
+                        HashTable, StringDictionary)
+
+VALUES = ["BFEBFBFF000906EA", "S4EWNX0R123456", "a4:bb:6d:12:34:56", "POSTE-01"]
+
+
+def persisted_covered(index_path: str) -> int:
+    """Position couverte lue sur disque (en-tête de l'index)"""
+    with open(index_path, 'rb') as f:
+        return _TABLE_HEADER.unpack(f.read(_TABLE_HEADER.size))[3]
+
+
+class StringDictionaryTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.strings = os.path.join(tmp.name, "strings.bin")
+        self.index = os.path.join(tmp.name, "strings.idx")
+
+    def open(self, readonly: bool = False) -> StringDictionary:
+        dictionary = StringDictionary(self.strings, self.index, readonly)
+        self.addCleanup(dictionary.close)
+        return dictionary
+
+    def test_index_never_ahead_of_strings(self):
+        dictionary = self.open()
+        ids = [dictionary.intern(value) for value in VALUES]
+        # Chaînes encore en tampon: la couverture persistée n'a pas avancé
+        self.assertLessEqual(persisted_covered(self.index), os.path.getsize(self.strings))
+        self.assertEqual([dictionary.lookup(value) for value in VALUES], ids)
+        self.assertEqual(len(dictionary), len(VALUES))
+        dictionary.flush()
+        self.assertEqual(persisted_covered(self.index), os.path.getsize(self.strings))
+
+    def test_catch_up_after_unflushed_index(self):
+        dictionary = self.open()
+        ids = [dictionary.intern(value) for value in VALUES]
+        # Arrêt brutal simulé: chaînes écrites, couverture de l'index non persistée
+        dictionary._file.flush()
+        reopened = self.open()
+        self.assertEqual(len(reopened), len(VALUES))
+        self.assertEqual([reopened.lookup(value) for value in VALUES], ids)
+        self.assertEqual(persisted_covered(self.index), os.path.getsize(self.strings))
+
+    def test_reopen_after_close(self):
+        dictionary = self.open()
+        ids = [dictionary.intern(value) for value in VALUES]
+        dictionary.close()
+        readonly = self.open(readonly=True)
+        self.assertEqual([readonly.get(string_id) for string_id in ids], VALUES)
+        self.assertEqual(len(readonly), len(VALUES))
+
+
+class HashTableTest(unittest.TestCase):
+
+    def test_grow_keeps_entries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "table.idx")
+            table = HashTable(path, capacity=8)
+            for key in range(1, 41):
+                table.insert(key, key * 10)
+            table.insert(7, 700)
+            table.put(3, 333)
+            table.covered = 41
+            self.assertGreaterEqual(table.capacity, 64)
+            self.assertEqual(sorted(table.find(7)), [70, 700])
+            self.assertEqual(table.get(3), 333)
+            table.close()
+            reopened = HashTable(path, readonly=True)
+            self.assertEqual(reopened.used, 41)
+            self.assertEqual(reopened.covered, 41)
+            self.assertEqual([reopened.get(key) for key in (1, 20, 40)], [10, 200, 400])
+            self.assertIsNone(reopened.get(99))
+            reopened.close()
+
+
+def inventory(number: int) -> dict:
+    return {
+        "Machine GUID": f"guid-{number}",
+        "MAC Address": ("a4:bb:6d:00:00:01", "a4:bb:6d:00:00:02", "a4:bb:6d:00:00:03")[number % 3],
+        "Disk Serial": "Non disponible" if number % 2 else f"DISK-{number % 4}",
+        "Platform": "Linux",
+        "Computer Name": f"POSTE-{number % 5}"
+    }
+
+
+class FleetStoreIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = tmp.name
+
+    def fill(self, count: int, indexed: bool = True):
+        with FleetStore(self.path, indexed=indexed) as store:
+            for number in range(count):
+                store.append(inventory(number), 1000.0 + number)
+
+    def expected(self, field: str, value: str, count: int):
+        return [number for number in range(count) if inventory(number).get(field) == value]
+
+    def assertLookups(self, store: FleetStore, count: int):
+        for field in ("MAC Address", "Disk Serial", "Computer Name", "Platform"):
+            for value in {inventory(number)[field] for number in range(count)}:
+                self.assertEqual(store.lookup(field, value), self.expected(field, value, count),
+                                 f"{field}={value}")
+        self.assertEqual(store.lookup("MAC Address", "ff:ff:ff:ff:ff:ff"), [])
+
+    def test_indexed_and_scanned_lookups(self):
+        self.fill(30)
+        with FleetStore(self.path, readonly=True) as store:
+            self.assertIn("MAC Address", store.indexes)
+            self.assertNotIn("Computer Name", store.indexes)
+            self.assertEqual(store.indexes["MAC Address"].covered, 30)
+            self.assertLookups(store, 30)
+            self.assertEqual(store.count("Disk Serial", "Non disponible"), 15)
+
+    def test_catch_up_of_unindexed_records(self):
+        self.fill(12)
+        with FleetStore(self.path, indexed=False) as store:
+            for number in range(12, 20):
+                store.append(inventory(number), 1000.0 + number)
+        # Lecture seule: les ajouts non indexés sont parcourus
+        with FleetStore(self.path, readonly=True) as store:
+            self.assertEqual(store.indexes["MAC Address"].covered, 12)
+            self.assertLookups(store, 20)
+        # Écriture: les index rattrapent les ajouts
+        with FleetStore(self.path) as store:
+            self.assertEqual(store.indexes["MAC Address"].covered, 20)
+            self.assertLookups(store, 20)
+
+    def test_index_ahead_of_records_is_rebuilt(self):
+        self.fill(15)
+        records = os.path.join(self.path, RECORDS_FILE)
+        with open(records, 'r+b') as f:
+            f.truncate(os.path.getsize(records) - 4 * _RECORD.size)
+        with FleetStore(self.path) as store:
+            self.assertEqual(len(store), 11)
+            self.assertEqual(store.indexes["MAC Address"].covered, 11)
+            self.assertLookups(store, 11)
+
+    def test_truncated_chain_is_rebuilt(self):
+        self.fill(15)
+        chain = os.path.join(self.path, INDEX_DIRECTORY, "mac_address.chain")
+        with open(chain, 'r+b') as f:
+            f.truncate(os.path.getsize(chain) - 4 * 8)
+        with FleetStore(self.path) as store:
+            self.assertEqual(store.indexes["MAC Address"].covered, 15)
+            self.assertLookups(store, 15)
+
+
+if __name__ == "__main__":
+    unittest.main()
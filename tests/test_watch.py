@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de la surveillance: les vérifications sans changement ne réécrivent pas
+le cache persistant de l'interface; analyse des signaux netlink du noyau
+"""
+
+import errno
+import os
+import struct
+import tempfile
+import unittest
+
+from hwid_bench import DEFAULT_FIXTURE
+from hwid_cache import SnapshotCache
+from hwid_manager import HWIDManager
+from hwid_providers import FixtureProvider
+from hwid_watch import RTM_NEWLINK, HWIDWatcher, NetlinkSignals
+
+
+class WatcherCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "cache.json")
+        self.provider = FixtureProvider(DEFAULT_FIXTURE)
+        self.manager = HWIDManager(provider=self.provider, cache=SnapshotCache(path=self.path))
+        self.watcher = HWIDWatcher(self.manager, signals=False)
+        self.addCleanup(self.watcher.close)
+
+    def mark(self):
+        # Date repère: toute sauvegarde ultérieure (os.replace) la remplace
+        os.utime(self.path, ns=(1, 1))
+
+    def rewritten(self) -> bool:
+        return os.stat(self.path).st_mtime_ns != 1
+
+    def test_unchanged_checks_keep_cache_file(self):
+        self.watcher.baseline()
+        self.mark()
+        for _ in range(3):
+            self.assertEqual(self.watcher.check(), [])
+        self.assertEqual(self.watcher.check(["MAC Address", "Disk Serial"]), [])
+        self.assertFalse(self.rewritten())
+
+    def test_changed_value_is_saved(self):
+        self.watcher.baseline()
+        self.mark()
+        self.provider.fixture["MAC Address"] = "a4:bb:6d:65:43:21"
+        events = self.watcher.check(["MAC Address"])
+        self.assertEqual([event["Field"] for event in events], ["MAC Address", "Composite HWID"])
+        self.assertTrue(self.rewritten())
+        self.assertEqual(SnapshotCache(path=self.path).peek("MAC Address"), "a4:bb:6d:65:43:21")
+
+
+def uevent(*items: str) -> bytes:
+    return b"\0".join(item.encode('ascii') for item in items) + b"\0"
+
+
+def nlmsg(kind: int, payload: bytes = b"") -> bytes:
+    message = struct.pack("=IHHII", 16 + len(payload), kind, 0, 0, 0) + payload
+    return message + b"\0" * (-len(message) % 4)
+
+
+class FakeSocket:
+    """Socket netlink simulé: retourne les messages puis lève l'erreur indiquée"""
+
+    def __init__(self, messages, error=BlockingIOError()):
+        self.messages = list(messages)
+        self.error = error
+
+    def recv(self, size):
+        if self.messages:
+            return self.messages.pop(0)
+        raise self.error
+
+
+class NetlinkParsingTest(unittest.TestCase):
+
+    def test_uevent_fields(self):
+        self.assertEqual(tuple(NetlinkSignals._uevent_fields(
+            uevent("add@/devices/sda", "ACTION=add", "SUBSYSTEM=block", "DEVNAME=sda"))), ("Disk Serial",))
+        self.assertEqual(tuple(NetlinkSignals._uevent_fields(
+            uevent("remove@/devices/net/eth0", "ACTION=remove", "SUBSYSTEM=net"))), ("MAC Address",))
+        self.assertEqual(tuple(NetlinkSignals._uevent_fields(
+            uevent("bind@/devices/sda", "ACTION=bind", "SUBSYSTEM=block"))), ())
+        self.assertEqual(tuple(NetlinkSignals._uevent_fields(
+            uevent("add@/devices/usb", "ACTION=add", "SUBSYSTEM=usb"))), ())
+        self.assertEqual(tuple(NetlinkSignals._uevent_fields(b"libudev\0garbage")), ())
+
+    def test_route_fields(self):
+        self.assertEqual(tuple(NetlinkSignals._route_fields(nlmsg(RTM_NEWLINK, b"\0" * 16))),
+                         ("MAC Address",))
+        # Lien signalé après un autre message (adresse) dans la même trame
+        self.assertEqual(tuple(NetlinkSignals._route_fields(nlmsg(20, b"\0" * 6) + nlmsg(RTM_NEWLINK))),
+                         ("MAC Address",))
+        self.assertEqual(tuple(NetlinkSignals._route_fields(nlmsg(20))), ())
+        self.assertEqual(tuple(NetlinkSignals._route_fields(b"\0" * 8)), ())
+        # Longueur invalide: pas de boucle infinie
+        self.assertEqual(tuple(NetlinkSignals._route_fields(struct.pack("=IHHII", 0, 20, 0, 0, 0) * 2)), ())
+
+    def signals(self, sockets) -> NetlinkSignals:
+        signals = NetlinkSignals.__new__(NetlinkSignals)
+        signals._sockets = sockets
+        return signals
+
+    def test_drain(self):
+        block = FakeSocket([uevent("add@/x", "ACTION=add", "SUBSYSTEM=block")])
+        route = FakeSocket([nlmsg(20)])
+        self.assertEqual(self.signals({block: "uevent", route: "route"})._drain([block, route]),
+                         {"Disk Serial"})
+
+    def test_overflow_checks_every_field(self):
+        overflow = FakeSocket([], OSError(errno.ENOBUFS, "No buffer space available"))
+        self.assertEqual(self.signals({overflow: "uevent"})._drain([overflow]),
+                         {"Disk Serial", "MAC Address"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+Tests de WorkerSession avec le worker de substitution (hwid_worker.py --replay)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+from hwid_worker import WorkerError, WorkerSession, WorkerTimeout
+
+WORKER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hwid_worker.py")
+
+REPLAY = {
+    "Get-CimInstance Win32_Processor": "BFEBFBFF000906EA",
+    "hostname": "POSTE-01",
+    "Get-Lignes": "disque\ncarte mère\ncarte réseau"
+}
+
+# Worker qui répond par une première ligne puis ne termine jamais la commande
+PARTIAL_WORKER = (
+    "import json, sys, time\n"
+    "request = json.loads(sys.stdin.readline())\n"
+    "print(json.dumps({'id': request['id'], 'line': 'disque'}), flush=True)\n"
+    "time.sleep(30)\n"
+)
+
+
+class WorkerSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.fixture = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(REPLAY, f)
+
+    def tearDown(self):
+        os.unlink(self.fixture)
+
+    def session(self, **kwargs) -> WorkerSession:
+        session = WorkerSession([sys.executable, WORKER, "--replay", self.fixture], **kwargs)
+        self.addCleanup(session.close)
+        return session
+
+    def test_reuses_one_process(self):
+        session = self.session()
+        for _ in range(3):
+            self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.request("Get-CimInstance Win32_Processor"), "BFEBFBFF000906EA")
+        self.assertEqual(session.spawns, 1)
+
+    def test_unknown_command_keeps_worker(self):
+        session = self.session()
+        with self.assertRaises(WorkerError):
+            session.request("Get-Inconnu")
+        self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.spawns, 1)
+
+    def test_restarts_after_crash(self):
+        session = self.session()
+        session.request("hostname")
+        session._proc.kill()
+        session._proc.wait()
+        self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.spawns, 2)
+        self.assertEqual(session.restarts, 1)
+
+    def test_timeout_kills_silent_worker(self):
+        session = WorkerSession([sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+        self.addCleanup(session.close)
+        with self.assertRaises(WorkerTimeout):
+            session.request("hostname")
+        self.assertFalse(session.alive)
+
+    def test_stale_idle_timer_keeps_worker(self):
+        session = self.session(idle_timeout=0.2)
+        session.request("hostname")
+        # Le minuteur se déclenche pendant une requête (verrou tenu), puis la
+        # requête le remplace: le minuteur périmé ne doit pas tuer le worker
+        with session._lock:
+            time.sleep(0.4)
+            session.idle_timeout = 60.0
+            session._cancel_idle_timer()
+            session._arm_idle_timer()
+        time.sleep(0.2)
+        self.assertTrue(session.alive)
+        self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.spawns, 1)
+
+    def test_stream_yields_lines(self):
+        session = self.session()
+        self.assertEqual(list(session.stream("Get-Lignes")), ["disque", "carte mère", "carte réseau"])
+        self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.spawns, 1)
+
+    def test_stream_unknown_command(self):
+        session = self.session()
+        with self.assertRaises(WorkerError):
+            list(session.stream("Get-Inconnu"))
+        self.assertEqual(session.spawns, 1)
+
+    def test_abandoned_stream_keeps_session(self):
+        session = self.session()
+        lines = session.stream("Get-Lignes")
+        self.assertEqual(next(lines), "disque")
+        lines.close()
+        # Les trames restantes de la requête abandonnée sont ignorées
+        self.assertEqual(session.request("hostname"), "POSTE-01")
+        self.assertEqual(session.spawns, 1)
+
+    def test_stream_does_not_wait_for_completion(self):
+        session = WorkerSession([sys.executable, "-c", PARTIAL_WORKER], timeout=1.0)
+        self.addCleanup(session.close)
+        lines = session.stream("Get-Lignes")
+        self.assertEqual(next(lines), "disque")
+        with self.assertRaises(WorkerTimeout):
+            next(lines)
+
+    def test_idle_shutdown(self):
+        session = self.session(idle_timeout=0.2)
+        session.request("hostname")
+        self.assertTrue(session.alive)
+        time.sleep(0.6)
+        self.assertFalse(session.alive)
+
+
+if __name__ == "__main__":
+    unittest.main()